@@ -0,0 +1,100 @@
+"""Compare cold CSV parsing against warm DatasetCache loads.
+
+Usage:
+    python benchmarks/bench_dataset_cache.py [--csv data/Medicine_Details.csv] [--scale 100]
+
+Runs against the Kaggle file when it is present (a synthetic frame of the
+same shape otherwise) and against a ``--scale``-times copy of it.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.dataset_cache import DatasetCache  # noqa: E402
+from utils.schema import validate_frame  # noqa: E402
+
+KAGGLE_ROWS = 11825
+
+
+def synthetic_frame(rows, seed=0):
+    """Frame with the Kaggle dataset's columns and cardinalities"""
+    rng = np.random.default_rng(seed)
+    ingredients = [f'Ingredient{i} ({rng.integers(1, 500)}mg)' for i in range(800)]
+    effects = [f'Effect{i}' for i in range(300)]
+    excellent = rng.integers(0, 101, rows)
+    poor = rng.integers(0, 101 - excellent)
+
+    return pd.DataFrame({
+        'medicine_name': [f'Medicine {i} Tablet' for i in range(rows)],
+        'composition': [
+            ' + '.join(rng.choice(ingredients, rng.integers(1, 4)))
+            for _ in range(rows)
+        ],
+        'uses': 'Treatment of infections',
+        'side_effects': [
+            ' '.join(rng.choice(effects, rng.integers(1, 8)))
+            for _ in range(rows)
+        ],
+        'manufacturer': [f'Manufacturer {i}' for i in rng.integers(0, 750, rows)],
+        'excellent_review_%': excellent,
+        'average_review_%': 100 - excellent - poor,
+        'poor_review_%': poor
+    })
+
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(label, csv_path, cache_dir, repeats):
+    cache = DatasetCache(cache_dir)
+    cache.invalidate(csv_path)
+
+    cold = time_call(lambda: validate_frame(pd.read_csv(csv_path)), repeats)
+    cache.store(csv_path, validate_frame(pd.read_csv(csv_path)))
+    warm = time_call(lambda: cache.load(csv_path), repeats)
+
+    rows = len(cache.load(csv_path))
+    print(f'{label:<12} {rows:>10,} {cold * 1000:>12.1f} {warm * 1000:>12.1f} {cold / warm:>8.1f}x')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--csv', default='data/Medicine_Details.csv')
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = Path(args.csv)
+        if source.exists():
+            base = validate_frame(pd.read_csv(source))
+        else:
+            print(f'{source} not found, using a synthetic {KAGGLE_ROWS:,}-row frame')
+            base = synthetic_frame(KAGGLE_ROWS)
+            source = tmp / 'base.csv'
+            base.to_csv(source, index=False)
+
+        scaled = tmp / f'scaled_x{args.scale}.csv'
+        pd.concat([base] * args.scale, ignore_index=True).to_csv(scaled, index=False)
+
+        print(f'{"dataset":<12} {"rows":>10} {"cold ms":>12} {"warm ms":>12} {"speedup":>9}')
+        bench('base', source, tmp / 'cache', args.repeats)
+        bench(f'x{args.scale}', scaled, tmp / 'cache', args.repeats)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Compare QueryEngine filtering against pandas boolean masking.
+
+Usage:
+    python benchmarks/bench_query_engine.py [--rows 1000000] [--repeats 5] [--builders 5]
+
+Row selection (matching row positions) is timed on its own, then the row selection of a
+dashboard rerun three ways: pandas masking once per figure builder
+(``--builders``), as before the registry; pandas masking once and sharing
+the ``take``; and the engine plus ``take``, as the app does. The last two
+share the subset alike, so their ratio is what the engine itself buys.
+Index build time is reported separately; the app builds off the upload path.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.query_engine import FILTER_COLUMNS, Predicate, QueryEngine  # noqa: E402
+
+
+def synthetic_frame(rows, seed=0):
+    """Compact frame shaped like an ingested dataset, with side_effects_count derived"""
+    rng = np.random.default_rng(seed)
+    excellent = rng.integers(0, 101, rows)
+    poor = rng.integers(0, 101 - excellent)
+    # A few large manufacturers and a long tail, as in the Kaggle data
+    weights = 1 / np.arange(1, 751) ** 1.1
+    manufacturers = [f'Manufacturer {i}' for i in range(750)]
+    return pd.DataFrame({
+        'manufacturer': pd.Categorical.from_codes(
+            rng.choice(750, rows, p=weights / weights.sum()), categories=manufacturers
+        ),
+        'excellent_review_%': excellent.astype(np.float32),
+        'poor_review_%': poor.astype(np.float32),
+        'side_effects_count': rng.integers(1, 12, rows).astype(np.float64)
+    })
+
+
+QUERIES = {
+    'manufacturer == top': (
+        lambda df: df['manufacturer'] == 'Manufacturer 0',
+        Predicate('manufacturer', '==', 'Manufacturer 0')
+    ),
+    'drill-down (3 terms)': (
+        lambda df: (df['manufacturer'] == 'Manufacturer 3') & (df['poor_review_%'] > 30)
+        & (df['side_effects_count'] >= 5),
+        Predicate('manufacturer', '==', 'Manufacturer 3') & Predicate('poor_review_%', '>', 30)
+        & Predicate('side_effects_count', '>=', 5)
+    ),
+    'review band OR tail': (
+        lambda df: df['excellent_review_%'].between(80, 100)
+        | df['manufacturer'].isin(['Manufacturer 700', 'Manufacturer 701']),
+        Predicate('excellent_review_%', 'between', (80, 100))
+        | Predicate('manufacturer', 'in', ['Manufacturer 700', 'Manufacturer 701'])
+    ),
+    'wide range': (
+        lambda df: df['poor_review_%'] <= 60,
+        Predicate('poor_review_%', '<=', 60)
+    )
+}
+
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--builders', type=int, default=5)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    start = time.perf_counter()
+    engine = QueryEngine(df).build(FILTER_COLUMNS)
+    print(f'{args.rows:,} rows, indexes built in {(time.perf_counter() - start) * 1000:.1f} ms')
+
+    print(f'{"query":<22} {"matches":>10} {"mask ms":>9} {"engine ms":>10} '
+          f'{"per builder":>12} {"mask+take":>10} {"engine+take":>12} {"speedup":>9}')
+    for label, (mask, expr) in QUERIES.items():
+        expected = np.flatnonzero(mask(df).to_numpy())
+        rows = engine.rows(expr)
+        assert np.array_equal(rows, expected), label
+
+        # Row selection alone
+        mask_ms = time_call(lambda: np.flatnonzero(mask(df).to_numpy()), args.repeats)
+        engine_ms = time_call(lambda: engine.rows(expr), args.repeats)
+        # A rerun: every builder masks the frame, versus one shared subset selected
+        # by a pandas mask or by the engine; speedup compares the two shared ones
+        naive = time_call(lambda: [df[mask(df)] for _ in range(args.builders)], args.repeats)
+        shared = time_call(lambda: df.take(np.flatnonzero(mask(df).to_numpy())), args.repeats)
+        indexed = time_call(lambda: df.take(engine.rows(expr)), args.repeats)
+        print(f'{label:<22} {len(rows):>10,} {mask_ms * 1000:>9.1f} {engine_ms * 1000:>10.1f} '
+              f'{naive * 1000:>12.1f} {shared * 1000:>10.1f} {indexed * 1000:>12.1f} '
+              f'{shared / indexed:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
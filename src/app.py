@@ -1,13 +1,24 @@
 # src/app.py
 import streamlit as st
+import streamlit.components.v1 as components
 import plotly.express as px
 import pandas as pd
-from pathlib import Path
 import logging
 from utils.data_loader import DataLoader
+from utils.dataset_registry import registry, shared_view
 from components.analysis import MedicineAnalyzer
-from components.monitoring import ModelMonitor
-from components.predictor import MedicinePredictionService
+from components.monitoring import EnhancedFeatureAnalyzer, get_model_monitor
+from components.predictor import get_prediction_service
+from components.overview import render_overview
+from utils.batch_scoring import BatchScorer
+from utils.manufacturer_index import manufacturer_index
+from utils.query_engine import AllOf, Predicate, filtered, query_engine
+from utils.sketches import DatasetSketches
+
+# Datasets are shared across sessions as shallow views (utils.dataset_registry);
+# copy-on-write keeps a session's edits to its view from reaching the shared frame.
+# Set here rather than on import so library users keep their own pandas mode.
+pd.set_option('mode.copy_on_write', True)
 
 class MedicProDashboard:
     def __init__(self):
@@ -38,8 +49,8 @@ class MedicProDashboard:
     def initialize_components(self):
         """Initialize app components"""
         self.data_loader = DataLoader()
-        self.monitor = ModelMonitor()
-        self.predictor = MedicinePredictionService('models/random_forest.joblib')
+        self.monitor = get_model_monitor()
+        self.predictor = get_prediction_service('models/random_forest.joblib')
 
     def initialize_session_state(self):
         """Initialize session state with error handling"""
@@ -52,6 +63,8 @@ class MedicProDashboard:
                 st.session_state.analyzer = None
             if 'model_loaded' not in st.session_state:
                 st.session_state.model_loaded = False
+            if 'view' not in st.session_state:
+                st.session_state.view = None
         except Exception as e:
             self.logger.error(f"Session state initialization failed: {str(e)}")
             raise
@@ -84,6 +97,85 @@ class MedicProDashboard:
             if st.sidebar.button("Load Kaggle Dataset"):
                 self._handle_kaggle_download()
 
+    def _handle_file_upload(self, uploaded_file):
+        """Stream an uploaded CSV into session state with sidebar progress"""
+        if st.session_state.data_source == uploaded_file.name:
+            return
+
+        progress = st.sidebar.progress(0.0, text="Reading upload...")
+
+        def report(rows, fraction, rows_per_sec):
+            progress.progress(
+                fraction if fraction is not None else 0.0,
+                text=f"{rows:,} rows ({rows_per_sec:,.0f} rows/sec)"
+            )
+
+        # Sketched on the raw chunks, so approximate views never rescan the frame
+        sketches = DatasetSketches()
+        try:
+            df = self.data_loader.load_stream(
+                uploaded_file,
+                total_bytes=uploaded_file.size,
+                progress_callback=report,
+                chunk_callback=sketches.update
+            )
+        except ValueError as e:
+            progress.empty()
+            self.logger.error(f"Upload rejected: {str(e)}")
+            st.sidebar.error(f"Upload rejected: {str(e)}")
+            return
+
+        progress.progress(1.0, text=f"Loaded {len(df):,} rows")
+        # Sessions keep a handle; the frame itself is shared process-wide
+        st.session_state.data = registry.register(df, artifacts={'sketches': sketches})
+        st.session_state.data_source = uploaded_file.name
+        st.session_state.analyzer = None
+        # Index the filter columns off the upload path; filters mask until it lands
+        query_engine(st.session_state.data.frame()).build_async()
+
+        stats = registry.stats()
+        self.logger.info(
+            f"Dataset registry: {stats['datasets']} datasets, {stats['handles']} handles, "
+            f"{stats['bytes_saved'] / 1e6:.1f} MB saved by deduplication"
+        )
+        st.sidebar.caption(f"Shared dataset cache saved {stats['bytes_saved'] / 1e6:.1f} MB")
+
+    def render_filters(self):
+        """Sidebar drill-down; the matching rows come from the query engine"""
+        data = st.session_state.data
+        engine = query_engine(data.frame())
+        st.sidebar.header("Filters")
+
+        terms = []
+        manufacturers = st.sidebar.multiselect("Manufacturer", engine.categories('manufacturer'))
+        if manufacturers:
+            terms.append(Predicate('manufacturer', 'in', manufacturers))
+        for column, label in [('excellent_review_%', "Excellent review %"), ('poor_review_%', "Poor review %")]:
+            low, high = st.sidebar.slider(label, 0, 100, (0, 100))
+            if (low, high) != (0, 100):
+                terms.append(Predicate(column, 'between', (low, high)))
+        _, most = engine.value_range('side_effects_count')
+        min_side_effects = st.sidebar.number_input(
+            "Minimum side effects", min_value=0, max_value=int(most) if pd.notna(most) else 0, value=0
+        )
+        if min_side_effects:
+            terms.append(Predicate('side_effects_count', '>=', min_side_effects))
+
+        if not terms:
+            st.session_state.view = data
+            return
+        view = filtered(data, AllOf(*terms))
+        if len(view) == 0:
+            st.sidebar.warning("No medicines match these filters; showing the full dataset.")
+            st.session_state.view = data
+            return
+        st.session_state.view = view
+        st.sidebar.caption(f"{len(st.session_state.view):,} of {len(data):,} medicines")
+
+    def render_overview(self):
+        """Model overview served from the shared results snapshot"""
+        render_overview()
+
     def render_predictions(self):
         """Enhanced prediction interface"""
         if not st.session_state.data:
@@ -91,6 +183,23 @@ class MedicProDashboard:
             return
             
         st.title("Medicine Effectiveness Prediction")
+
+        # Outside the form so the suggestions refresh as the prefix is typed
+        index = manufacturer_index(st.session_state.data.frame())
+        prefix = st.text_input("Manufacturer", help="Start typing a manufacturer name")
+        matches = index.complete(prefix, limit=50)
+        manufacturer = st.selectbox("Matching manufacturers", matches) if matches else None
+        stats = index.stats(manufacturer) if manufacturer else None
+        if stats is None:
+            manufacturer_rating = index.prior('excellent_review_%')
+            st.caption(f"Unknown manufacturer: using the dataset average rating ({manufacturer_rating:.1f})")
+        else:
+            manufacturer_rating = stats['excellent_review_%']
+            st.caption(
+                f"{stats['rows']} medicines, rating {manufacturer_rating:.1f} "
+                f"(smoothed {stats['excellent_review_%_smoothed']:.1f}), "
+                f"{stats['side_effects_count']:.1f} side effects on average"
+            )
         
         with st.form("prediction_form"):
             col1, col2 = st.columns(2)
@@ -102,6 +211,8 @@ class MedicProDashboard:
                     max_value=10,
                     help="Enter number of active ingredients (1-10)"
                 )
+
+            with col2:
                 side_effects = st.number_input(
                     "Number of Side Effects",
                     min_value=0,
@@ -109,18 +220,6 @@ class MedicProDashboard:
                     help="Enter number of known side effects"
                 )
             
-            with col2:
-                satisfaction = st.slider(
-                    "Patient Satisfaction Score",
-                    0, 100, 50,
-                    help="Enter average patient satisfaction score"
-                )
-                manufacturer_rating = st.slider(
-                    "Manufacturer Rating",
-                    0, 100, 50,
-                    help="Enter manufacturer's quality rating"
-                )
-            
             submitted = st.form_submit_button("Predict Effectiveness")
             
             if submitted:
@@ -128,14 +227,17 @@ class MedicProDashboard:
                     features = {
                         'composition_count': composition_count,
                         'side_effects': side_effects,
-                        'satisfaction': satisfaction,
                         'manufacturer_rating': manufacturer_rating
                     }
                     
                     prediction = self.predictor.predict(features)
                     
                     st.success(f"Predicted Effectiveness: {prediction['prediction']:.1f}%")
-                    st.info(f"Confidence Score: {prediction['confidence']:.2f}")
+                    if prediction['tree_spread'] is not None:
+                        st.caption(
+                            f"Tree-vote spread: ±{prediction['tree_spread']:.1f} points "
+                            "(disagreement between the forest's trees, not a calibrated confidence)"
+                        )
                     
                     # Log prediction
                     self.monitor.track_prediction(features, prediction['prediction'])
@@ -144,15 +246,106 @@ class MedicProDashboard:
                     self.logger.error(f"Prediction failed: {str(e)}")
                     st.error("Prediction failed. Please try again.")
 
+    def render_eda_report(self):
+        """Quick profile immediately, full profile report once the worker finishes"""
+        st.title("Exploratory Data Analysis")
+        analyzer = MedicineAnalyzer(st.session_state.view)
+
+        html = analyzer.generate_profile_report()
+        if html is not None:
+            components.html(html, height=1000, scrolling=True)
+            self._render_correlations(analyzer)
+            return
+
+        status = analyzer.profile_status()
+        if status['error']:
+            st.error(f"Full report failed: {status['error']}")
+        else:
+            # The full report is one ydata-profiling pass with no meaningful fraction done
+            elapsed = f", {status['elapsed']:.0f}s elapsed" if status['elapsed'] is not None else ""
+            st.info(
+                f"The full profile report is being built in the background ({status['stage']}{elapsed}). "
+                "Until it is ready, only the quick profile below is available."
+            )
+            st.button("Refresh report status")
+
+        st.subheader("Quick Profile")
+        st.dataframe(analyzer.generate_minimal_profile(), use_container_width=True)
+        self._render_correlations(analyzer)
+
+    def _render_correlations(self, analyzer):
+        """Correlation heatmaps; the profile report leaves these to the shared service"""
+        st.subheader("Correlations")
+        for method, corr in analyzer.generate_correlations().items():
+            st.plotly_chart(
+                px.imshow(corr, title=f'{method.title()} Correlation',
+                          color_continuous_scale='RdBu', zmin=-1, zmax=1),
+                use_container_width=True
+            )
+
+    def render_model_analysis(self):
+        """Feature analysis figures; only the selected one is built, neighbours are prefetched"""
+        st.title("Model Analysis")
+        try:
+            model = self.predictor.model
+        except Exception as e:
+            self.logger.warning(f"No trained model for feature importance: {str(e)}")
+            model = None
+
+        approximate = st.checkbox(
+            "Approximate distributions",
+            help="Draw distributions from the quantile sketches collected at ingest"
+        )
+        analyzer = EnhancedFeatureAnalyzer(shared_view(st.session_state.view), approximate=approximate)
+        catalog = analyzer.figure_catalog(model)
+        key = st.selectbox("Figure", catalog.keys(), format_func=lambda k: catalog[k].title)
+        st.plotly_chart(catalog.figure(key), use_container_width=True)
+
+    def render_batch_scoring(self):
+        """Score the loaded dataset, narrowed by the sidebar filters, in one vectorized pass"""
+        st.title("Batch Scoring")
+
+        n_workers = st.number_input("Worker processes", min_value=1, max_value=16, value=1)
+        if not st.button("Score loaded dataset"):
+            return
+
+        try:
+            with st.spinner("Scoring dataset..."):
+                data = st.session_state.view.frame()
+                scorer = BatchScorer(
+                    'models/random_forest.joblib',
+                    n_workers=int(n_workers),
+                    manufacturer_index=manufacturer_index(st.session_state.data.frame())
+                )
+                # Nothing is written server-side, where concurrent sessions would share one path;
+                # each session downloads its own results below
+                results, summary = scorer.score(data)
+
+            st.success(
+                f"Scored {summary['rows']:,} rows in {summary['seconds']:.2f}s "
+                f"({summary['rows_per_sec']:,.0f} rows/sec)"
+            )
+            st.dataframe(results.head(1000), use_container_width=True)
+            st.download_button(
+                "Download predictions",
+                results.to_csv(index=False),
+                file_name="predictions.csv",
+                mime="text/csv"
+            )
+        except Exception as e:
+            self.logger.error(f"Batch scoring failed: {str(e)}")
+            st.error("Batch scoring failed. Please try again.")
+
     def run(self):
         """Main application loop with error handling"""
         try:
             self.load_data_section()
             
             if st.session_state.data is not None:
+                self.render_filters()
                 page = st.sidebar.selectbox(
                     "Navigation",
-                    ["Overview", "EDA Report", "Model Analysis", "Predictions"]
+                    ["Overview", "EDA Report", "Model Analysis", "Predictions", "Batch Scoring"]
                 )
                 
                 if page == "Overview":
@@ -163,6 +356,8 @@ class MedicProDashboard:
                     self.render_model_analysis()
                 elif page == "Predictions":
                     self.render_predictions()
+                elif page == "Batch Scoring":
+                    self.render_batch_scoring()
                     
         except Exception as e:
             self.logger.error(f"Application error: {str(e)}")
@@ -1,33 +1,61 @@
 import pandas as pd
 import numpy as np
-from ydata_profiling import ProfileReport
 import plotly.express as px
 import plotly.graph_objects as go
+import shutil
 from pathlib import Path
+from utils.aggregates import manufacturer_aggregates
+from utils.binning import REVIEW_RANGE, binned_column
+from utils.correlation import correlation_matrix
+from utils.dataset_registry import shared_view
+from utils.figure_cache import figure_cache
+from utils.profiling import minimal_profile, profile_service
+from utils.scatter import AdaptiveScatter
+from utils.text_features import tokenized_column
 
 class MedicineAnalyzer:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame, scatter: AdaptiveScatter = None):
+        self.df = shared_view(df)
+        self.scatter = scatter or AdaptiveScatter()
         self.reports_dir = Path('reports')
         self.reports_dir.mkdir(exist_ok=True)
+        self.profile_key = None
 
-    def generate_profile_report(self):
-        """Generate comprehensive EDA report"""
-        profile = ProfileReport(
-            self.df,
-            title="Medicine Analysis Report",
-            explorative=True,
-            correlations={
-                "auto": {"calculate": True},
-                "pearson": {"calculate": True},
-                "spearman": {"calculate": True}
-            }
-        )
-        
-        report_path = self.reports_dir / 'medicine_analysis.html'
-        profile.to_file(report_path)
-        return profile.to_html()
+    def generate_profile_report(self, wait=False):
+        """Generate comprehensive EDA report in a background worker.
+
+        Returns the report HTML when it is ready (cached per dataset hash),
+        otherwise None while it builds; ``wait=True`` blocks until done.
+        """
+        self.profile_key = profile_service.request(self.df, title="Medicine Analysis Report")
+        html = profile_service.report_html(self.profile_key, wait=wait)
+
+        if html is not None:
+            report_path = self.reports_dir / 'medicine_analysis.html'
+            source = profile_service.report_path(self.profile_key)
+            if not report_path.exists() or report_path.stat().st_mtime < source.stat().st_mtime:
+                shutil.copyfile(source, report_path)
+        return html
+
+    def profile_status(self):
+        """Stage of the background report started by generate_profile_report"""
+        return profile_service.status(self.profile_key)
+
+    def generate_minimal_profile(self):
+        """Per-column summary available immediately while the full report builds"""
+        return minimal_profile(self.df).to_frame()
+
+    def generate_correlations(self):
+        """Pearson and Spearman matrices from the shared correlation service"""
+        return {
+            method: correlation_matrix(self.df, method=method)
+            for method in ('pearson', 'spearman')
+        }
 
+    @figure_cache.memoize(
+        'analysis.create_analysis_dashboard',
+        lambda self: (self.df, {k: v for k, v in vars(self.scatter).items() if k != 'logger'})
+    )
     def create_analysis_dashboard(self):
         """Create interactive analysis dashboard"""
         figures = []
@@ -52,10 +80,8 @@ class MedicineAnalyzer:
         
         for review_type in ['excellent_review_%', 'average_review_%', 'poor_review_%']:
             fig.add_trace(
-                go.Histogram(
-                    x=self.df[review_type],
-                    name=review_type.replace('_', ' ').title(),
-                    nbinsx=50
+                binned_column(self.df, review_type, 50, REVIEW_RANGE).bar(
+                    name=review_type.replace('_', ' ').title()
                 )
             )
             
@@ -71,10 +97,9 @@ class MedicineAnalyzer:
     def _create_manufacturer_analysis(self):
         """Create manufacturer performance analysis"""
         top_manufacturers = (
-            self.df.groupby('manufacturer')['excellent_review_%']
-            .agg(['mean', 'count'])
-            .sort_values('mean', ascending=False)
-            .head(10)
+            manufacturer_aggregates(self.df)
+            .top_n({'excellent_review_%': ['mean', 'count']}, by=('excellent_review_%', 'mean'))
+            .droplevel(0, axis=1)
         )
         
         fig = px.bar(
@@ -89,9 +114,9 @@ class MedicineAnalyzer:
 
     def _create_side_effects_analysis(self):
         """Create side effects analysis visualization"""
-        self.df['side_effects_count'] = self.df['side_effects'].str.count(',') + 1
+        self.df['side_effects_count'] = tokenized_column(self.df, 'side_effects').counts
         
-        fig = px.scatter(
+        fig = self.scatter.render(
             self.df,
             x='side_effects_count',
             y='excellent_review_%',
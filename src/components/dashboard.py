@@ -1,42 +1,60 @@
 import streamlit as st
 import plotly.express as px
+import plotly.graph_objects as go
+from utils.figure_cache import figure_cache
+from utils.metrics_store import metrics_store
+from utils.results_snapshot import ResultsSnapshot, results_snapshots
 
 class PerformanceDashboard:
-    def __init__(self, results):
+    def __init__(self, results=None, store=metrics_store):
+        """Summarize ``results`` once; with no results, use the shared snapshot"""
         self.results = results
-        
+        self.store = store
+        self.snapshot = (
+            ResultsSnapshot.from_results(results) if results is not None
+            else results_snapshots.current()
+        )
+
     def render_metrics(self):
         """Display key performance metrics"""
+        if self.snapshot is None:
+            st.info("No model evaluation results yet.")
+            return
         col1, col2, col3 = st.columns(3)
         
         with col1:
             st.metric(
                 "Best Model R²",
-                f"{max(r['R2'] for r in self.results.values()):.3f}"
+                f"{self.snapshot.best_r2:.3f}"
             )
         with col2:
             st.metric(
                 "Lowest MSE",
-                f"{min(r['MSE'] for r in self.results.values()):.3f}"
+                f"{self.snapshot.lowest_mse:.3f}"
             )
         with col3:
             st.metric(
                 "Average MAE",
-                f"{sum(r['MAE'] for r in self.results.values())/len(self.results):.3f}"
+                f"{self.snapshot.mean_mae:.3f}"
             )
             
+    @figure_cache.memoize(
+        'PerformanceDashboard.render_comparison_plot',
+        lambda self: self.snapshot.models if self.snapshot is not None else None
+    )
     def render_comparison_plot(self):
         """Create model comparison visualization"""
+        models = self.snapshot.models
         fig = go.Figure(data=[
             go.Bar(
                 name='R² Score',
-                x=list(self.results.keys()),
-                y=[r['R2'] for r in self.results.values()]
+                x=list(models.index),
+                y=models['R2']
             ),
             go.Bar(
                 name='MSE',
-                x=list(self.results.keys()),
-                y=[r['MSE'] for r in self.results.values()]
+                x=list(models.index),
+                y=models['MSE']
             )
         ])
         
@@ -45,3 +63,13 @@ class PerformanceDashboard:
             barmode='group'
         )
         return fig
+
+    def render_trend_plot(self, metric='R2', models=None, since=None, until=None):
+        """Plot a metric across past evaluation runs from the metrics store"""
+        runs = self.store.runs(models=models, since=since, until=until)
+        fig = px.line(
+            runs, x='timestamp', y=metric, color='model', markers=True,
+            title=f'{metric} Over Time'
+        )
+        fig.update_layout(xaxis_title='Evaluated', yaxis_title=metric)
+        return fig
@@ -1,6 +1,8 @@
+import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from utils.correlation import correlation_matrix
 
 class FeatureAnalyzer:
     def __init__(self, df):
@@ -26,8 +28,7 @@ class FeatureAnalyzer:
         
     def create_correlation_heatmap(self):
         """Create correlation analysis visualization"""
-        numeric_cols = self.df.select_dtypes(include=['float64', 'int64']).columns
-        corr_matrix = self.df[numeric_cols].corr()
+        corr_matrix = correlation_matrix(self.df)
         
         fig = px.imshow(
             corr_matrix,
@@ -1,29 +1,186 @@
-from sklearn.preprocessing import StandardScaler
-from textblob import TextBlob
 import numpy as np
+import pandas as pd
+from utils.dataset_registry import registry, shared_view
+from utils.preprocessing import PREDICTION_FEATURES
+from utils.text_features import tokenized_column
+
+TARGET_COLUMN = 'excellent_review_%'
+# Pseudo-count pulling small manufacturers' encoding towards the global mean
+TARGET_SMOOTHING = 10.0
+SCALED_FEATURES = [
+    'composition_count', 'composition_complexity', 'side_effects_count',
+    'satisfaction_score', 'manufacturer_target_encoding'
+]
+
+# Feature name -> (inputs, builder). Inputs are raw columns or other features;
+# builders get the frame and a dict of their computed inputs.
+FEATURES = {}
+
+
+def feature(name, *inputs):
+    """Declare a column-level feature computed from ``inputs``"""
+    def register(build):
+        FEATURES[name] = (inputs, build)
+        return build
+    return register
+
+
+@feature('composition_tokens', 'composition')
+def _composition_tokens(df, inputs):
+    return tokenized_column(df, 'composition')
+
+
+@feature('side_effects_tokens', 'side_effects')
+def _side_effects_tokens(df, inputs):
+    return tokenized_column(df, 'side_effects')
+
+
+@feature('composition_count', 'composition_tokens')
+def _composition_count(df, inputs):
+    return inputs['composition_tokens'].counts
+
+
+@feature('composition_complexity', 'composition_tokens')
+def _composition_complexity(df, inputs):
+    return inputs['composition_tokens'].lengths
+
+
+@feature('side_effects_count', 'side_effects_tokens')
+def _side_effects_count(df, inputs):
+    return inputs['side_effects_tokens'].counts
+
+
+@feature('satisfaction_score', 'excellent_review_%', 'average_review_%', 'poor_review_%')
+def _satisfaction_score(df, inputs):
+    return (
+        0.5 * inputs['excellent_review_%'] +
+        0.3 * inputs['average_review_%'] +
+        0.2 * (100 - inputs['poor_review_%'])
+    ) / 100
+
+
+@feature('manufacturer_code', 'manufacturer')
+def _manufacturer_code(df, inputs):
+    column = df['manufacturer']
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy().astype(np.int64)
+    return pd.factorize(column, sort=False)[0]
+
+
+def _group_stats(codes, target):
+    """Per-group non-null count and sum of ``target``"""
+    valid = (codes >= 0) & ~np.isnan(target)
+    n_groups = codes.max() + 1 if len(codes) else 0
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    sums = np.bincount(codes[valid], weights=target[valid], minlength=n_groups)
+    return counts, sums
+
+
+def _per_row(codes, per_group):
+    values = np.append(per_group, np.nan)
+    return values[np.where(codes >= 0, codes, len(values) - 1)]
+
+
+@feature('manufacturer_rating', 'manufacturer_code', TARGET_COLUMN)
+def _manufacturer_rating(df, inputs):
+    counts, sums = _group_stats(inputs['manufacturer_code'], inputs[TARGET_COLUMN])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return _per_row(inputs['manufacturer_code'], sums / counts)
+
+
+@feature('manufacturer_target_encoding', 'manufacturer_code', TARGET_COLUMN)
+def _manufacturer_target_encoding(df, inputs):
+    target = inputs[TARGET_COLUMN]
+    counts, sums = _group_stats(inputs['manufacturer_code'], target)
+    prior = np.nanmean(target) if len(target) else np.nan
+    encoded = (sums + TARGET_SMOOTHING * prior) / (counts + TARGET_SMOOTHING)
+    return _per_row(inputs['manufacturer_code'], encoded)
+
+
+def _scaled(name):
+    def build(df, inputs):
+        values = inputs[name]
+        scale = np.nanstd(values)
+        # Match StandardScaler: constant features are only centered
+        return (values - np.nanmean(values)) / (scale if scale > 0 else 1.0)
+    return build
+
+
+for _name in SCALED_FEATURES:
+    feature(f'{_name}_scaled', _name)(_scaled(_name))
+
+# Intermediate nodes shared by several features, not output columns
+INTERMEDIATES = {'composition_tokens', 'side_effects_tokens', 'manufacturer_code'}
+ALL_FEATURES = [name for name in FEATURES if name not in INTERMEDIATES]
+
 
 class FeatureEngineer:
+    """Lazily evaluated feature DAG over one dataset.
+
+    ``compute(names)`` walks only the definitions those features depend on.
+    Computed columns are kept as arrays in a cache shared by every engineer on
+    the same registered dataset, and the source frame is never modified.
+    """
+
     def __init__(self, df):
-        self.df = df.copy()
-        self.scaler = StandardScaler()
-        
+        self.df = shared_view(df)
+        self._columns = registry.artifact(self.df, 'feature_columns', lambda frame: {})
+
+    def compute(self, names):
+        """Frame holding just the requested features, computing missing ones on demand"""
+        return pd.DataFrame(
+            {name: self._column(name) for name in names},
+            index=self.df.index
+        )
+
+    def plan(self, names):
+        """Features that ``compute(names)`` would evaluate, in dependency order"""
+        order = []
+
+        def visit(name):
+            if name in order or name not in FEATURES:
+                return
+            for dependency in FEATURES[name][0]:
+                visit(dependency)
+            order.append(name)
+
+        for name in names:
+            if name not in FEATURES:
+                raise KeyError(f"Unknown feature: {name}")
+            visit(name)
+        return order
+
     def create_features(self):
         """Create all features"""
-        return (self.df
-                .pipe(self._create_composition_features)
-                .pipe(self._create_review_features)
-                .pipe(self._create_manufacturer_features)
-                .pipe(self._scale_features))
-    
-    def _create_composition_features(self, df):
-        df['composition_count'] = df['composition'].str.count(',') + 1
-        df['composition_complexity'] = df['composition'].str.len()
-        return df
-        
-    def _create_review_features(self, df):
-        df['satisfaction_score'] = (
-            0.5 * df['excellent_review_%'] +
-            0.3 * df['average_review_%'] +
-            0.2 * (100 - df['poor_review_%'])
-        ) / 100
-        return df
+        return pd.concat([self.df, self.compute(ALL_FEATURES)], axis=1)
+
+    def create_prediction_features(self):
+        """Create only the model inputs, in PREDICTION_FEATURES order"""
+        return self.compute(PREDICTION_FEATURES)
+
+    def create_text_matrices(self):
+        """Sparse ingredient and side-effect indicator matrices with their vocabularies"""
+        composition = self._column('composition_tokens')
+        side_effects = self._column('side_effects_tokens')
+        return {
+            'ingredients': (composition.matrix, composition.vocabulary),
+            'side_effects': (side_effects.matrix, side_effects.vocabulary)
+        }
+
+    def _column(self, name):
+        if name not in FEATURES:
+            # Raw input column; text columns are handed over as they are
+            column = self.df[name]
+            if pd.api.types.is_numeric_dtype(column):
+                return column.to_numpy(dtype=np.float64, na_value=np.nan)
+            return column
+
+        values = self._columns.get(name)
+        if values is None:
+            inputs, build = FEATURES[name]
+            values = build(self.df, {i: self._column(i) for i in inputs})
+            if isinstance(values, np.ndarray):
+                # Cached arrays are shared between engineers; keep them read-only
+                values.flags.writeable = False
+            self._columns[name] = values
+        return values
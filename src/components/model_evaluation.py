@@ -1,40 +1,185 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
 import numpy as np
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+import pandas as pd
 import plotly.express as px
 import logging
 
+from utils.metrics_store import METRIC_COLUMNS, metrics_store
+from utils.results_snapshot import results_snapshots
+
+
+def regression_metrics(y_true, predictions, sst=None):
+    """MSE, MAE and R2 from a single pass over the residuals"""
+    y = np.asarray(y_true, dtype=np.float64)
+    residuals = y - np.asarray(predictions, dtype=np.float64).ravel()
+    n = len(residuals)
+    sse = float(np.dot(residuals, residuals))
+    sae = float(np.abs(residuals).sum())
+    if sst is None:
+        centered = y - y.mean()
+        sst = float(np.dot(centered, centered))
+    return {
+        'MSE': sse / n,
+        'MAE': sae / n,
+        'R2': 1 - sse / sst if sst > 0 else 0.0
+    }
+
+
+def _model_threads(model, cpu_budget):
+    """Cores a model's own predict uses (n_jobs=-1 means all of them)"""
+    try:
+        n_jobs = model.get_params().get('n_jobs')
+    except AttributeError:
+        n_jobs = None
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, cpu_budget + 1 + n_jobs)
+    return max(1, min(n_jobs, cpu_budget))
+
+
+def _evaluate_model(model, X_test, y_test, sst):
+    """Predict and score one model; top-level so process pools can pickle it"""
+    start = time.perf_counter()
+    predictions = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+    return predictions, predict_seconds, regression_metrics(y_test, predictions, sst)
+
+
+def _evaluate_model_single_threaded(model, X_test, y_test, sst):
+    """_evaluate_model with the model's own n_jobs pinned to 1.
+
+    Runs in a process worker on the pickled copy, so the caller's model keeps
+    its setting while the pool's workers stay within the core count.
+    """
+    try:
+        if 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=1)
+    except AttributeError:
+        pass
+    return _evaluate_model(model, X_test, y_test, sst)
+
+
+class _CoreBudget:
+    """Counting semaphore that lets a task take several cores at once"""
+
+    def __init__(self, cores):
+        self.cores = cores
+        self._free = cores
+        self._cond = threading.Condition()
+
+    def acquire(self, n):
+        with self._cond:
+            self._cond.wait_for(lambda: self._free >= n)
+            self._free -= n
+
+    def release(self, n):
+        with self._cond:
+            self._free += n
+            self._cond.notify_all()
+
+
 class ModelEvaluationService:
-    def __init__(self, models_dict):
+    def __init__(self, models_dict, n_jobs=None, backend='thread', store=metrics_store,
+                 snapshots=results_snapshots):
         self.models = models_dict
+        self.store = store
+        self.snapshots = snapshots
         self.metrics_history = {}
+        self.timings = {}
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.backend = backend
         self.logger = logging.getLogger(__name__)
-        
+
     def evaluate_all_models(self, X_test, y_test):
-        """Comprehensive model evaluation"""
+        """Comprehensive model evaluation, running models concurrently"""
         evaluation_results = {}
-        
-        for name, model in self.models.items():
+        y = np.asarray(y_test, dtype=np.float64)
+        centered = y - y.mean()
+        sst = float(np.dot(centered, centered))
+
+        start = time.perf_counter()
+        for name, outcome in self._run(X_test, y, sst):
             try:
-                predictions = model.predict(X_test)
-                importance = self._get_feature_importance(model, X_test.columns)
-                
+                if isinstance(outcome, Exception):
+                    raise outcome
+                predictions, predict_seconds, metrics = outcome
+                model = self.models[name]
+
                 evaluation_results[name] = {
-                    'MSE': mean_squared_error(y_test, predictions),
-                    'MAE': mean_absolute_error(y_test, predictions),
-                    'R2': r2_score(y_test, predictions),
-                    'Feature_Importance': importance,
-                    'Predictions': predictions
+                    **metrics,
+                    'Feature_Importance': self._get_feature_importance(model, X_test.columns),
+                    'Predictions': predictions,
+                    'Predict_Seconds': predict_seconds
                 }
-                
+                self.timings[name] = predict_seconds
+
                 self.metrics_history[name] = self._track_metrics(
-                    evaluation_results[name]
+                    name, evaluation_results[name]
                 )
-                
+
             except Exception as e:
                 self.logger.error(f"Error evaluating {name}: {str(e)}")
-                
+
+        self.logger.info(
+            f"Evaluated {len(evaluation_results)} models in {time.perf_counter() - start:.2f}s "
+            f"({self.backend} backend, {self.n_jobs} cores)"
+        )
+        if self.snapshots is not None:
+            self.snapshots.publish(evaluation_results)
         return evaluation_results
 
+    def _run(self, X_test, y, sst):
+        """Yield (name, result or exception) for every model"""
+        names = self._schedule()
+        if self.n_jobs <= 1 or len(names) <= 1:
+            for name in names:
+                yield name, self._safe(_evaluate_model, self.models[name], X_test, y, sst)
+            return
+
+        if self.backend == 'process':
+            # Each worker gets one core, so models run single-threaded inside it
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(names))) as pool:
+                futures = {
+                    name: pool.submit(_evaluate_model_single_threaded, self.models[name], X_test, y, sst)
+                    for name in names
+                }
+                for name, future in futures.items():
+                    yield name, self._safe(future.result)
+            return
+
+        budget = _CoreBudget(self.n_jobs)
+
+        def task(name):
+            model = self.models[name]
+            cores = _model_threads(model, self.n_jobs)
+            budget.acquire(cores)
+            try:
+                return _evaluate_model(model, X_test, y, sst)
+            finally:
+                budget.release(cores)
+
+        with ThreadPoolExecutor(max_workers=min(self.n_jobs, len(names))) as pool:
+            futures = {name: pool.submit(task, name) for name in names}
+            for name, future in futures.items():
+                yield name, self._safe(future.result)
+
+    def _schedule(self):
+        """Longest-first order from past timings; models never timed go first"""
+        return sorted(self.models, key=lambda name: -self.timings.get(name, np.inf))
+
+    @staticmethod
+    def _safe(func, *args):
+        try:
+            return func(*args)
+        except Exception as e:
+            return e
+
     def _get_feature_importance(self, model, feature_names):
         """Extract feature importance if available"""
         if hasattr(model, 'feature_importances_'):
@@ -44,9 +189,21 @@ class ModelEvaluationService:
             }).sort_values('importance', ascending=False)
         return None
 
-    def _track_metrics(self, metrics):
-        """Track metrics over time"""
+    def _track_metrics(self, name, result):
+        """Track metrics over time; the full run goes to the metrics store"""
+        timestamp = datetime.now()
+        run_id = None
+        if self.store is not None:
+            try:
+                run_id = self.store.record(name, result, timestamp=timestamp.timestamp())
+            except Exception as e:
+                self.logger.error(f"Error recording metrics for {name}: {str(e)}")
         return {
-            'timestamp': datetime.now(),
-            'metrics': metrics
+            'timestamp': timestamp,
+            'run_id': run_id,
+            'metrics': {m: result[m] for m in METRIC_COLUMNS + ['Predict_Seconds']}
         }
+
+    def history(self, models=None, since=None, until=None):
+        """Scalar metrics of past runs from the metrics store"""
+        return self.store.runs(models=models, since=since, until=until)
@@ -1,54 +1,97 @@
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 import pandas as pd
 import plotly.express as px
-from datetime import datetime, timedelta
-import numpy as np
+from plotly.subplots import make_subplots
+from utils.aggregates import manufacturer_aggregates
+from utils.binning import REVIEW_RANGE, BinnedColumn, binned_column, histogram_figure
+from utils.correlation import correlation_matrix, numeric_columns
+from utils.dataset_registry import fingerprint
+from utils.figure_catalog import FigureCatalog, FigureDescriptor
+from utils.monitoring_sink import MonitoringSink
+from utils.prediction_history import PredictionHistory, RollingErrorWindow
+from utils.preprocessing import PREDICTION_FEATURES
+from utils.sketches import kll_rank_error, quantile_sketch
 
 class PerformanceMonitor:
-    def __init__(self):
+    def __init__(self, capacity=10_000, drift_window=100, drift_threshold=0.1,
+                 max_queue=10_000, drop_policy='drop_newest', sink_dir='logs/monitoring'):
         self.logger = logging.getLogger(__name__)
-        self.prediction_history = []
+        self.prediction_history = PredictionHistory(capacity)
+        self.error_window = RollingErrorWindow(self.prediction_history, drift_window)
+        # The sink worker appends while dashboards read; both go through this lock
+        self._history_lock = threading.Lock()
+        self.drift_threshold = drift_threshold
         self.model_metrics = {}
         self.setup_logging()
+        self.sink = MonitoringSink(
+            directory=sink_dir,
+            max_queue=max_queue,
+            drop_policy=drop_policy,
+            on_batch=self._process_batch
+        ).start()
         
     def setup_logging(self):
-        logging.basicConfig(
-            filename='logs/model_monitoring.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('logs/model_monitoring.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Route monitoring logs through a queue so callers never wait on disk"""
+        if self.logger.handlers:
+            return
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler('logs/model_monitoring.log')
+        stream_handler = logging.StreamHandler()
+        for handler in (file_handler, stream_handler):
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        self.log_listener = QueueListener(log_queue, file_handler, stream_handler)
+        self.log_listener.start()
+        self.logger.addHandler(QueueHandler(log_queue))
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
 
     def track_prediction(self, features, prediction, actual=None):
-        """Track prediction with performance metrics"""
-        record = {
-            'timestamp': datetime.now(),
+        """Queue a prediction for the background monitoring worker"""
+        return self.sink.submit({
+            'timestamp': time.time(),
             'features': features,
             'prediction': prediction,
-            'actual': actual,
-            'error': abs(prediction - actual) if actual else None
-        }
-        self.prediction_history.append(record)
-        self._check_model_drift(record)
-        
-    def _check_model_drift(self, record):
-        """Monitor model drift"""
-        recent_records = self.prediction_history[-100:]
-        if len(recent_records) >= 100:
-            recent_errors = [r['error'] for r in recent_records if r['error']]
-            if np.mean(recent_errors) > 0.1:
-                self.logger.warning("Potential model drift detected")
+            'actual': actual
+        })
+
+    def monitoring_metrics(self):
+        """Queue depth, drops and flush latency of the monitoring pipeline"""
+        return self.sink.metrics()
+
+    def _process_batch(self, records):
+        """Runs on the sink worker: update history and evaluate drift once per batch"""
+        with self._history_lock:
+            for record in records:
+                slot = self.prediction_history.append(
+                    record['features'],
+                    record['prediction'],
+                    record['actual'],
+                    timestamp=record['timestamp']
+                )
+                self.error_window.update(slot)
+            self._check_model_drift()
+        
+    def _check_model_drift(self):
+        """Monitor model drift from the rolling error window"""
+        if not self.error_window.full:
+            return
+        mean_error = self.error_window.mean_error
+        if mean_error is not None and mean_error > self.drift_threshold:
+            self.logger.warning(f"Potential model drift detected (mean error {mean_error:.3f})")
 
         
     def generate_monitoring_dashboard(self):
         """Create comprehensive monitoring visualizations"""
-        if not self.predictions_history:
+        with self._history_lock:
+            df = self.prediction_history.to_frame() if len(self.prediction_history) else None
+        if df is None:
             return None
-            
-        df = pd.DataFrame(self.predictions_history)
         
         figs = []
         # Prediction distribution
@@ -57,8 +100,9 @@ class PerformanceMonitor:
                                marginal='box'))
         
         # Confidence trend
-        figs.append(px.line(df, x='timestamp', y='confidence',
-                           title='Confidence Trend'))
+        if 'confidence' in df.columns:
+            figs.append(px.line(df, x='timestamp', y='confidence',
+                               title='Confidence Trend'))
         
         # Error analysis if actuals available
         if df['actual'].notna().any():
@@ -67,41 +111,103 @@ class PerformanceMonitor:
             
         return figs
 
+_model_monitor = None
+
+
+def get_model_monitor():
+    """Process-wide monitor so reruns share one sink worker"""
+    global _model_monitor
+    if _model_monitor is None:
+        _model_monitor = PerformanceMonitor()
+    return _model_monitor
+
 # Enhanced Feature Analyzer
 class EnhancedFeatureAnalyzer:
-    def __init__(self, df):
+    """Feature importance, correlation and distribution figures, built lazily"""
+
+    def __init__(self, df, lookahead=2, approximate=False):
         self.df = df
-        
+        self.lookahead = lookahead
+        # Approximate mode draws distributions from mergeable quantile sketches
+        self.approximate = approximate
+        self._lock = threading.Lock()
+        self._summaries = {}
+        self._fingerprint = None
+
+    def column_summary(self, column):
+        """Binned counts and box quantiles of one column, computed once per analyzer"""
+        with self._lock:
+            summary = self._summaries.get(column)
+        if summary is None:
+            if self.approximate:
+                summary = BinnedColumn.from_sketch(column, quantile_sketch(self.df, column))
+            else:
+                summary = binned_column(self.df, column)
+            with self._lock:
+                summary = self._summaries.setdefault(column, summary)
+        return summary
+
+    def figure_catalog(self, model=None):
+        """FigureCatalog of this analysis; figures are built when first opened"""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint(self.df)
+        descriptors = []
+
+        importances = getattr(model, 'feature_importances_', None)
+        if importances is not None:
+            descriptors.append(FigureDescriptor(
+                'importance', 'Feature Importance', 'EnhancedFeatureAnalyzer.importance',
+                lambda: self._importance_figure(model),
+                fingerprint((self._fingerprint, importances))
+            ))
+
+        descriptors.append(FigureDescriptor(
+            'correlation', 'Feature Correlation', 'EnhancedFeatureAnalyzer.correlation',
+            self._correlation_figure, self._fingerprint
+        ))
+
+        for col in numeric_columns(self.df):
+            title = f'{col} Distribution'
+            if self.approximate:
+                title += f' (approx., ±{kll_rank_error():.1%} rank)'
+            descriptors.append(FigureDescriptor(
+                f'distribution:{col}', title,
+                'EnhancedFeatureAnalyzer.distribution',
+                lambda col=col, title=title: histogram_figure(self.df, col, title=title,
+                                                              binned=self.column_summary(col)),
+                fingerprint((self._fingerprint, col, self.approximate)),
+                column=col
+            ))
+
+        catalog = FigureCatalog(descriptors, lookahead=self.lookahead)
+        catalog.prefetch()
+        return catalog
+
     def analyze_features(self, model=None):
-        """Comprehensive feature analysis"""
-        figs = []
-        
-        # Feature importance if model available
-        if model and hasattr(model, 'feature_importances_'):
-            importance_df = pd.DataFrame({
-                'feature': self.df.columns,
-                'importance': model.feature_importances_
-            }).sort_values('importance', ascending=False)
-            
-            figs.append(px.bar(importance_df,
-                             x='feature', y='importance',
-                             title='Feature Importance Analysis'))
-            
-        # Correlation analysis
-        numeric_cols = self.df.select_dtypes(include=['float64', 'int64']).columns
-        corr_matrix = self.df[numeric_cols].corr()
-        
-        figs.append(px.imshow(corr_matrix,
-                            title='Feature Correlation Analysis',
-                            color_continuous_scale='RdBu'))
-        
-        # Feature distributions
-        for col in numeric_cols:
-            figs.append(px.histogram(self.df, x=col,
-                                   title=f'{col} Distribution',
-                                   marginal='box'))
-            
-        return figs
+        """Comprehensive feature analysis, every figure built"""
+        return self.figure_catalog(model).figures()
+
+    def _feature_names(self, model):
+        names = getattr(model, 'feature_names_in_', None)
+        if names is not None:
+            return list(names)
+        n = len(model.feature_importances_)
+        return PREDICTION_FEATURES if len(PREDICTION_FEATURES) == n else list(self.df.columns[:n])
+
+    def _importance_figure(self, model):
+        importance_df = pd.DataFrame({
+            'feature': self._feature_names(model),
+            'importance': model.feature_importances_
+        }).sort_values('importance', ascending=False)
+
+        return px.bar(importance_df,
+                      x='feature', y='importance',
+                      title='Feature Importance Analysis')
+
+    def _correlation_figure(self):
+        return px.imshow(correlation_matrix(self.df),
+                         title='Feature Correlation Analysis',
+                         color_continuous_scale='RdBu')
 
 # Enhanced Medicine Visualizer
 class EnhancedMedicineVisualizer:
@@ -119,28 +225,27 @@ class EnhancedMedicineVisualizer:
         review_cols = ['excellent_review_%', 'average_review_%', 'poor_review_%']
         for i, col in enumerate(review_cols, 1):
             fig.add_trace(
-                go.Histogram(x=self.df[col],
-                           name=col.split('_')[0].title(),
-                           nbinsx=50),
+                binned_column(self.df, col, 50, REVIEW_RANGE).bar(
+                    name=col.split('_')[0].title()),
                 row=1, col=i
             )
         figs.append(fig)
         
         # Manufacturer analysis
-        top_manufacturers = (
-            self.df.groupby('manufacturer')
-            .agg({
+        top_manufacturers = manufacturer_aggregates(self.df).top_n(
+            {
                 'excellent_review_%': ['mean', 'count', 'std'],
                 'side_effects_count': 'mean'
-            })
-            .sort_values(('excellent_review_%', 'mean'), ascending=False)
-            .head(10)
+            },
+            by='excellent_review_%_mean',
+            n=10,
+            flat=True
         )
         
         figs.append(px.bar(top_manufacturers,
                           y=top_manufacturers.index,
-                          x=('excellent_review_%', 'mean'),
-                          error_x=('excellent_review_%', 'std'),
+                          x='excellent_review_%_mean',
+                          error_x='excellent_review_%_std',
                           title='Top Manufacturers Analysis'))
         
         return figs
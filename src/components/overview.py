@@ -1,28 +1,38 @@
-def render_overview():
+import streamlit as st
+import plotly.express as px
+from utils.results_snapshot import results_snapshots
+
+def render_overview(snapshot=None):
     st.title("Medicine Effectiveness Analysis")
-    
+
+    snapshot = snapshot or results_snapshots.current()
+    if snapshot is None:
+        st.info("No model evaluation results yet. Train and evaluate a model to populate the overview.")
+        return
+
     # Key Metrics
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Best Model R²", "0.925")
+        st.metric("Best Model R²", f"{snapshot.best_r2:.3f}", help=snapshot.best_model)
     with col2:
-        st.metric("Prediction Accuracy", "92.5%")
+        st.metric("Mean MAE", f"{snapshot.mean_mae:.3f}")
     with col3:
-        st.metric("MSE", "49.003")
+        st.metric("MSE", f"{snapshot.lowest_mse:.3f}", help=snapshot.lowest_mse_model)
 
     # Model Performance Comparison
     fig = px.bar(
-        x=['RandomForest', 'DecisionTree', 'SVR'],
-        y=[0.925, 0.917, 0.854],
-        title='Model Performance Comparison'
+        x=list(snapshot.models.index),
+        y=snapshot.models['R2'],
+        title='Model Performance Comparison',
+        labels={'x': 'Model', 'y': 'R²'}
     )
     st.plotly_chart(fig, use_container_width=True)
 
     # Feature Importance
     st.subheader("Feature Importance")
-    importance_data = {
-        'feature': ['satisfaction_score', 'composition_length', 'side_effects_count'],
-        'importance': [0.977890, 0.022069, 0.000041]
-    }
-    fig = px.bar(importance_data, x='feature', y='importance')
-    st.plotly_chart(fig, use_container_width=True)
+    if snapshot.importances is None:
+        st.caption(f"{snapshot.best_model} does not report feature importances.")
+    else:
+        fig = px.bar(snapshot.importances, x='feature', y='importance')
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Results snapshot v{snapshot.version}, updated {snapshot.updated:%Y-%m-%d %H:%M}")
@@ -18,11 +18,6 @@ def render_predictions():
             min_value=0
         )
         
-        satisfaction = st.slider(
-            "Patient Satisfaction Score",
-            0, 100, 50
-        )
-        
         manufacturer_rating = st.slider(
             "Manufacturer Rating",
             0, 100, 50
@@ -36,7 +31,6 @@ def render_predictions():
                 input_data = preprocess_input(
                     composition_count,
                     side_effects,
-                    satisfaction,
                     manufacturer_rating
                 )
                 prediction = model.predict(input_data)[0]
@@ -0,0 +1,71 @@
+import logging
+import numpy as np
+from utils.model_registry import model_registry
+from utils.preprocessing import PreprocessingPipeline
+
+class MedicinePredictionService:
+    """Prediction service backed by the process-wide model registry"""
+
+    # Form field -> preprocessing feature
+    INPUT_FIELDS = {
+        'composition_count': 'composition_count',
+        'side_effects': 'side_effects_count',
+        'satisfaction': 'satisfaction_score',
+        'manufacturer_rating': 'manufacturer_rating'
+    }
+    # The form asks for satisfaction in percent; FeatureEngineer's satisfaction_score is 0-1
+    INPUT_SCALES = {'satisfaction': 0.01}
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.preprocessor_path = PreprocessingPipeline.path_for(model_path)
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def model(self):
+        # Cheap on a hit; picks up a retrained model file without a restart
+        return model_registry.get(self.model_path)
+
+    def predict(self, features):
+        """Predict effectiveness for one set of form inputs"""
+        preprocessor = self._preprocessor()
+        by_feature = {
+            self.INPUT_FIELDS.get(k, k): v * self.INPUT_SCALES.get(k, 1)
+            for k, v in features.items()
+        }
+        model = self.model
+        X = preprocessor.transform_inputs(by_feature)
+        prediction = float(model.predict(X)[0])
+
+        return {
+            'prediction': prediction,
+            'tree_spread': self._tree_spread(model, X)
+        }
+
+    def _preprocessor(self):
+        # The artifact goes through the registry too, so it reloads with the model
+        return PreprocessingPipeline.from_state(model_registry.get(self.preprocessor_path))
+
+    def _tree_spread(self, model, X):
+        """Std of the ensemble members' predictions in points; None for single estimators.
+
+        This is disagreement between trees, not a calibrated confidence.
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None:
+            return None
+        # Trees split on float32; converting once skips each estimator's input validation
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        votes = np.array([est.tree_.predict(X)[0, 0] for est in np.ravel(estimators)])
+        return float(votes.std())
+
+
+
+_services = {}
+
+
+def get_prediction_service(model_path):
+    """Process-wide MedicinePredictionService for a model file"""
+    if model_path not in _services:
+        _services[model_path] = MedicinePredictionService(model_path)
+    return _services[model_path]
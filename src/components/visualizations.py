@@ -3,14 +3,21 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
-import numpy as np
 import logging
 from datetime import datetime
 from typing import List, Dict, Optional
+from utils.aggregates import manufacturer_aggregates
+from utils.binning import REVIEW_RANGE, BinnedColumn, binned_column
+from utils.correlation import correlation_matrix
+from utils.dataset_registry import shared_view
+from utils.figure_cache import figure_cache
+from utils.sketches import distinct_sketch, kll_rank_error, quantile_sketch, top_sketch
 
 class MedicineAnalyzer:
-    def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+    def __init__(self, df: pd.DataFrame, approximate: bool = False):
+        self.df = shared_view(df)
+        # Approximate mode reads distributions and distinct counts from dataset sketches
+        self.approximate = approximate
         self.logger = self._setup_logger()
         self._validate_dataframe()
         
@@ -36,10 +43,15 @@ class MedicineAnalyzer:
             
         # Validate review percentages
         for col in ['excellent_review_%', 'average_review_%', 'poor_review_%']:
-            if not self.df[col].between(0, 100).all():
+            # NaNs are left alone so the frame keeps sharing the dataset's buffers
+            if (self.df[col].notna() & ~self.df[col].between(0, 100)).any():
                 self.logger.warning(f"Invalid percentages found in {col}")
                 self.df[col] = self.df[col].clip(0, 100)
 
+    @figure_cache.memoize(
+        'visualizations.create_analysis_dashboard',
+        lambda self: (self.df, self.approximate)
+    )
     def create_analysis_dashboard(self) -> List[go.Figure]:
         """Generate comprehensive analysis dashboard"""
         try:
@@ -77,35 +89,32 @@ class MedicineAnalyzer:
         fig = make_subplots(
             rows=1, cols=3,
             subplot_titles=('Excellent', 'Average', 'Poor'),
-            specs=[[{'type': 'histogram'}] * 3]
+            specs=[[{'type': 'xy'}] * 3]
         )
         
         review_cols = ['excellent_review_%', 'average_review_%', 'poor_review_%']
         colors = ['#2ecc71', '#3498db', '#e74c3c']
         
         for i, (col, color) in enumerate(zip(review_cols, colors), 1):
+            # Counts are binned server-side; only per-bin summaries reach the browser
+            if self.approximate:
+                binned = BinnedColumn.from_sketch(col, quantile_sketch(self.df, col), 50, REVIEW_RANGE)
+            else:
+                binned = binned_column(self.df, col, 50, REVIEW_RANGE)
             fig.add_trace(
-                go.Histogram(
-                    x=self.df[col],
+                binned.bar(
                     name=col.split('_')[0].title(),
-                    nbinsx=50,
-                    marker_color=color,
-                    customdata=np.stack((
-                        self.df['manufacturer'],
-                        self.df['side_effects_count']
-                    ), axis=-1),
-                    hovertemplate=(
-                        "<b>%{x:.1f}%</b> Reviews<br>"
-                        "Manufacturer: %{customdata[0]}<br>"
-                        "Side Effects: %{customdata[1]}<extra></extra>"
-                    )
+                    color=color
                 ),
                 row=1, col=i
             )
         
+        title = "Review Distribution Analysis"
+        if self.approximate:
+            title += f" (approx., ±{kll_rank_error():.1%} rank)"
         fig.update_layout(
             height=500,
-            title_text="Review Distribution Analysis",
+            title_text=title,
             showlegend=False,
             bargap=0.1,
             template="plotly_white"
@@ -115,34 +124,75 @@ class MedicineAnalyzer:
 
     def _create_manufacturer_analysis(self) -> go.Figure:
         """Create enhanced manufacturer performance analysis"""
-        top_manufacturers = (
-            self.df.groupby('manufacturer')
-            .agg({
-                'excellent_review_%': ['mean', 'count', 'std'],
-                'side_effects_count': ['mean', 'std'],
-                'satisfaction_score': 'mean'
-            })
-            .sort_values(('excellent_review_%', 'mean'), ascending=False)
-            .head(10)
-        )
-        
+        spec = {
+            'excellent_review_%': ['mean', 'count', 'std'],
+            'side_effects_count': ['mean', 'std'],
+            'satisfaction_score': 'mean'
+        }
+        aggregates = manufacturer_aggregates(self.df)
+        title = 'Top Manufacturers Performance'
+        if self.approximate:
+            # Rank only the most-listed manufacturers, found by the heavy-hitter sketch,
+            # so a handful of reviews cannot top the chart
+            candidates = top_sketch(self.df, 'manufacturer').top()
+            summary = aggregates.summary(spec, flat=True)
+            top_manufacturers = (summary[summary.index.isin(candidates.index)]
+                                 .sort_values('excellent_review_%_mean', ascending=False)
+                                 .head(10))
+            distinct = distinct_sketch(self.df, 'manufacturer')
+            estimate = distinct.estimate()
+            title += (f' (among the {len(candidates)} most listed of ~{estimate:,.0f} '
+                      f'± {distinct.relative_error * estimate:,.0f} manufacturers)')
+        else:
+            top_manufacturers = aggregates.top_n(spec, by='excellent_review_%_mean', n=10, flat=True)
+
         fig = px.bar(
             top_manufacturers,
             y=top_manufacturers.index,
-            x=('excellent_review_%', 'mean'),
-            error_x=('excellent_review_%', 'std'),
-            title='Top Manufacturers Performance',
+            x='excellent_review_%_mean',
+            error_x='excellent_review_%_std',
+            title=title,
             labels={
-                'y': 'Manufacturer',
-                'x': 'Average Excellent Review %'
+                'manufacturer': 'Manufacturer',
+                'excellent_review_%_mean': 'Average Excellent Review %'
             },
-            color=('satisfaction_score', 'mean'),
+            color='satisfaction_score_mean',
             color_continuous_scale='RdYlBu',
             hover_data={
-                ('side_effects_count', 'mean'): ':.2f',
-                ('excellent_review_%', 'count'): True
+                'side_effects_count_mean': ':.2f',
+                'excellent_review_%_count': True
             }
         )
         
         fig.update_layout(template="plotly_white")
         return fig
+
+    def _create_correlation_analysis(self) -> go.Figure:
+        """Create Pearson and Spearman correlation heatmaps"""
+        fig = make_subplots(
+            rows=1, cols=2,
+            subplot_titles=('Pearson', 'Spearman'),
+            horizontal_spacing=0.15
+        )
+        
+        for i, method in enumerate(['pearson', 'spearman'], 1):
+            corr = correlation_matrix(self.df, method=method)
+            fig.add_trace(
+                go.Heatmap(
+                    z=corr.values,
+                    x=corr.columns,
+                    y=corr.index,
+                    zmin=-1, zmax=1,
+                    colorscale='RdBu',
+                    showscale=i == 2,
+                    hovertemplate="%{y} / %{x}: %{z:.2f}<extra></extra>"
+                ),
+                row=1, col=i
+            )
+        
+        fig.update_layout(
+            height=600,
+            title_text="Feature Correlation Analysis",
+            template="plotly_white"
+        )
+        return fig
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import registry
+
+AGGREGATE_COLUMNS = [
+    'excellent_review_%', 'average_review_%', 'poor_review_%',
+    'side_effects_count', 'satisfaction_score'
+]
+
+
+class ManufacturerAggregates:
+    """Per-manufacturer count, sum and sum of squares for each numeric column.
+
+    Mean, std and top-N are derived from these sufficient statistics in
+    O(#manufacturers), and new rows are folded in with ``updated`` without
+    revisiting the rows already aggregated.
+    """
+
+    def __init__(self, manufacturers, columns, counts, sums, sumsq, rows):
+        self.manufacturers = list(manufacturers)
+        self.columns = list(columns)
+        self.counts = counts   # (m, k) non-null values per manufacturer and column
+        self.sums = sums       # (m, k)
+        self.sumsq = sumsq     # (m, k)
+        self.rows = rows       # (m,) rows per manufacturer, nulls included
+        self._positions = {name: i for i, name in enumerate(self.manufacturers)}
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        columns = [c for c in (columns or AGGREGATE_COLUMNS) if c in df.columns]
+        empty = np.zeros((0, len(columns)))
+        store = cls([], columns, empty, empty.copy(), empty.copy(), np.zeros(0, dtype=np.int64))
+        return store.updated(df)
+
+    def updated(self, df):
+        """New store including the rows of ``df``"""
+        codes, uniques = pd.factorize(df['manufacturer'], sort=False)
+        new_names = [name for name in uniques if name not in self._positions]
+        manufacturers = self.manufacturers + new_names
+        positions = dict(self._positions)
+        positions.update({name: len(self.manufacturers) + i for i, name in enumerate(new_names)})
+
+        m = len(manufacturers)
+        counts, sums, sumsq = (self._grow(a, m) for a in (self.counts, self.sums, self.sumsq))
+        rows = np.concatenate([self.rows, np.zeros(len(new_names), dtype=np.int64)])
+
+        # Map chunk-local codes to store positions; rows without a manufacturer are skipped
+        remap = np.array([positions[name] for name in uniques], dtype=np.int64)
+        valid = codes >= 0
+        slots = remap[codes[valid]]
+        rows += np.bincount(slots, minlength=m)
+
+        for j, col in enumerate(self.columns):
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[valid]
+            present = ~np.isnan(values)
+            s, v = slots[present], values[present]
+            counts[:, j] += np.bincount(s, minlength=m)
+            sums[:, j] += np.bincount(s, weights=v, minlength=m)
+            sumsq[:, j] += np.bincount(s, weights=v * v, minlength=m)
+
+        return ManufacturerAggregates(manufacturers, self.columns, counts, sums, sumsq, rows)
+
+    def mean(self, column):
+        j = self.columns.index(column)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.sums[:, j] / self.counts[:, j]
+
+    def std(self, column, ddof=1):
+        """Sample standard deviation, matching pandas' default"""
+        j = self.columns.index(column)
+        n = self.counts[:, j]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            var = (self.sumsq[:, j] - self.sums[:, j] ** 2 / n) / (n - ddof)
+        return np.sqrt(np.clip(var, 0, None))
+
+    def count(self, column):
+        return self.counts[:, self.columns.index(column)].astype(np.int64)
+
+    def summary(self, spec, flat=False):
+        """Frame shaped like ``df.groupby('manufacturer').agg(spec)``.
+
+        With ``flat=True`` columns are named ``<column>_<stat>`` instead of
+        (column, stat) tuples, which is what plotly express expects.
+        """
+        data = {}
+        for column, stats in spec.items():
+            for stat in ([stats] if isinstance(stats, str) else stats):
+                name = f'{column}_{stat}' if flat else (column, stat)
+                data[name] = getattr(self, stat)(column)
+        index = pd.Index(self.manufacturers, name='manufacturer')
+        return pd.DataFrame(data, index=index)
+
+    def top_n(self, spec, by, n=10, ascending=False, flat=False):
+        """Top ``n`` manufacturers of ``summary(spec, flat)`` sorted on column ``by``"""
+        return self.summary(spec, flat).sort_values(by, ascending=ascending).head(n)
+
+    @staticmethod
+    def _grow(values, m):
+        grown = np.zeros((m, values.shape[1]))
+        grown[:len(values)] = values
+        return grown
+
+
+def manufacturer_aggregates(df, columns=None):
+    """Aggregate store for ``df``, cached per registered dataset"""
+    columns = [c for c in (columns or AGGREGATE_COLUMNS) if c in df.columns]
+    return registry.artifact(
+        df,
+        f"manufacturer_aggregates:{','.join(columns)}",
+        lambda frame: ManufacturerAggregates.from_frame(frame, columns)
+    )
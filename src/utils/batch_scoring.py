@@ -0,0 +1,166 @@
+"""Batch scoring of whole medicine catalogs.
+
+Usage (from ``src``):
+    python -m utils.batch_scoring data/Medicine_Details.csv \\
+        --model models/random_forest.joblib --output reports/predictions --workers 4
+"""
+import argparse
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from components.feature_engineering import FEATURES, FeatureEngineer
+from utils.chunked_ingest import ChunkedCSVIngest
+from utils.dataset_cache import write_frame
+from utils.manufacturer_index import ManufacturerIndex
+from utils.model_registry import model_registry
+from utils.preprocessing import PreprocessingPipeline
+
+ID_COLUMNS = ['medicine_name', 'manufacturer']
+RATING_FEATURE = 'manufacturer_rating'
+
+
+def _predict_chunk(model_path, X):
+    """Worker entry point; the registry keeps one memory-mapped model per process"""
+    return model_registry.get(model_path).predict(X)
+
+
+class BatchScorer:
+    """Score an entire dataset with vectorized features and chunked predict calls"""
+
+    def __init__(self, model_path='models/random_forest.joblib', chunksize=100_000, n_workers=1,
+                 manufacturer_index=None):
+        self.model_path = str(model_path)
+        # Reference statistics for manufacturer_rating when the artifact stores no ratings
+        self.manufacturer_index = manufacturer_index
+        self.preprocessor_path = PreprocessingPipeline.path_for(model_path)
+        self.chunksize = chunksize
+        self.n_workers = n_workers
+        self.logger = logging.getLogger(__name__)
+
+    def score(self, data, output_path=None):
+        """Score a DataFrame or CSV path; returns (results frame, summary dict)"""
+        start = time.perf_counter()
+        df = self._load(data)
+
+        preprocessor = PreprocessingPipeline.from_state(model_registry.get(self.preprocessor_path))
+        X = preprocessor.transform(self._features(df, preprocessor))
+
+        predictions = self._predict(X)
+
+        results = df[[c for c in ID_COLUMNS if c in df.columns]].copy()
+        results['predicted_effectiveness'] = predictions.astype(np.float32)
+
+        if output_path is not None:
+            output_path = self._write(results, output_path)
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            'rows': len(results),
+            'seconds': elapsed,
+            'rows_per_sec': len(results) / elapsed if elapsed > 0 else 0.0,
+            'workers': self.n_workers,
+            'output': str(output_path) if output_path is not None else None
+        }
+        self.logger.info(
+            f"Scored {summary['rows']} rows in {elapsed:.2f}s "
+            f"({summary['rows_per_sec']:,.0f} rows/sec, {self.n_workers} workers)"
+        )
+        return results, summary
+
+    def _features(self, df, preprocessor):
+        """Model inputs; manufacturer_rating comes from training-time ratings, not the scored rows"""
+        names = [n for n in preprocessor.feature_names if n != RATING_FEATURE]
+        engineer = FeatureEngineer(df)
+        required = {
+            column for step in engineer.plan(names) for column in FEATURES[step][0]
+            if column not in FEATURES
+        }
+        missing = sorted(required - set(df.columns))
+        if missing:
+            raise ValueError(
+                f"Model inputs {names} need columns missing from the data: {missing}"
+            )
+        features = engineer.compute(names)
+
+        if RATING_FEATURE in preprocessor.feature_names:
+            if preprocessor.manufacturer_ratings is not None:
+                features[RATING_FEATURE] = preprocessor.rate_manufacturers(df['manufacturer'])
+            elif self.manufacturer_index is not None:
+                features[RATING_FEATURE] = self.manufacturer_index.lookup(df['manufacturer'])
+            else:
+                raise ValueError(
+                    "The preprocessing artifact stores no manufacturer ratings; "
+                    "pass a reference dataset (--reference) to rate manufacturers"
+                )
+        return features
+
+    def _load(self, data):
+        if isinstance(data, pd.DataFrame):
+            return data
+        return ChunkedCSVIngest().read(data)
+
+    def _predict(self, X):
+        chunks = [X[i:i + self.chunksize] for i in range(0, len(X), self.chunksize)]
+        if not chunks:
+            return np.empty(0)
+
+        if self.n_workers <= 1 or len(chunks) == 1:
+            model = model_registry.get(self.model_path)
+            return np.concatenate([model.predict(chunk) for chunk in chunks])
+
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            parts = pool.map(_predict_chunk, [self.model_path] * len(chunks), chunks)
+            return np.concatenate(list(parts))
+
+    def _write(self, results, output_path):
+        """Parquet when requested (CSV if no parquet engine), otherwise a .npy column bundle.
+
+        Returns the path actually written.
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if output_path.suffix == '.parquet':
+            try:
+                results.to_parquet(output_path, index=False)
+            except ImportError as e:
+                output_path = output_path.with_suffix('.csv')
+                self.logger.warning(f"Parquet unavailable ({str(e)}); writing {output_path} instead")
+                results.to_csv(output_path, index=False)
+        else:
+            write_frame(output_path, results)
+        self.logger.info(f"Wrote predictions to {output_path}")
+        return output_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a medicine dataset in batch")
+    parser.add_argument('data', help="CSV file to score")
+    parser.add_argument('--model', default='models/random_forest.joblib')
+    parser.add_argument('--output', default='reports/predictions',
+                        help="Output directory, or a .parquet file")
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--reference', default=None,
+                        help="CSV whose manufacturer statistics rate the scored rows")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Registered datasets are shared as shallow views; see app.py
+    pd.set_option('mode.copy_on_write', True)
+    index = None
+    if args.reference is not None:
+        index = ManufacturerIndex.from_frame(ChunkedCSVIngest().read(args.reference))
+    scorer = BatchScorer(args.model, chunksize=args.chunksize, n_workers=args.workers,
+                         manufacturer_index=index)
+    _, summary = scorer.score(args.data, output_path=args.output)
+    print(f"{summary['rows']:,} rows in {summary['seconds']:.2f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/sec) -> {summary['output']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from utils.dataset_registry import registry
+
+REVIEW_RANGE = (0, 100)
+
+
+class BinnedColumn:
+    """Histogram counts plus per-bin hover summaries for one column"""
+
+    def __init__(self, column, edges, counts, top_labels, bin_means, quantiles):
+        self.column = column
+        self.edges = edges
+        self.counts = counts
+        self.top_labels = top_labels   # per-bin "A (12), B (7)" strings
+        self.bin_means = bin_means     # per-bin mean of the companion value column
+        self.quantiles = quantiles     # min, q1, median, q3, max of the column
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def widths(self):
+        return np.diff(self.edges)
+
+    @classmethod
+    def from_frame(cls, df, column, bins=50, value_range=None, label_column='manufacturer',
+                   mean_column='side_effects_count', top_k=3, quantiles=None):
+        values = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(values)
+        values = values[finite]
+
+        if value_range is None:
+            value_range = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+        edges = np.histogram_bin_edges(values, bins=bins, range=value_range)
+        # Right edge is inclusive, as in np.histogram
+        idx = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, bins - 1)
+        in_range = (values >= edges[0]) & (values <= edges[-1])
+        idx, values = idx[in_range], values[in_range]
+        counts = np.bincount(idx, minlength=bins)
+
+        top_labels = cls._top_labels(df, label_column, finite, in_range, idx, bins, top_k)
+        bin_means = cls._bin_means(df, mean_column, finite, in_range, idx, bins)
+        if quantiles is None:
+            quantiles = _quantiles(values)
+        return cls(column, edges, counts, top_labels, bin_means, quantiles)
+
+    @classmethod
+    def from_sketch(cls, column, sketch, bins=50, value_range=None):
+        """Approximate counts and quantiles from a QuantileSketch, without per-bin summaries"""
+        if value_range is None:
+            value_range = (sketch.min, sketch.max) if sketch.n else (0.0, 1.0)
+        edges = np.histogram_bin_edges([], bins=bins, range=value_range)
+        return cls(
+            column, edges, sketch.histogram(edges), [''] * bins, np.full(bins, np.nan),
+            sketch.quantiles([0, 0.25, 0.5, 0.75, 1])
+        )
+
+    @staticmethod
+    def _top_labels(df, label_column, finite, in_range, idx, bins, top_k):
+        if label_column not in df.columns:
+            return [''] * bins
+        codes, uniques = pd.factorize(df[label_column], sort=False)
+        codes = codes[finite][in_range]
+        valid = codes >= 0
+        # One bincount over (bin, label) pairs gives every bin's label counts
+        pairs = np.bincount(
+            idx[valid] * len(uniques) + codes[valid],
+            minlength=bins * len(uniques)
+        ).reshape(bins, len(uniques))
+
+        labels = []
+        for row in pairs:
+            top = np.argsort(row)[::-1][:top_k]
+            labels.append(', '.join(f'{uniques[i]} ({row[i]})' for i in top if row[i] > 0))
+        return labels
+
+    @staticmethod
+    def _bin_means(df, mean_column, finite, in_range, idx, bins):
+        if mean_column not in df.columns:
+            return np.full(bins, np.nan)
+        values = df[mean_column].to_numpy(dtype=np.float64, na_value=np.nan)[finite][in_range]
+        present = ~np.isnan(values)
+        sums = np.bincount(idx[present], weights=values[present], minlength=bins)
+        n = np.bincount(idx[present], minlength=bins)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / n
+
+    def bar(self, name=None, color=None):
+        """Render as a go.Bar carrying only per-bin hover data"""
+        customdata = np.array(
+            list(zip(self.edges[:-1], self.edges[1:], self.top_labels, self.bin_means)),
+            dtype=object
+        )
+        hovertemplate = "<b>%{customdata[0]:.1f} - %{customdata[1]:.1f}</b><br>Count: %{y}"
+        if any(self.top_labels):
+            hovertemplate += (
+                "<br>Top manufacturers: %{customdata[2]}<br>"
+                "Mean side effects: %{customdata[3]:.2f}"
+            )
+        hovertemplate += "<extra></extra>"
+        return go.Bar(
+            x=self.centers,
+            y=self.counts,
+            width=self.widths,
+            name=name or self.column,
+            marker_color=color,
+            customdata=customdata,
+            hovertemplate=hovertemplate
+        )
+
+    def box(self, name=None):
+        """Box trace drawn from the precomputed quantiles"""
+        low, q1, median, q3, high = self.quantiles
+        return go.Box(
+            name=name or self.column,
+            q1=[q1], median=[median], q3=[q3],
+            lowerfence=[low], upperfence=[high],
+            orientation='h',
+            showlegend=False
+        )
+
+
+def _quantiles(values):
+    return np.quantile(values, [0, 0.25, 0.5, 0.75, 1]) if len(values) else np.full(5, np.nan)
+
+
+def column_quantiles(df, column):
+    """Min, quartiles and max of the finite values of ``df[column]``, cached per registered dataset"""
+    def build(frame):
+        values = frame[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        return _quantiles(values[np.isfinite(values)])
+    return registry.artifact(df, f"quantiles:{column}", build)
+
+
+def binned_column(df, column, bins=50, value_range=None):
+    """BinnedColumn for ``df[column]``, cached per registered dataset"""
+    # Hover summaries depend on which companion columns the frame carries
+    companions = [c for c in ('manufacturer', 'side_effects_count') if c in df.columns]
+    # The box marginal describes the whole column, so every binning shares one quantile pass
+    return registry.artifact(
+        df,
+        f"binned:{column}:{bins}:{value_range}:{','.join(companions)}",
+        lambda frame: BinnedColumn.from_frame(
+            frame, column, bins=bins, value_range=value_range,
+            quantiles=column_quantiles(frame, column)
+        )
+    )
+
+
+def histogram_figure(df, column, title=None, bins=50, value_range=None, marginal_box=True,
+                     binned=None):
+    """Pre-binned replacement for ``px.histogram(df, x=column, marginal='box')``"""
+    if binned is None:
+        binned = binned_column(df, column, bins, value_range)
+    if not marginal_box:
+        fig = go.Figure(binned.bar(name=column))
+    else:
+        fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8],
+                            vertical_spacing=0.02)
+        fig.add_trace(binned.box(name=column), row=1, col=1)
+        fig.add_trace(binned.bar(name=column), row=2, col=1)
+    fig.update_layout(title=title or f'{column} Distribution', bargap=0, showlegend=False)
+    return fig
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import registry
+
+
+def numeric_columns(df):
+    """Numeric, non-boolean columns in frame order"""
+    return [
+        col for col in df.columns
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+    ]
+
+
+class CoMoments:
+    """Pairwise co-moment sufficient statistics for a set of numeric columns.
+
+    For every column pair the count of rows where both are present, the sums
+    and sums of squares over those rows and the cross-product are kept as
+    k x k matrices, so the correlation matrix matches pandas' pairwise-complete
+    ``corr()`` and appended rows are folded in by ``updated`` at O(k^2) per row.
+    Values are shifted by a per-column reference to keep the raw moments
+    well conditioned; ``dtype=np.float32`` halves the matmul cost for wide frames.
+    """
+
+    def __init__(self, columns, shift, n, sums, squares, cross, dtype=np.float64):
+        self.columns = list(columns)
+        self.shift = shift
+        self.n = n
+        self.sums = sums         # sums[i, j]: sum of column i over rows where j is present
+        self.squares = squares   # squares[i, j]: same for the squared values
+        self.cross = cross
+        self.dtype = dtype
+
+    @classmethod
+    def from_frame(cls, df, columns, dtype=np.float64):
+        values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(columns))
+        zeros = np.zeros((len(columns), len(columns)))
+        empty = cls(columns, shift, zeros, zeros.copy(), zeros.copy(), zeros.copy(), dtype)
+        return empty._accumulate(values)
+
+    def updated(self, df):
+        """Statistics including the rows of ``df``"""
+        missing = [c for c in self.columns if c not in df.columns]
+        if missing:
+            raise KeyError(missing[0])
+        return self._accumulate(df[self.columns].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def _accumulate(self, values):
+        present = ~np.isnan(values)
+        X = np.where(present, values - self.shift, 0).astype(self.dtype)
+        M = present.astype(self.dtype)
+        return CoMoments(
+            self.columns, self.shift,
+            self.n + (M.T @ M),
+            self.sums + (X.T @ M),
+            self.squares + ((X * X).T @ M),
+            self.cross + (X.T @ X),
+            self.dtype
+        )
+
+    def correlation(self, columns=None):
+        """Pearson correlation matrix as a DataFrame"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = np.where(self.n > 1, self.n, np.nan)
+            cov = self.cross - self.sums * self.sums.T / n
+            var = self.squares - self.sums ** 2 / n
+            corr = cov / np.sqrt(var * var.T)
+        corr = np.clip(corr, -1, 1)
+        np.fill_diagonal(corr, np.where(np.diag(self.n) > 1, 1.0, np.nan))
+        matrix = pd.DataFrame(corr, index=self.columns, columns=self.columns)
+        return matrix if columns is None else matrix.loc[columns, columns]
+
+
+class _SpearmanMoments:
+    """Rank co-moments; ranks change on append, so this is rebuilt, not updated"""
+
+    def __init__(self, moments):
+        self.moments = moments
+
+    def correlation(self, columns=None):
+        return self.moments.correlation(columns)
+
+
+def _ranks(df, columns):
+    # One average-rank pass per column; NaNs stay NaN
+    return pd.DataFrame({col: df[col].rank(method='average') for col in columns})
+
+
+def correlation_matrix(df, method='pearson', columns=None, float32=False):
+    """Pearson or Spearman matrix of ``df``'s numeric columns, cached per registered dataset.
+
+    Pearson statistics are carried forward on ``registry.append``; Spearman
+    reuses one cached ranking of the dataset. With missing values Spearman
+    ranks each column once rather than per column pair.
+    """
+    all_columns = numeric_columns(df)
+    dtype = np.float32 if float32 else np.float64
+    if method == 'pearson':
+        source = lambda frame: CoMoments.from_frame(frame, all_columns, dtype)
+    elif method == 'spearman':
+        source = lambda frame: _SpearmanMoments(
+            CoMoments.from_frame(_ranks(frame, all_columns), all_columns, dtype)
+        )
+    else:
+        raise ValueError(f"Unsupported correlation method: {method}")
+
+    moments = registry.artifact(
+        df, f"correlation:{method}:{','.join(all_columns)}:{np.dtype(dtype).name}", source
+    )
+    return moments.correlation(columns)
@@ -2,8 +2,12 @@ import pandas as pd
 import kaggle
 from dotenv import load_dotenv
 import os
+import json
 import logging
 from pathlib import Path
+from utils.chunked_ingest import ChunkedCSVIngest
+from utils.dataset_cache import DatasetCache
+from utils.schema import validate_frame
 
 class DataLoader:
     def __init__(self):
@@ -12,6 +16,7 @@ class DataLoader:
         self.setup_kaggle()
         self.data_dir = Path('data')
         self.data_dir.mkdir(exist_ok=True)
+        self.cache = DatasetCache(self.data_dir / 'cache')
 
     def setup_logging(self):
         """Configure logging"""
@@ -63,27 +68,34 @@ class DataLoader:
                 self.logger.error(f"Failed to download dataset: {str(e)}")
                 raise
 
+        cached = self.cache.load(data_file)
+        if cached is not None:
+            return cached
+
         try:
             df = pd.read_csv(data_file)
             self.logger.info(f"Loaded {len(df)} records")
-            return self.validate_data(df)
+            df = self.validate_data(df)
+            self.cache.store(data_file, df)
+            return df
         except Exception as e:
             self.logger.error(f"Failed to load data: {str(e)}")
             raise
 
+    def load_stream(self, source, total_bytes=None, progress_callback=None, chunksize=50_000,
+                    chunk_callback=None):
+        """Load a large CSV chunk by chunk into a compact, validated frame"""
+        try:
+            return ChunkedCSVIngest(chunksize=chunksize).read(
+                source,
+                total_bytes=total_bytes,
+                progress_callback=progress_callback,
+                chunk_callback=chunk_callback
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to stream data: {str(e)}")
+            raise
+
     def validate_data(self, df):
         """Validate data schema and quality"""
-        required_columns = [
-            'medicine_name', 'composition', 'side_effects',
-            'excellent_review_%', 'average_review_%', 'poor_review_%'
-        ]
-        
-        if not all(col in df.columns for col in required_columns):
-            raise ValueError("Invalid data schema")
-            
-        # Validate review percentages
-        for col in ['excellent_review_%', 'average_review_%', 'poor_review_%']:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            df[col] = df[col].clip(0, 100)
-            
-        return df
+        return validate_frame(df)
@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.schema import SCHEMA_VERSION
+
+# Bumped when the column encoding changes; entries in an older format are stale
+CACHE_FORMAT = 2
+
+
+def write_columns(directory, df):
+    """Write each column of ``df`` as a typed .npy file and return their manifest entries"""
+    return [_write_column(directory, i, name, df[name]) for i, name in enumerate(df.columns)]
+
+
+def read_columns(directory, columns):
+    """Memory-map the columns written by ``write_columns`` back into a frame"""
+    directory = Path(directory)
+    data = {}
+    for column in columns:
+        # mmap_mode='c' keeps pages shared but lets pandas write to a private copy
+        values = np.load(directory / column['file'], mmap_mode='c', allow_pickle=False)
+
+        if column['kind'] == 'category':
+            data[column['name']] = pd.Categorical.from_codes(
+                values, categories=column['categories'], ordered=column.get('ordered', False)
+            )
+        elif column['kind'] == 'object':
+            # Code -1 (missing) indexes the trailing NaN
+            uniques = np.array(column['categories'] + [np.nan], dtype=object)
+            data[column['name']] = uniques[values]
+        elif column['kind'] == 'datetime':
+            data[column['name']] = values.view(column['dtype'])
+        else:
+            data[column['name']] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+def write_frame(directory, df):
+    """Write ``df`` as a standalone columnar bundle (columns plus manifest.json)"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = {'rows': len(df), 'columns': write_columns(directory, df)}
+    with open(directory / 'manifest.json', 'w') as f:
+        json.dump(manifest, f)
+
+
+def read_frame(directory):
+    """Load a bundle written by ``write_frame``"""
+    with open(Path(directory) / 'manifest.json') as f:
+        manifest = json.load(f)
+    return read_columns(directory, manifest['columns'])
+
+
+def _write_column(directory, position, name, series):
+    """Encode one column as a typed .npy file and return its manifest entry"""
+    filename = f'col_{position}.npy'
+    column = {'name': name, 'file': filename}
+
+    if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, categories = series.cat.codes.to_numpy(), series.cat.categories
+            column['kind'] = 'category'
+            column['ordered'] = bool(series.cat.ordered)
+        else:
+            # Loaded back as an object column, with missing values as NaN
+            codes, categories = pd.factorize(series, sort=False)
+            column['kind'] = 'object'
+        column['categories'] = _json_values(name, categories)
+        values = codes.astype(np.int32 if len(categories) < 2**31 else np.int64)
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        column['kind'] = 'datetime'
+        column['dtype'] = str(series.dtype)
+        values = series.to_numpy().view(np.int64)
+    else:
+        column['kind'] = 'numeric'
+        values = series.to_numpy()
+
+    np.save(Path(directory) / filename, np.ascontiguousarray(values), allow_pickle=False)
+    return column
+
+
+def _json_values(name, categories):
+    """Category values as JSON scalars; anything else would not load back unchanged"""
+    values = categories.tolist()
+    for value in values:
+        if not isinstance(value, (str, bool, int, float)):
+            raise TypeError(f"Column {name} holds {type(value).__name__} values, which can't be cached")
+    return values
+
+
+class DatasetCache:
+    """Columnar on-disk cache of validated datasets.
+
+    Each cached dataset is a directory holding one ``.npy`` file per column
+    plus a ``manifest.json`` describing dtypes, string categories and the
+    fingerprint of the source file it was built from. Numeric columns are
+    memory-mapped on load and string columns are rebuilt from their codes, so
+    a warm load returns the cold load's frame without CSV parsing or
+    validation.
+    """
+
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, cache_dir='data/cache'):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def fingerprint(self, source, content_hash=True):
+        """Identify a source file by size, mtime, content hash and schema version"""
+        stat = Path(source).stat()
+        fingerprint = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'schema_version': SCHEMA_VERSION
+        }
+        if content_hash:
+            fingerprint['sha256'] = self._hash_file(source)
+        return fingerprint
+
+    def load(self, source):
+        """Return the cached frame for ``source`` or None if missing/stale"""
+        entry = self._entry_dir(source)
+        manifest = self._read_manifest(entry)
+        if manifest is None:
+            return None
+
+        if not self._is_fresh(source, entry, manifest):
+            return None
+
+        try:
+            df = read_columns(entry, manifest['columns'])
+            self.logger.info(f"Loaded {len(df)} records from cache {entry}")
+            return df
+        except Exception as e:
+            self.logger.warning(f"Discarding unreadable cache {entry}: {str(e)}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+    def store(self, source, df):
+        """Write a validated frame to the cache, replacing any older entry"""
+        entry = self._entry_dir(source)
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f'.{entry.name}-', dir=self.cache_dir))
+
+        try:
+            manifest = {
+                'format': CACHE_FORMAT,
+                'fingerprint': self.fingerprint(source),
+                'rows': len(df),
+                'columns': write_columns(tmp_dir, df)
+            }
+            with open(tmp_dir / 'manifest.json', 'w') as f:
+                json.dump(manifest, f)
+
+            # Swap the finished directory into place so readers never see a partial entry
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+            self.logger.info(f"Cached {len(df)} records to {entry}")
+        except Exception as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            self.logger.error(f"Failed to cache dataset: {str(e)}")
+
+    def invalidate(self, source):
+        """Remove the cache entry for ``source``"""
+        shutil.rmtree(self._entry_dir(source), ignore_errors=True)
+
+    def _entry_dir(self, source):
+        source = Path(source).resolve()
+        key = hashlib.sha1(str(source).encode()).hexdigest()[:12]
+        return self.cache_dir / f'{source.stem}-{key}'
+
+    def _hash_file(self, source):
+        digest = hashlib.sha256()
+        with open(source, 'rb') as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _read_manifest(self, entry):
+        try:
+            with open(entry / 'manifest.json') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _is_fresh(self, source, entry, manifest):
+        """Check size/mtime first and fall back to the content hash"""
+        cached = manifest['fingerprint']
+        current = self.fingerprint(source, content_hash=False)
+
+        if (manifest.get('format') != CACHE_FORMAT
+                or cached['schema_version'] != current['schema_version']
+                or cached['size'] != current['size']):
+            return False
+
+        if cached['mtime_ns'] != current['mtime_ns']:
+            # Touched but possibly unchanged; the hash decides
+            if self._hash_file(source) != cached['sha256']:
+                return False
+            manifest['fingerprint']['mtime_ns'] = current['mtime_ns']
+            with open(entry / 'manifest.json', 'w') as f:
+                json.dump(manifest, f)
+
+        return True
@@ -0,0 +1,278 @@
+import collections
+import hashlib
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+def content_hash(df):
+    """Stable hash of a frame's column names, dtypes and values"""
+    digest = hashlib.sha1()
+    for name in df.columns:
+        digest.update(str(name).encode())
+        digest.update(str(df[name].dtype).encode())
+        digest.update(pd.util.hash_pandas_object(df[name], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _column_buffer(series):
+    """Address of the memory backing a column (codes for categoricals)"""
+    values = series.array
+    values = values.codes if isinstance(values, pd.Categorical) else np.asarray(values)
+    return values.__array_interface__['data'][0]
+
+
+class DatasetHandle:
+    """Lightweight reference to a registered dataset, safe to keep in session state"""
+
+    def __init__(self, key, registry):
+        self.key = key
+        self._registry = registry
+        weakref.finalize(self, registry._release, key)
+
+    def frame(self):
+        """Copy-on-write view of the shared dataset"""
+        return self._registry.view(self.key)
+
+    def __len__(self):
+        return self._registry.info(self.key)['rows']
+
+    def __repr__(self):
+        return f"DatasetHandle({self.key[:12]})"
+
+
+class DatasetRegistry:
+    """Process-wide store holding one immutable frame per distinct dataset.
+
+    Sessions register their data and keep the returned handle; identical
+    content registered by several sessions is stored once. Consumers get
+    shallow views, which stay isolated from the shared frame only under
+    pandas copy-on-write; entry points enable ``mode.copy_on_write``.
+
+    Derived structures (aggregates, indexes, ...) are cached per dataset with
+    ``artifact``; artifacts exposing ``updated(rows)`` are carried forward
+    incrementally by ``append`` instead of being rebuilt.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._datasets = {}
+        # Keys of collected handles; finalizers only queue them, see _release
+        self._released = collections.deque()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            self._drain()
+            try:
+                yield
+            finally:
+                self._drain()
+
+    def register(self, df, artifacts=None):
+        """Register a frame and return a handle to the shared copy.
+
+        ``artifacts`` seeds derived structures built alongside the frame
+        (e.g. sketches collected during ingest); existing ones are kept.
+        """
+        return self._register(content_hash(df), df, artifacts)
+
+    def append(self, handle, rows):
+        """Register ``handle``'s dataset extended by ``rows`` and return the new handle"""
+        with self._locked():
+            old = self._datasets[handle.key]
+        frame = pd.concat([old['frame'], rows], ignore_index=True)
+        key = hashlib.sha1((handle.key + content_hash(rows)).encode()).hexdigest()
+
+        artifacts = {}
+        for name, artifact in old['artifacts'].items():
+            if not hasattr(artifact, 'updated'):
+                continue
+            try:
+                artifacts[name] = artifact.updated(rows)
+            except KeyError:
+                # Needs derived columns the raw rows lack; rebuilt on first use
+                continue
+        return self._register(key, frame, artifacts)
+
+    def subset(self, handle, rows):
+        """Register rows ``rows`` of ``handle``'s dataset and return a handle to them.
+
+        ``rows`` must be ascending and unique. Subsets are keyed on the parent
+        and the row positions, so a filter that was already applied reuses the
+        shared rows and their artifacts. A contiguous range is registered as a
+        slice of the parent; other row sets are gathered once, as pandas has no
+        views over arbitrary rows. The source row labels are kept as the index.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        key = hashlib.sha1((handle.key + hashlib.sha1(rows.tobytes()).hexdigest()).encode()).hexdigest()
+        with self._locked():
+            entry = self._datasets.get(key)
+            if entry is not None:
+                entry['handles'] += 1
+                entry['registrations'] += 1
+                return DatasetHandle(key, self)
+            parent = self._datasets[handle.key]['frame']
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            # A contiguous range is a slice, which shares the parent's buffers
+            return self._register(key, parent.iloc[rows[0]:rows[-1] + 1])
+        return self._register(key, parent.take(rows))
+
+    def _register(self, key, df, artifacts=None):
+        with self._locked():
+            entry = self._datasets.get(key)
+            if entry is None:
+                frame = df.copy(deep=False)
+                frame.attrs['dataset_key'] = key
+                entry = {
+                    'frame': frame,
+                    'rows': len(frame),
+                    'nbytes': int(frame.memory_usage(deep=True).sum()),
+                    'handles': 0,
+                    'registrations': 0,
+                    'artifacts': artifacts or {}
+                }
+                self._datasets[key] = entry
+                self.logger.info(f"Registered dataset {key[:12]} ({entry['nbytes'] / 1e6:.1f} MB)")
+            else:
+                for name, artifact in (artifacts or {}).items():
+                    entry['artifacts'].setdefault(name, artifact)
+
+            entry['handles'] += 1
+            entry['registrations'] += 1
+
+        return DatasetHandle(key, self)
+
+    def key_for(self, df):
+        """Dataset key if ``df`` is an unmodified view of a registered dataset"""
+        key = df.attrs.get('dataset_key')
+        with self._locked():
+            entry = self._datasets.get(key)
+        if entry is None or len(df) != entry['rows']:
+            return None
+
+        # attrs survive projection, added columns and reassignment, so the column
+        # set, dtypes and shared buffers must all match the stored frame
+        frame = entry['frame']
+        if list(df.columns) != list(frame.columns) or not df.dtypes.equals(frame.dtypes):
+            return None
+        for col in frame.columns:
+            if _column_buffer(df[col]) != _column_buffer(frame[col]):
+                return None
+        return key
+
+    def artifact(self, df, name, builder):
+        """Cached ``builder(df)`` for the dataset behind ``df``, built once per dataset"""
+        key = self.key_for(df)
+        if key is None:
+            return builder(df)
+
+        with self._locked():
+            entry = self._datasets.get(key)
+            if entry is None:
+                return builder(df)
+            artifacts = entry['artifacts']
+            if name in artifacts:
+                return artifacts[name]
+
+        built = builder(df)
+        with self._locked():
+            return artifacts.setdefault(name, built)
+
+    def cached(self, df, name):
+        """Artifact ``name`` of the dataset behind ``df`` if it was already built, else None"""
+        key = self.key_for(df)
+        if key is None:
+            return None
+        with self._locked():
+            entry = self._datasets.get(key)
+            return entry['artifacts'].get(name) if entry is not None else None
+
+    def view(self, key):
+        """Return a copy-on-write view of a registered dataset"""
+        with self._locked():
+            return self._datasets[key]['frame'].copy(deep=False)
+
+    def info(self, key):
+        with self._locked():
+            entry = self._datasets[key]
+            return {k: v for k, v in entry.items() if k not in ('frame', 'artifacts')}
+
+    def stats(self):
+        """Memory held versus a private copy per live handle"""
+        with self._locked():
+            held = sum(e['nbytes'] for e in self._datasets.values())
+            saved = sum(
+                e['nbytes'] * max(e['handles'] - 1, 0)
+                for e in self._datasets.values()
+            )
+            return {
+                'datasets': len(self._datasets),
+                'handles': sum(e['handles'] for e in self._datasets.values()),
+                'bytes_held': held,
+                'bytes_saved': saved
+            }
+
+    def _release(self, key):
+        # Finalizers run wherever GC fires, including inside a locked section on
+        # this thread, so the release is queued and applied by the lock holder
+        self._released.append(key)
+        if self._lock.acquire(blocking=False):
+            try:
+                self._drain()
+            finally:
+                self._lock.release()
+
+    def _drain(self):
+        """Apply queued releases; the caller holds the lock"""
+        while self._released:
+            key = self._released.popleft()
+            entry = self._datasets.get(key)
+            if entry is None:
+                continue
+            entry['handles'] -= 1
+            if entry['handles'] <= 0:
+                del self._datasets[key]
+                self.logger.info(f"Released dataset {key[:12]}")
+
+registry = DatasetRegistry()
+
+
+def fingerprint(value):
+    """Stable digest of builder inputs: frames, arrays, containers and scalars"""
+    digest = hashlib.sha1()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        # Registered views are identified by key without rehashing their contents
+        digest.update((registry.key_for(value) or content_hash(value)).encode())
+    elif isinstance(value, pd.Series):
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(f'{value.dtype}{value.shape}'.encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def shared_view(data):
+    """Copy-on-write view of a DatasetHandle or DataFrame, replacing df.copy()"""
+    if isinstance(data, DatasetHandle):
+        return data.frame()
+    return data.copy(deep=False)
@@ -0,0 +1,140 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import plotly.io as pio
+
+from utils.dataset_registry import fingerprint
+
+
+class FigureCache:
+    """Byte-bounded LRU of serialized figures with an optional on-disk tier.
+
+    Entries are keyed on (builder name, fingerprint of the builder inputs),
+    so they are only invalidated when the dataset or parameters change.
+    Figures are stored as plotly JSON and rebuilt on every hit, so callers
+    can mutate what they get back.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, disk_dir=None):
+        self.logger = logging.getLogger(__name__)
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._stats = {}
+
+    def memoize(self, builder_name, inputs):
+        """Decorate a figure builder method.
+
+        ``inputs(obj, *args, **kwargs)`` returns whatever the figures depend
+        on (dataset, results, parameters); it is fingerprinted into the key.
+        """
+        def decorator(build):
+            @functools.wraps(build)
+            def wrapper(obj, *args, **kwargs):
+                key = f"{builder_name}:{fingerprint(inputs(obj, *args, **kwargs))}"
+                return self.get_or_build(builder_name, key, lambda: build(obj, *args, **kwargs))
+            return wrapper
+        return decorator
+
+    def get_or_build(self, builder_name, key, build):
+        payload = self._get(key)
+        if payload is not None:
+            self._record(builder_name, hit=True)
+            return self._decode(payload)
+
+        start = time.perf_counter()
+        figures = build()
+        elapsed = time.perf_counter() - start
+        self._record(builder_name, hit=False, seconds=elapsed)
+
+        if figures is not None:
+            self._put(key, self._encode(figures))
+        return figures
+
+    def stats(self):
+        """Hit rate and build time per builder, plus memory use"""
+        with self._lock:
+            builders = {}
+            for name, s in self._stats.items():
+                calls = s['hits'] + s['misses']
+                builders[name] = {
+                    **s,
+                    'hit_rate': s['hits'] / calls if calls else 0.0,
+                    'mean_build_seconds': s['build_seconds'] / s['misses'] if s['misses'] else 0.0
+                }
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'builders': builders}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+                return payload
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            if path.exists():
+                payload = path.read_text()
+                self._put(key, payload, write_disk=False)
+                return payload
+        return None
+
+    def _put(self, key, payload, write_disk=True):
+        size = len(payload)
+        if size > self.max_bytes:
+            self.logger.warning(f"Figure payload {key} ({size} bytes) exceeds the cache budget")
+        else:
+            with self._lock:
+                if key in self._entries:
+                    self._bytes -= len(self._entries.pop(key))
+                self._entries[key] = payload
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._bytes -= len(evicted)
+
+        if write_disk and self.disk_dir is not None:
+            tmp = self._disk_path(key).with_suffix('.tmp')
+            tmp.write_text(payload)
+            os.replace(tmp, self._disk_path(key))
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def _record(self, builder_name, hit, seconds=0.0):
+        with self._lock:
+            s = self._stats.setdefault(builder_name, {'hits': 0, 'misses': 0, 'build_seconds': 0.0})
+            s['hits' if hit else 'misses'] += 1
+            s['build_seconds'] += seconds
+
+    @staticmethod
+    def _encode(figures):
+        if isinstance(figures, (list, tuple)):
+            return json.dumps({'list': [pio.to_json(f) if f is not None else None for f in figures]})
+        return json.dumps({'figure': pio.to_json(figures)})
+
+    @staticmethod
+    def _decode(payload):
+        data = json.loads(payload)
+        if 'list' in data:
+            return [pio.from_json(f) if f is not None else None for f in data['list']]
+        return pio.from_json(data['figure'])
+
+
+figure_cache = FigureCache(disk_dir=os.getenv('FIGURE_CACHE_DIR'))
@@ -0,0 +1,103 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.figure_cache import figure_cache
+
+# Shared by every catalog, so per-rerun catalogs do not each start threads
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='figure-prefetch')
+
+
+class FigureDescriptor:
+    """What a catalog entry shows, without building its figure"""
+
+    def __init__(self, key, title, kind, build, inputs, column=None):
+        self.key = key
+        self.title = title
+        self.kind = kind        # figure cache builder name, e.g. 'feature_distribution'
+        self.build = build      # zero-argument callable returning the figure
+        self.inputs = inputs    # fingerprint of what the figure depends on
+        self.column = column
+
+    @property
+    def cache_key(self):
+        return f"{self.kind}:{self.inputs}"
+
+    def __repr__(self):
+        return f"FigureDescriptor({self.key!r}, {self.title!r})"
+
+
+class FigureCatalog:
+    """Ordered figure descriptors whose figures are built on first access.
+
+    ``figure(key)`` builds through the shared figure cache and queues the next
+    ``lookahead`` entries on a small thread pool, so moving on to the
+    neighbouring tab or expander usually finds its figure already cached.
+    """
+
+    def __init__(self, descriptors, lookahead=2, pool=None):
+        self.logger = logging.getLogger(__name__)
+        self._descriptors = {d.key: d for d in descriptors}
+        self._order = [d.key for d in descriptors]
+        self.lookahead = lookahead
+        self._pool = pool or _prefetch_pool
+        self._lock = threading.Lock()
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._order)
+
+    def __iter__(self):
+        return (self._descriptors[key] for key in self._order)
+
+    def __getitem__(self, key):
+        return self._descriptors[key]
+
+    def keys(self):
+        return list(self._order)
+
+    def titles(self):
+        return [self._descriptors[key].title for key in self._order]
+
+    def figure(self, key):
+        """Figure for ``key``, built now unless a prefetch already did it"""
+        future = self._submit(key)
+        self.prefetch(self._following(key))
+        try:
+            return future.result()
+        finally:
+            # Hits come from the figure cache from here on; a failure can be retried
+            with self._lock:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+
+    def figures(self):
+        """Every figure in catalog order, built in parallel"""
+        futures = [self._submit(key) for key in self._order]
+        return [future.result() for future in futures]
+
+    def prefetch(self, keys=None):
+        """Start building ``keys`` (default: the first ``lookahead`` entries) in the background"""
+        keys = self._order[:self.lookahead] if keys is None else keys
+        for key in keys:
+            self._submit(key)
+
+    def _following(self, key):
+        position = self._order.index(key)
+        return self._order[position + 1:position + 1 + self.lookahead]
+
+    def _submit(self, key):
+        descriptor = self._descriptors[key]
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._pool.submit(self._build, descriptor)
+                self._pending[key] = future
+            return future
+
+    def _build(self, descriptor):
+        try:
+            return figure_cache.get_or_build(descriptor.kind, descriptor.cache_key, descriptor.build)
+        except Exception as e:
+            self.logger.error(f"Building figure {descriptor.key} failed: {str(e)}")
+            raise
@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import registry
+from utils.text_features import tokenized_column
+
+INDEX_COLUMNS = ['excellent_review_%', 'poor_review_%', 'side_effects_count']
+# Pseudo-count pulling small manufacturers towards the dataset-wide mean
+SMOOTHING = 10.0
+
+
+class ManufacturerIndex:
+    """Per-manufacturer review statistics in arrays keyed by manufacturer code.
+
+    Codes are positions in the case-insensitively sorted manufacturer names,
+    so the same sorted array serves exact lookups and prefix autocomplete.
+    Only counts and sums are stored; ``updated`` folds in appended rows
+    without revisiting the rows already indexed.
+    """
+
+    def __init__(self, names, rows, counts, sums):
+        self.names = names      # (m,) object array, sorted by lower-case name
+        self.rows = rows        # (m,) rows per manufacturer
+        self.counts = counts    # (m, k) non-null values per INDEX_COLUMNS column
+        self.sums = sums        # (m, k)
+        self._keys = np.array([n.lower() for n in names], dtype=object)
+        self._codes = {name: code for code, name in enumerate(names)}
+        # Derived once per index; lookups and the prediction form only read them
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._priors = sums.sum(axis=0) / counts.sum(axis=0)
+            self._means = sums / counts
+        self._smoothed = self._smooth(SMOOTHING)
+        self._means.flags.writeable = self._smoothed.flags.writeable = False
+
+    @classmethod
+    def from_frame(cls, df):
+        empty = np.zeros((0, len(INDEX_COLUMNS)))
+        return cls(np.array([], dtype=object), np.zeros(0, dtype=np.int64), empty, empty.copy()).updated(df)
+
+    def updated(self, df):
+        """Index including the rows of ``df``"""
+        local_codes, uniques = pd.factorize(df['manufacturer'], sort=False)
+        uniques = [str(u) for u in uniques]
+        names = sorted(set(self.names) | set(uniques), key=lambda n: (n.lower(), n))
+        names = np.array(names, dtype=object)
+        positions = {name: code for code, name in enumerate(names)}
+
+        m, k = len(names), len(INDEX_COLUMNS)
+        old = np.array([positions[n] for n in self.names], dtype=np.int64)
+        rows = np.zeros(m, dtype=np.int64)
+        counts, sums = np.zeros((m, k)), np.zeros((m, k))
+        rows[old], counts[old], sums[old] = self.rows, self.counts, self.sums
+
+        valid = local_codes >= 0
+        slots = np.array([positions[n] for n in uniques], dtype=np.int64)[local_codes[valid]]
+        rows += np.bincount(slots, minlength=m)
+        for j, values in enumerate(self._index_values(df)):
+            values = values[valid]
+            present = ~np.isnan(values)
+            counts[:, j] += np.bincount(slots[present], minlength=m)
+            sums[:, j] += np.bincount(slots[present], weights=values[present], minlength=m)
+        return ManufacturerIndex(names, rows, counts, sums)
+
+    @staticmethod
+    def _index_values(df):
+        for column in INDEX_COLUMNS:
+            if column in df.columns:
+                yield df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            elif column == 'side_effects_count':
+                # Shares the tokenization the text features already cached for the dataset
+                yield np.asarray(tokenized_column(df, 'side_effects').counts, dtype=np.float64)
+            else:
+                raise KeyError(column)
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name):
+        """Code of a manufacturer, -1 when unknown"""
+        return self._codes.get(name, -1)
+
+    def codes(self, names):
+        """Codes for many names in one vectorized categorical lookup"""
+        return pd.Categorical(names, categories=self.names).codes.astype(np.int64)
+
+    def complete(self, prefix, limit=20):
+        """Manufacturers whose name starts with ``prefix`` (case-insensitive), largest first"""
+        prefix = prefix.lower()
+        start = np.searchsorted(self._keys, prefix, side='left')
+        stop = np.searchsorted(self._keys, prefix + '\uffff', side='left')
+        matches = np.arange(start, stop)
+        matches = matches[np.argsort(-self.rows[matches], kind='stable')][:limit]
+        return list(self.names[matches])
+
+    def prior(self, column):
+        return self._priors[INDEX_COLUMNS.index(column)]
+
+    def mean(self, column):
+        """Raw per-manufacturer mean, as FeatureEngineer's manufacturer_rating"""
+        return self._means[:, INDEX_COLUMNS.index(column)]
+
+    def smoothed_mean(self, column, smoothing=SMOOTHING):
+        j = INDEX_COLUMNS.index(column)
+        if smoothing == SMOOTHING:
+            return self._smoothed[:, j]
+        return self._smooth(smoothing)[:, j]
+
+    def _smooth(self, smoothing):
+        return (self.sums + smoothing * self._priors) / (self.counts + smoothing)
+
+    def lookup(self, names, column='excellent_review_%', smoothed=False):
+        """Per-row statistic for ``names`` with one ``take``; unknown names get the prior"""
+        per_code = self.smoothed_mean(column) if smoothed else self.mean(column)
+        per_code = np.append(per_code, self.prior(column))
+        codes = self.codes(names)
+        return per_code.take(np.where(codes >= 0, codes, len(per_code) - 1))
+
+    def stats(self, name):
+        """Summary of one manufacturer for the prediction form, or None"""
+        code = self.code(name)
+        if code < 0:
+            return None
+        summary = {'manufacturer': name, 'rows': int(self.rows[code])}
+        for j, column in enumerate(INDEX_COLUMNS):
+            summary[column] = float(self._means[code, j])
+            summary[f'{column}_smoothed'] = float(self._smoothed[code, j])
+        return summary
+
+
+def manufacturer_index(df):
+    """ManufacturerIndex for ``df``, cached per registered dataset"""
+    return registry.artifact(df, 'manufacturer_index', ManufacturerIndex.from_frame)
@@ -0,0 +1,203 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+METRIC_COLUMNS = ['MSE', 'MAE', 'R2']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    mse REAL,
+    mae REAL,
+    r2 REAL,
+    predict_seconds REAL,
+    n_rows INTEGER,
+    predictions_path TEXT,
+    params TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_model_time ON runs (model, timestamp);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (timestamp);
+CREATE TABLE IF NOT EXISTS importances (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    feature TEXT NOT NULL,
+    importance REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS importances_run ON importances (run_id);
+"""
+
+
+class MetricsStore:
+    """Append-only history of model evaluation runs.
+
+    Scalar metrics and feature importances go to SQLite, indexed on
+    (model, timestamp); each run's prediction vector is written once as a
+    .npy blob and read back memory-mapped, so trend queries never touch it.
+    The database is created on first use.
+    """
+
+    def __init__(self, root='models/metrics'):
+        self.logger = logging.getLogger(__name__)
+        self.root = Path(root)
+        self.db_path = self.root / 'metrics.db'
+        self.blob_dir = self.root / 'predictions'
+        self._init_lock = threading.Lock()
+        self._ready = False
+
+    def record(self, model, result, timestamp=None, params=None):
+        """Append one evaluation result; returns its run_id"""
+        timestamp = time.time() if timestamp is None else timestamp
+        predictions = result.get('Predictions')
+        predictions_path = None
+        n_rows = None
+        if predictions is not None:
+            predictions_path = self._write_blob(np.asarray(predictions))
+            n_rows = len(predictions)
+
+        importance = result.get('Feature_Importance')
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (model, timestamp, mse, mae, r2, predict_seconds, n_rows, "
+                "predictions_path, params) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    model, timestamp,
+                    *(self._scalar(result.get(m)) for m in METRIC_COLUMNS),
+                    self._scalar(result.get('Predict_Seconds')),
+                    n_rows, predictions_path,
+                    json.dumps(params, default=str) if params is not None else None
+                )
+            )
+            run_id = cursor.lastrowid
+            if importance is not None and len(importance):
+                conn.executemany(
+                    "INSERT INTO importances (run_id, feature, importance) VALUES (?, ?, ?)",
+                    [(run_id, str(f), float(v))
+                     for f, v in zip(importance['feature'], importance['importance'])]
+                )
+        return run_id
+
+    def runs(self, models=None, since=None, until=None, limit=None):
+        """Scalar metrics of the matching runs, oldest first"""
+        query = (
+            "SELECT run_id, model, timestamp, mse AS MSE, mae AS MAE, r2 AS R2, "
+            "predict_seconds, n_rows, params FROM runs"
+        )
+        where, args = self._filters(models, since, until)
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " ORDER BY timestamp"
+        if limit is not None:
+            # Keep the latest `limit` runs, still returned oldest first
+            query = f"SELECT * FROM ({query} DESC LIMIT ?) ORDER BY timestamp"
+            args.append(int(limit))
+
+        with self._connect() as conn:
+            runs = pd.read_sql_query(query, conn, params=args)
+        runs['timestamp'] = pd.to_datetime(runs['timestamp'], unit='s')
+        return runs
+
+    def latest(self, models=None):
+        """Most recent run of each model"""
+        query = (
+            "SELECT r.run_id, r.model, r.timestamp, r.mse AS MSE, r.mae AS MAE, r.r2 AS R2, "
+            "r.predict_seconds, r.n_rows, r.params FROM runs r "
+            "JOIN (SELECT model, MAX(timestamp) AS ts FROM runs GROUP BY model) m "
+            "ON r.model = m.model AND r.timestamp = m.ts"
+        )
+        where, args = self._filters(models, None, None, alias='r.')
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        with self._connect() as conn:
+            runs = pd.read_sql_query(query, conn, params=args)
+        runs['timestamp'] = pd.to_datetime(runs['timestamp'], unit='s')
+        return runs.drop_duplicates('model', keep='last').set_index('model')
+
+    def last_run_id(self):
+        """Id of the most recently recorded run, or None for an empty store"""
+        with self._connect() as conn:
+            return conn.execute("SELECT MAX(run_id) FROM runs").fetchone()[0]
+
+    def importances(self, run_id):
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT feature, importance FROM importances WHERE run_id = ? "
+                "ORDER BY importance DESC",
+                conn, params=[int(run_id)]
+            )
+
+    def predictions(self, run_id):
+        """Memory-mapped prediction vector of a run, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT predictions_path FROM runs WHERE run_id = ?", (int(run_id),)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return np.load(self.blob_dir / row[0], mmap_mode='r')
+
+    @staticmethod
+    def _filters(models, since, until, alias=''):
+        where, args = [], []
+        if models is not None:
+            models = [models] if isinstance(models, str) else list(models)
+            where.append(f"{alias}model IN ({', '.join('?' * len(models))})")
+            args.extend(models)
+        if since is not None:
+            where.append(f"{alias}timestamp >= ?")
+            args.append(pd.Timestamp(since).timestamp())
+        if until is not None:
+            where.append(f"{alias}timestamp < ?")
+            args.append(pd.Timestamp(until).timestamp())
+        return where, args
+
+    @staticmethod
+    def _scalar(value):
+        return float(value) if value is not None else None
+
+    def _write_blob(self, array):
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        name = f"{uuid.uuid4().hex}.npy"
+        tmp = self.blob_dir / f"{name}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, array)
+        os.replace(tmp, self.blob_dir / name)
+        return name
+
+    @contextmanager
+    def _connect(self):
+        self._ensure_schema()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self):
+        if self._ready:
+            return
+        with self._init_lock:
+            if self._ready:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                # WAL lets dashboards read while an evaluation is appending
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+            finally:
+                conn.close()
+            self._ready = True
+
+
+metrics_store = MetricsStore(os.getenv('METRICS_STORE_DIR', 'models/metrics'))
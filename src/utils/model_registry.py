@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+
+import joblib
+
+
+class ModelRegistry:
+    """Process-wide cache of deserialized models with hot reload.
+
+    Each model file is loaded once per process with its numpy arrays
+    memory-mapped. Every lookup stats the file; when the mtime changes and
+    the content hash differs, the new model is loaded and swapped in under a
+    lock, so callers always get either the old or the new model in full.
+    """
+
+    HASH_BLOCK_SIZE = 1 << 20
+
+    def __init__(self, mmap_mode='r'):
+        self.logger = logging.getLogger(__name__)
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._counters = {'hits': 0, 'misses': 0, 'reloads': 0}
+
+    def get(self, path):
+        """Return the current model for ``path``, loading or reloading as needed"""
+        key = str(Path(path).resolve())
+        stat = Path(key).stat()
+
+        entry = self._entries.get(key)
+        if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self._count('hits')
+            return entry['model']
+
+        with self._lock:
+            # Another thread may have refreshed the entry while we waited
+            entry = self._entries.get(key)
+            stat = Path(key).stat()
+            if entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                self._counters['hits'] += 1
+                return entry['model']
+
+            digest = self._hash_file(key)
+            if entry is not None and entry['sha256'] == digest:
+                entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                self._counters['hits'] += 1
+                return entry['model']
+
+            start = time.perf_counter()
+            model = joblib.load(key, mmap_mode=self.mmap_mode)
+            load_seconds = time.perf_counter() - start
+
+            self._counters['reloads' if entry is not None else 'misses'] += 1
+            self._entries[key] = {
+                'model': model,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'sha256': digest,
+                'load_seconds': load_seconds,
+                'loaded_at': time.time()
+            }
+            self.logger.info(
+                f"{'Reloaded' if entry is not None else 'Loaded'} model {key} in {load_seconds:.3f}s"
+            )
+            return model
+
+    def invalidate(self, path=None):
+        """Drop one cached model, or all of them"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(str(Path(path).resolve()), None)
+
+    def stats(self):
+        """Hit/miss/reload counters and per-model load times"""
+        with self._lock:
+            return {
+                **self._counters,
+                'models': {
+                    key: {'load_seconds': e['load_seconds'], 'loaded_at': e['loaded_at']}
+                    for key, e in self._entries.items()
+                }
+            }
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,375 @@
+"""Cross-validated hyperparameter search over the model zoo.
+
+Usage (from ``src``):
+    python -m utils.model_search data/Medicine_Details.csv \\
+        --model-path models/random_forest.joblib --jobs 4
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold, ParameterGrid, train_test_split
+from sklearn.svm import SVR
+from sklearn.tree import DecisionTreeRegressor
+
+from components.feature_engineering import TARGET_COLUMN, FeatureEngineer
+from components.model_evaluation import ModelEvaluationService, regression_metrics
+from utils.chunked_ingest import ChunkedCSVIngest
+from utils.dataset_registry import fingerprint
+from utils.metrics_store import metrics_store
+from utils.model_utils import MedicineModelManager
+from utils.preprocessing import PreprocessingPipeline
+
+try:
+    from xgboost import XGBRegressor
+except ImportError:
+    XGBRegressor = None
+
+# Inputs of the searched models. satisfaction_score blends the review columns
+# the target is one of, so it is left out; manufacturer_rating is a mean of the
+# target and is only ever fitted on training rows.
+SEARCH_FEATURES = ['composition_count', 'side_effects_count', 'manufacturer_rating']
+TARGET_ENCODED = 'manufacturer_rating'
+BASE_FEATURES = [f for f in SEARCH_FEATURES if f != TARGET_ENCODED]
+
+
+def fit_rating(codes, y, n_groups):
+    """Per-manufacturer mean of ``y`` and the overall mean used for unseen manufacturers"""
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=n_groups)
+    sums = np.bincount(codes[valid], weights=y[valid], minlength=n_groups)
+    prior = float(y.mean()) if len(y) else np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, prior), prior
+
+
+def apply_rating(means, prior, codes):
+    known = codes >= 0
+    rating = np.full(len(codes), prior)
+    rating[known] = means[codes[known]]
+    return rating
+
+
+def out_of_fold_rating(codes, y, n_groups, n_splits=5, random_state=42):
+    """Rating of every row fitted on the other folds, so no row sees its own target"""
+    rating = np.empty(len(y))
+    n_splits = min(n_splits, len(y))
+    if n_splits < 2:
+        return np.full(len(y), float(y.mean()) if len(y) else np.nan)
+    for fit, held in KFold(n_splits, shuffle=True, random_state=random_state).split(codes):
+        rating[held] = apply_rating(*fit_rating(codes[fit], y[fit], n_groups), codes[held])
+    return rating
+
+
+def default_search_spaces():
+    """Estimator and parameter grid per model; XGBoost only when installed"""
+    spaces = {
+        'RandomForest': (RandomForestRegressor(n_jobs=1, random_state=42), {
+            'n_estimators': [100, 300],
+            'max_depth': [None, 10, 20],
+            'min_samples_leaf': [1, 5]
+        }),
+        'DecisionTree': (DecisionTreeRegressor(random_state=42), {
+            'max_depth': [None, 5, 10, 20],
+            'min_samples_leaf': [1, 5, 20]
+        }),
+        'SVR': (SVR(), {
+            'C': [1.0, 10.0, 100.0],
+            'epsilon': [0.1, 1.0]
+        })
+    }
+    if XGBRegressor is not None:
+        spaces['XGBoost'] = (XGBRegressor(n_jobs=1, random_state=42), {
+            'n_estimators': [200, 500],
+            'max_depth': [3, 6],
+            'learning_rate': [0.05, 0.1],
+            'subsample': [0.8, 1.0]
+        })
+    return spaces
+
+
+class HyperparameterSearch:
+    """Parallel k-fold search with successive halving and a resumable checkpoint.
+
+    Every candidate starts on a small nested subsample of each training fold;
+    after each rung only the best ``1 / factor`` of the candidates continue on
+    ``factor`` times more rows. Scaling and the manufacturer rating are fitted
+    once per (fold, rung) on that fold's training rows and shared by every
+    candidate. Finished (rung, candidate, fold) scores are
+    checkpointed, so an interrupted search resumes where it stopped.
+    """
+
+    def __init__(self, search_spaces=None, n_splits=5, factor=3, min_resources=None,
+                 n_jobs=1, test_size=0.2, random_state=42, checkpoint_dir='models/search'):
+        self.search_spaces = search_spaces or default_search_spaces()
+        self.n_splits = n_splits
+        self.factor = factor
+        self.min_resources = min_resources
+        self.n_jobs = n_jobs
+        self.test_size = test_size
+        self.random_state = random_state
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.logger = logging.getLogger(__name__)
+        self._transformers = {}
+        self._transformer_lock = threading.Lock()
+
+    def run(self, df, model_path='models/random_forest.joblib', store=metrics_store):
+        """Search, refit the winner on the training split and publish it"""
+        engineer = FeatureEngineer(df)
+        base = engineer.compute(BASE_FEATURES)
+        codes = np.asarray(engineer.compute(['manufacturer_code'])['manufacturer_code'], dtype=np.int64)
+        target = pd.to_numeric(df[TARGET_COLUMN], errors='coerce')
+        usable = (base.notna().all(axis=1) & target.notna()).to_numpy()
+        X = base.to_numpy(dtype=np.float64)[usable]
+        codes, y = codes[usable], target.to_numpy(dtype=np.float64)[usable]
+        n_groups = int(codes.max()) + 1 if len(codes) else 0
+
+        # Split before any target-derived feature exists
+        train, test = train_test_split(
+            np.arange(len(y)), test_size=self.test_size, random_state=self.random_state
+        )
+        leaderboard = self.search(X[train], y[train], codes[train])
+        best = leaderboard.iloc[0]
+        estimator, _ = self.search_spaces[best['model']]
+        params = json.loads(best['params'])
+
+        means, prior = fit_rating(codes[train], y[train], n_groups)
+        train_features = self._frame(X[train], out_of_fold_rating(
+            codes[train], y[train], n_groups, self.n_splits, self.random_state
+        ))
+        test_features = self._frame(X[test], apply_rating(means, prior, codes[test]))
+        y_train, y_test = y[train], y[test]
+
+        Path(model_path).parent.mkdir(parents=True, exist_ok=True)
+        manager = MedicineModelManager(model_path)
+        # The training split's ratings travel with the artifact for batch scoring
+        preprocessor = manager.fit_preprocessor(
+            train_features, SEARCH_FEATURES,
+            manufacturer_ratings=self._ratings_by_name(df, means, codes[train]),
+            rating_prior=prior
+        )
+        if preprocessor is None:
+            raise RuntimeError("Failed to fit preprocessing for the winning model")
+        model = clone(estimator).set_params(**params)
+        model.fit(preprocessor.transform(train_features), y_train)
+
+        X_test = pd.DataFrame(preprocessor.transform(test_features), columns=SEARCH_FEATURES)
+        evaluation = ModelEvaluationService({best['model']: model}, store=None)
+        result = evaluation.evaluate_all_models(X_test, y_test)[best['model']]
+
+        manager.save_model(model)
+        run_id = None
+        if store is not None:
+            run_id = store.record(best['model'], result, params={
+                **params, 'cv_mse': float(best['cv_mse']), 'model_path': str(model_path)
+            })
+        self.logger.info(
+            f"Winner {best['model']} {params}: holdout R2 {result['R2']:.4f}, "
+            f"MSE {result['MSE']:.4f} -> {model_path}"
+        )
+        return {
+            'model': best['model'],
+            'params': params,
+            'metrics': {k: result[k] for k in ('MSE', 'MAE', 'R2')},
+            'run_id': run_id,
+            'leaderboard': leaderboard
+        }
+
+    @staticmethod
+    def _frame(X_base, rating):
+        return pd.DataFrame(np.column_stack([X_base, rating]), columns=SEARCH_FEATURES)
+
+    @staticmethod
+    def _ratings_by_name(df, means, train_codes):
+        """Ratings of the manufacturers seen in training, keyed by name"""
+        column = df['manufacturer']
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            names = column.cat.categories
+        else:
+            # Same factorization as FeatureEngineer's manufacturer_code
+            names = pd.factorize(column, sort=False)[1]
+        seen = np.unique(train_codes[train_codes >= 0])
+        return {str(names[code]): float(means[code]) for code in seen}
+
+    def search(self, X, y, codes=None):
+        """Successive-halving CV search; returns the final leaderboard, best first.
+
+        ``X`` holds features free of the target. With manufacturer ``codes``,
+        the manufacturer rating is appended per fold: out-of-fold on the
+        fold's training rows, fitted on all of them for its validation rows.
+        """
+        candidates = [
+            (name, params)
+            for name, (_, grid) in self.search_spaces.items()
+            for params in ParameterGrid(grid)
+        ]
+        folds = list(KFold(self.n_splits, shuffle=True, random_state=self.random_state).split(X))
+        # One fixed order per fold makes each rung's subsample a superset of the last
+        rng = np.random.default_rng(self.random_state)
+        folds = [(rng.permutation(train), val) for train, val in folds]
+        self._transformers.clear()
+
+        checkpoint = self._load_checkpoint(X, y, codes, candidates)
+        schedule = self._schedule(len(candidates), min(len(train) for train, _ in folds))
+        alive = list(range(len(candidates)))
+
+        for rung, n_resources in enumerate(schedule):
+            start = time.perf_counter()
+            scores = self._run_rung(X, y, codes, folds, candidates, alive, rung, n_resources, checkpoint)
+            self.logger.info(
+                f"Rung {rung}: {len(alive)} candidates on {n_resources} rows per fold "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+            ranked = sorted(alive, key=lambda c: scores[c])
+            if rung == len(schedule) - 1:
+                break
+            alive = ranked[:max(1, math.ceil(len(alive) / self.factor))]
+
+        return pd.DataFrame([{
+            'model': candidates[c][0],
+            'params': json.dumps(candidates[c][1], sort_keys=True, default=str),
+            'cv_mse': scores[c],
+            'rows_per_fold': schedule[-1]
+        } for c in ranked])
+
+    def _schedule(self, n_candidates, max_resources):
+        """Rows per fold at each rung"""
+        n_rungs = 1 + int(math.floor(math.log(max(n_candidates, 1), self.factor)))
+        min_resources = self.min_resources or max(
+            max_resources // self.factor ** (n_rungs - 1), min(max_resources, 20)
+        )
+        schedule = []
+        for rung in range(n_rungs):
+            schedule.append(min(max_resources, min_resources * self.factor ** rung))
+            if schedule[-1] == max_resources:
+                break
+        schedule[-1] = max_resources
+        return schedule
+
+    def _run_rung(self, X, y, codes, folds, candidates, alive, rung, n_resources, checkpoint):
+        """Mean validation MSE of each live candidate at this rung"""
+        results = checkpoint['scores']
+        pending = [
+            (c, f) for c in alive for f in range(len(folds))
+            if self._score_key(rung, c, f, n_resources) not in results
+        ]
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, self.n_jobs)) as pool:
+                futures = {
+                    pool.submit(self._fit_and_score, X, y, codes, folds, candidates[c], f, n_resources): (c, f)
+                    for c, f in pending
+                }
+                for future in as_completed(futures):
+                    c, f = futures[future]
+                    try:
+                        mse = future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error fitting {candidates[c][0]} {candidates[c][1]}: {str(e)}")
+                        mse = float('inf')
+                    results[self._score_key(rung, c, f, n_resources)] = mse
+                    self._save_checkpoint(checkpoint)
+
+        return {
+            c: float(np.mean([results[self._score_key(rung, c, f, n_resources)]
+                              for f in range(len(folds))]))
+            for c in alive
+        }
+
+    def _fit_and_score(self, X, y, codes, folds, candidate, fold, n_resources):
+        name, params = candidate
+        X_train, y_train, X_val, y_val = self._fold_data(X, y, codes, folds, fold, n_resources)
+        model = clone(self.search_spaces[name][0]).set_params(**params)
+        model.fit(X_train, y_train)
+        return regression_metrics(y_val, model.predict(X_val))['MSE']
+
+    def _fold_data(self, X, y, codes, folds, fold, n_resources):
+        """Scaled train subsample and validation fold, fitted once per (fold, rung)"""
+        key = (fold, n_resources)
+        with self._transformer_lock:
+            cached = self._transformers.get(key)
+            if cached is None:
+                train, val = folds[fold]
+                train = train[:n_resources]
+                X_train, X_val = X[train], X[val]
+                if codes is not None:
+                    # The validation fold never contributes to the rating
+                    n_groups = int(codes.max()) + 1
+                    means, prior = fit_rating(codes[train], y[train], n_groups)
+                    X_train = np.column_stack([X_train, out_of_fold_rating(
+                        codes[train], y[train], n_groups, self.n_splits, self.random_state
+                    )])
+                    X_val = np.column_stack([X_val, apply_rating(means, prior, codes[val])])
+                names = [f'x{i}' for i in range(X_train.shape[1])]
+                preprocessor = PreprocessingPipeline.fit(pd.DataFrame(X_train, columns=names), names)
+                cached = (
+                    preprocessor.transform(X_train), y[train],
+                    preprocessor.transform(X_val), y[val]
+                )
+                self._transformers[key] = cached
+        return cached
+
+    @staticmethod
+    def _score_key(rung, candidate, fold, n_resources):
+        return f"{rung}:{candidate}:{fold}:{n_resources}"
+
+    def _checkpoint_path(self):
+        return self.checkpoint_dir / 'search_checkpoint.json'
+
+    def _load_checkpoint(self, X, y, codes, candidates):
+        """Saved scores when data and search configuration are unchanged"""
+        config = json.dumps({
+            'candidates': candidates, 'n_splits': self.n_splits, 'factor': self.factor,
+            'min_resources': self.min_resources, 'random_state': self.random_state
+        }, sort_keys=True, default=str)
+        key = f"{fingerprint((X, y, codes))}:{hashlib.sha256(config.encode()).hexdigest()}"
+
+        try:
+            saved = json.loads(self._checkpoint_path().read_text())
+            if saved.get('key') == key:
+                self.logger.info(f"Resuming search with {len(saved['scores'])} finished fits")
+                return saved
+        except (OSError, ValueError):
+            pass
+        return {'key': key, 'scores': {}}
+
+    def _save_checkpoint(self, checkpoint):
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._checkpoint_path().with_suffix('.tmp')
+        tmp.write_text(json.dumps(checkpoint))
+        os.replace(tmp, self._checkpoint_path())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune and train the effectiveness model")
+    parser.add_argument('data', help="CSV file with the medicine dataset")
+    parser.add_argument('--model-path', default='models/random_forest.joblib')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--factor', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=1)
+    parser.add_argument('--checkpoint-dir', default='models/search')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Registered datasets are shared as shallow views; see app.py
+    pd.set_option('mode.copy_on_write', True)
+    search = HyperparameterSearch(n_splits=args.folds, factor=args.factor, n_jobs=args.jobs,
+                                  checkpoint_dir=args.checkpoint_dir)
+    result = search.run(ChunkedCSVIngest().read(args.data), model_path=args.model_path)
+    print(result['leaderboard'].head(10).to_string(index=False))
+    print(f"Winner: {result['model']} {result['params']} -> {result['metrics']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,85 @@
+import os
 import joblib
-import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 import streamlit as st
 from ydata_profiling import ProfileReport
 import plotly.express as px
+from utils.model_registry import model_registry
+from utils.preprocessing import PREDICTION_FEATURES, PreprocessingPipeline
 
 class MedicineModelManager:
     def __init__(self, model_path='models/random_forest.joblib'):
         self.model_path = model_path
-        self.scaler = StandardScaler()
-        
+        self.preprocessor_path = PreprocessingPipeline.path_for(model_path)
+
     def load_model(self):
-        """Load trained model with error handling"""
+        """Load trained model from the process-wide registry"""
         try:
-            return joblib.load(self.model_path)
+            return model_registry.get(self.model_path)
         except Exception as e:
             st.error(f"Failed to load model: {str(e)}")
             return None
-            
-    def preprocess_input(self, composition_count, side_effects, satisfaction, manufacturer_rating):
-        """Preprocess input data with validation"""
+
+    def load_preprocessor(self):
+        """Fitted preprocessing pipeline, reloaded through the registry along with the model"""
+        return PreprocessingPipeline.from_state(model_registry.get(self.preprocessor_path))
+
+    def fit_preprocessor(self, features, feature_names=PREDICTION_FEATURES, **ratings):
+        """Fit and persist preprocessing from FeatureEngineer.create_features output"""
+        try:
+            preprocessor = PreprocessingPipeline.fit(features, feature_names, **ratings)
+            preprocessor.save(self.preprocessor_path)
+            return preprocessor
+        except Exception as e:
+            st.error(f"Failed to fit preprocessing: {str(e)}")
+            return None
+
+    def preprocess_input(self, composition_count, side_effects, manufacturer_rating, satisfaction=None):
+        """Preprocess the inputs the fitted pipeline uses; ``satisfaction`` is in percent.
+
+        Search-trained models leave satisfaction out, so it is only needed
+        by pipelines fitted on PREDICTION_FEATURES.
+        """
+        inputs = {
+            'composition_count': composition_count,
+            'side_effects_count': side_effects,
+            'manufacturer_rating': manufacturer_rating
+        }
+        if satisfaction is not None:
+            # satisfaction_score is on FeatureEngineer's 0-1 scale
+            inputs['satisfaction_score'] = satisfaction / 100
         try:
-            features = np.array([[
-                composition_count,
-                side_effects,
-                satisfaction,
-                manufacturer_rating
-            ]])
-            return self.scaler.fit_transform(features)
+            return self.load_preprocessor().transform_inputs(inputs)
         except Exception as e:
             st.error(f"Preprocessing failed: {str(e)}")
             return None
-            
+
+    def preprocess_batch(self, features):
+        """Preprocess N rows (array or feature frame) in one vectorized call"""
+        return self.load_preprocessor().transform(features)
+
     def save_model(self, model):
         """Save model with version control"""
         try:
-            joblib.dump(model, self.model_path)
+            # Write then rename so registry readers never see a partial file
+            tmp_path = f"{self.model_path}.tmp"
+            joblib.dump(model, tmp_path)
+            os.replace(tmp_path, self.model_path)
             st.success("Model saved successfully")
         except Exception as e:
             st.error(f"Failed to save model: {str(e)}")
+
+
+_default_manager = MedicineModelManager()
+
+
+def load_model():
+    """Load the default model through the shared registry"""
+    return _default_manager.load_model()
+
+
+def preprocess_input(composition_count, side_effects, manufacturer_rating, satisfaction=None):
+    """Preprocess one observation with the default preprocessing pipeline"""
+    return _default_manager.preprocess_input(
+        composition_count, side_effects, manufacturer_rating, satisfaction
+    )
@@ -0,0 +1,197 @@
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+DROP_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+
+class MonitoringSink:
+    """Bounded queue drained by a background thread into JSONL segments.
+
+    ``submit`` never touches disk: it enqueues the record and returns. A
+    worker thread collects records into batches, appends them to the current
+    segment file (rotating after ``segment_records`` lines) and passes each
+    batch to ``on_batch`` for drift evaluation.
+
+    When the queue is full the ``drop_policy`` decides what happens:
+    ``drop_newest`` discards the incoming record, ``drop_oldest`` evicts the
+    oldest queued record, ``block`` waits up to ``block_timeout`` seconds and
+    then drops. A batch whose write fails is retried ``write_retries`` times on
+    a fresh segment before it is dropped and counted in ``failed``.
+    """
+
+    def __init__(self, directory='logs/monitoring', max_queue=10_000, batch_size=500,
+                 flush_interval=1.0, segment_records=100_000, drop_policy='drop_newest',
+                 block_timeout=0.05, write_retries=2, on_batch=None):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"drop_policy must be one of {DROP_POLICIES}")
+
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_records = segment_records
+        self.drop_policy = drop_policy
+        self.block_timeout = block_timeout
+        self.write_retries = write_retries
+        self.on_batch = on_batch
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._worker = None
+        self._segment = None
+        self._segment_lines = 0
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'submitted': 0,
+            'dropped': 0,
+            'failed': 0,
+            'callback_errors': 0,
+            'written': 0,
+            'batches': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+    def start(self):
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='monitoring-sink', daemon=True)
+            self._worker.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self, timeout=5.0):
+        """Drain the queue; the worker closes the current segment as it exits"""
+        if self._worker is None:
+            return True
+        self._stop.set()
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            # Still draining: the segment stays with the worker, which closes it when done
+            self.logger.warning(f"Monitoring sink still draining after {timeout}s")
+            return False
+        self._worker = None
+        return True
+
+    def submit(self, record):
+        """Enqueue a record without blocking the caller; returns False if dropped"""
+        try:
+            if self.drop_policy == 'block':
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            if self.drop_policy != 'drop_oldest' or not self._evict_and_put(record):
+                self._bump('dropped')
+                return False
+        self._bump('submitted')
+        return True
+
+    def metrics(self):
+        """Queue depth, throughput and flush latency"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        total_flush_ms = metrics.pop('total_flush_ms')
+        metrics['mean_flush_ms'] = total_flush_ms / metrics['batches'] if metrics['batches'] else 0.0
+        metrics['queue_depth'] = self._queue.qsize()
+        metrics['queue_capacity'] = self._queue.maxsize
+        return metrics
+
+    def _evict_and_put(self, record):
+        try:
+            self._queue.get_nowait()
+            self._bump('dropped')
+            self._queue.put_nowait(record)
+            return True
+        except (queue.Empty, queue.Full):
+            return False
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+        self._close_segment()
+
+    def _collect(self):
+        """Block for the first record, then take whatever else is queued"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        if not self._write(batch):
+            self._bump('failed', len(batch))
+            return
+
+        if self.on_batch is not None:
+            try:
+                self.on_batch(batch)
+            except Exception as e:
+                # The batch is on disk already; only its drift evaluation is lost
+                self.logger.error(f"Monitoring batch callback failed: {str(e)}")
+                self._bump('callback_errors')
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._metrics['written'] += len(batch)
+            self._metrics['batches'] += 1
+            self._metrics['last_flush_ms'] = elapsed_ms
+            self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], elapsed_ms)
+            self._metrics['total_flush_ms'] += elapsed_ms
+
+    def _write(self, batch):
+        """Append ``batch`` to the current segment, retrying on a fresh one"""
+        try:
+            lines = ''.join(json.dumps(r, default=str) + '\n' for r in batch)
+        except (TypeError, ValueError) as e:
+            self.logger.error(f"Monitoring batch is not serializable: {str(e)}")
+            return False
+        for attempt in range(self.write_retries + 1):
+            try:
+                segment = self._current_segment()
+                segment.write(lines)
+                segment.flush()
+                self._segment_lines += len(batch)
+                return True
+            except Exception as e:
+                self.logger.error(f"Monitoring flush failed (attempt {attempt + 1}): {str(e)}")
+                self._close_segment()
+                if attempt < self.write_retries:
+                    time.sleep(0.1 * (attempt + 1))
+        return False
+
+    def _close_segment(self):
+        if self._segment is not None:
+            try:
+                self._segment.close()
+            except OSError as e:
+                self.logger.error(f"Failed to close monitoring segment: {str(e)}")
+            self._segment = None
+
+    def _current_segment(self):
+        if self._segment is None or self._segment_lines >= self.segment_records:
+            if self._segment is not None:
+                self._segment.close()
+            name = f"predictions-{time.strftime('%Y%m%d-%H%M%S')}-{time.time_ns() % 10**6:06d}.jsonl"
+            self._segment = open(self.directory / name, 'a')
+            self._segment_lines = 0
+        return self._segment
+
+    def _bump(self, name, n=1):
+        with self._metrics_lock:
+            self._metrics[name] += n
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+
+class PredictionHistory:
+    """Fixed-capacity ring buffer of predictions backed by preallocated arrays.
+
+    Timestamps, predictions, actuals and errors live in NumPy columns;
+    numeric features are packed into a float32 matrix whose column order is
+    fixed by the first record. Once full, the oldest entries are overwritten,
+    so memory stays constant however long the server runs.
+    """
+
+    def __init__(self, capacity=10_000):
+        self.capacity = capacity
+        self.timestamp = np.full(capacity, np.nan)
+        self.prediction = np.full(capacity, np.nan)
+        self.actual = np.full(capacity, np.nan)
+        self.error = np.full(capacity, np.nan)
+        self.feature_names = None
+        self.features = None
+        self._next = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, features, prediction, actual=None, timestamp=None):
+        """Store one record and return its slot index"""
+        slot = self._next
+        self.timestamp[slot] = pd.Timestamp.now().timestamp() if timestamp is None else timestamp
+        self.prediction[slot] = prediction
+        self.actual[slot] = np.nan if actual is None else actual
+        self.error[slot] = np.nan if actual is None else abs(prediction - actual)
+        self._store_features(slot, features)
+
+        self._next = (slot + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        return slot
+
+    def recent_slot(self, offset):
+        """Slot holding the record ``offset`` positions before the newest, or None"""
+        if offset >= self._size:
+            return None
+        return (self._next - 1 - offset) % self.capacity
+
+    def to_frame(self):
+        """Oldest-to-newest copy of the history for dashboards"""
+        order = np.arange(self._next - self._size, self._next) % self.capacity
+        df = pd.DataFrame({
+            'timestamp': pd.to_datetime(self.timestamp[order], unit='s'),
+            'prediction': self.prediction[order],
+            'actual': self.actual[order],
+            'error': self.error[order]
+        })
+        if self.features is not None:
+            for i, name in enumerate(self.feature_names):
+                df[name] = self.features[order, i]
+        return df
+
+    def _store_features(self, slot, features):
+        if not isinstance(features, dict):
+            return
+        if self.feature_names is None:
+            self.feature_names = list(features)
+            self.features = np.full((self.capacity, len(self.feature_names)), np.nan, dtype=np.float32)
+        self.features[slot] = [features.get(name, np.nan) for name in self.feature_names]
+
+
+class RollingErrorWindow:
+    """Mean absolute error over the last ``window`` records, updated in O(1)"""
+
+    def __init__(self, history, window=100):
+        if window >= history.capacity:
+            raise ValueError("Drift window must be smaller than the history capacity")
+        self.history = history
+        self.window = window
+        self.error_sum = 0.0
+        self.error_count = 0
+
+    def update(self, slot):
+        """Account for the record just written to ``slot``"""
+        error = self.history.error[slot]
+        if not np.isnan(error):
+            self.error_sum += error
+            self.error_count += 1
+
+        # Record that just slid out of the window (still held by the ring buffer)
+        leaving = self.history.recent_slot(self.window)
+        if leaving is not None:
+            old = self.history.error[leaving]
+            if not np.isnan(old):
+                self.error_sum -= old
+                self.error_count -= 1
+
+    @property
+    def full(self):
+        return len(self.history) >= self.window
+
+    @property
+    def mean_error(self):
+        if self.error_count == 0:
+            return None
+        return self.error_sum / self.error_count
@@ -0,0 +1,103 @@
+import logging
+import os
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+# Input order expected by the prediction model
+PREDICTION_FEATURES = [
+    'composition_count', 'side_effects_count',
+    'satisfaction_score', 'manufacturer_rating'
+]
+
+
+class PreprocessingPipeline:
+    """Standardisation fitted once at training time and reused for inference.
+
+    Only the per-feature mean and scale arrays are persisted, so inference is
+    a single vectorised ``(X - mean) / scale`` with no refitting. The
+    training split's per-manufacturer ratings can be stored alongside, so
+    inference never needs the review columns to rate a manufacturer.
+    """
+
+    def __init__(self, feature_names, mean, scale, manufacturer_ratings=None, rating_prior=np.nan):
+        self.feature_names = list(feature_names)
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.manufacturer_ratings = manufacturer_ratings   # manufacturer -> rating, or None
+        self.rating_prior = float(rating_prior)
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def fit(cls, features, feature_names=PREDICTION_FEATURES, manufacturer_ratings=None,
+            rating_prior=np.nan):
+        """Fit mean/scale from the FeatureEngineer.create_features output"""
+        values = features[list(feature_names)].to_numpy(dtype=np.float64)
+        mean = np.nanmean(values, axis=0)
+        scale = np.nanstd(values, axis=0)
+        # Match StandardScaler: constant features are left unscaled
+        scale[scale == 0] = 1.0
+        return cls(feature_names, mean, scale, manufacturer_ratings, rating_prior)
+
+    @staticmethod
+    def path_for(model_path):
+        """Artifact location next to a model file, named after it so models never share one"""
+        model_path = Path(model_path)
+        return model_path.with_name(f'{model_path.stem}.preprocessing.joblib')
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_state(joblib.load(path))
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild from the dict written by ``save``"""
+        # Artifacts written before ratings were stored have neither key
+        return cls(state['feature_names'], state['mean'], state['scale'],
+                   state.get('manufacturer_ratings'), state.get('rating_prior', np.nan))
+
+    def save(self, path):
+        # Write then rename so registry readers never see a partial file
+        tmp_path = f"{path}.tmp"
+        joblib.dump({
+            'feature_names': self.feature_names,
+            'mean': self.mean_,
+            'scale': self.scale_,
+            'manufacturer_ratings': self.manufacturer_ratings,
+            'rating_prior': self.rating_prior
+        }, tmp_path)
+        os.replace(tmp_path, path)
+        self.logger.info(f"Saved preprocessing pipeline to {path}")
+
+    def rate_manufacturers(self, names):
+        """Training-split rating per row of ``names``; unseen manufacturers get the prior"""
+        if self.manufacturer_ratings is None:
+            raise ValueError("This preprocessing artifact stores no manufacturer ratings")
+        ratings = pd.Series(self.manufacturer_ratings, dtype=np.float64)
+        return ratings.reindex(pd.Index(names).astype(object)).fillna(self.rating_prior).to_numpy()
+
+    def transform(self, X):
+        """Scale an (N, k) array or a frame with the fitted feature columns"""
+        if hasattr(X, 'columns'):
+            X = X[self.feature_names].to_numpy(dtype=np.float64)
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"Expected {len(self.feature_names)} features, got {X.shape[1]}"
+            )
+        return (X - self.mean_) / self.scale_
+
+    def transform_one(self, *values):
+        """Scale a single observation given in feature order"""
+        return self.transform(np.array(values, dtype=np.float64))
+
+    def transform_inputs(self, inputs):
+        """Scale one observation given as {feature: value}; extra inputs are ignored"""
+        missing = [name for name in self.feature_names if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing model inputs: {missing}")
+        return self.transform_one(*(inputs[name] for name in self.feature_names))
@@ -0,0 +1,207 @@
+import json
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import fingerprint, registry
+
+TOP_VALUES = 10
+
+
+class MinimalProfile:
+    """Fast per-column profile built from vectorized, mergeable statistics.
+
+    Numeric columns keep count, nulls, sum, sum of squares, min and max;
+    other columns keep exact value counts. Both merge exactly, so appended
+    rows only require profiling the new rows (``updated``).
+    """
+
+    def __init__(self, rows, numeric, categorical):
+        self.rows = rows
+        self.numeric = numeric          # column -> dict of sufficient statistics
+        self.categorical = categorical  # column -> (value_counts Series, nulls)
+
+    @classmethod
+    def from_frame(cls, df):
+        numeric, categorical = {}, {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+                present = values[~np.isnan(values)]
+                numeric[col] = {
+                    'count': len(present),
+                    'nulls': len(values) - len(present),
+                    'sum': float(present.sum()),
+                    'sumsq': float(np.dot(present, present)),
+                    'min': float(present.min()) if len(present) else np.nan,
+                    'max': float(present.max()) if len(present) else np.nan
+                }
+            else:
+                categorical[col] = (series.value_counts(dropna=True, sort=False), int(series.isna().sum()))
+        return cls(len(df), numeric, categorical)
+
+    def updated(self, rows):
+        """Profile of the dataset extended by ``rows``; only the new rows are scanned"""
+        delta = MinimalProfile.from_frame(rows)
+        numeric = {}
+        for col, s in self.numeric.items():
+            d = delta.numeric.get(col)
+            if d is None:
+                raise KeyError(col)
+            numeric[col] = {
+                'count': s['count'] + d['count'],
+                'nulls': s['nulls'] + d['nulls'],
+                'sum': s['sum'] + d['sum'],
+                'sumsq': s['sumsq'] + d['sumsq'],
+                'min': np.fmin(s['min'], d['min']),
+                'max': np.fmax(s['max'], d['max'])
+            }
+        categorical = {}
+        for col, (counts, nulls) in self.categorical.items():
+            d_counts, d_nulls = delta.categorical[col]
+            merged = counts.add(d_counts, fill_value=0).astype(np.int64)
+            categorical[col] = (merged, nulls + d_nulls)
+        return MinimalProfile(self.rows + delta.rows, numeric, categorical)
+
+    def to_frame(self):
+        """One row per column, ready for st.dataframe"""
+        records = []
+        for col, s in self.numeric.items():
+            n = s['count']
+            mean = s['sum'] / n if n else np.nan
+            var = (s['sumsq'] - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+            records.append({
+                'column': col, 'type': 'numeric', 'missing': s['nulls'],
+                'missing_%': 100 * s['nulls'] / self.rows if self.rows else 0.0,
+                'mean': mean, 'std': np.sqrt(max(var, 0)) if n > 1 else np.nan,
+                'min': s['min'], 'max': s['max'], 'distinct': None, 'top': None
+            })
+        for col, (counts, nulls) in self.categorical.items():
+            top = counts.nlargest(TOP_VALUES)
+            records.append({
+                'column': col, 'type': 'categorical', 'missing': nulls,
+                'missing_%': 100 * nulls / self.rows if self.rows else 0.0,
+                'mean': None, 'std': None, 'min': None, 'max': None,
+                'distinct': int((counts > 0).sum()),
+                'top': ', '.join(f'{k} ({v})' for k, v in top.items())
+            })
+        return pd.DataFrame(records).set_index('column')
+
+
+def minimal_profile(df):
+    """MinimalProfile for ``df``, cached per registered dataset"""
+    return registry.artifact(df, 'minimal_profile', MinimalProfile.from_frame)
+
+
+def _build_full_report(df, title, report_path, progress_path):
+    """Runs in a worker process: build the ydata-profiling report and record its stage.
+
+    ydata-profiling describes the whole frame in one call, so only the stage
+    and start time are reported, not a completion fraction.
+    """
+    from ydata_profiling import ProfileReport
+    started = time.time()
+
+    def progress(stage):
+        tmp = Path(f'{progress_path}.tmp')
+        tmp.write_text(json.dumps({'stage': stage, 'started': started, 'updated': time.time()}))
+        tmp.replace(progress_path)
+
+    progress('describing')
+    profile = ProfileReport(
+        df,
+        title=title,
+        explorative=True,
+        progress_bar=False,
+        # Correlations come from utils.correlation, cached per dataset in the app
+        correlations={
+            "auto": {"calculate": False},
+            "pearson": {"calculate": False},
+            "spearman": {"calculate": False}
+        }
+    )
+    profile.get_description()
+    progress('rendering')
+    # Keep the .html suffix: ydata-profiling picks the output format from it
+    tmp_report = Path(report_path).with_suffix('.tmp.html')
+    profile.to_file(tmp_report)
+    tmp_report.replace(report_path)
+    progress('done')
+    return str(report_path)
+
+
+class ProfileService:
+    """Builds full EDA reports in a background process, cached by dataset hash"""
+
+    def __init__(self, reports_dir='reports/profiles', max_workers=1):
+        self.logger = logging.getLogger(__name__)
+        self.reports_dir = Path(reports_dir)
+        self.max_workers = max_workers
+        self._executor = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def request(self, df, title="Medicine Analysis Report"):
+        """Start building the report for ``df`` unless it exists or is in progress; returns its key"""
+        key = fingerprint(df)
+        report_path, progress_path = self._paths(key)
+        if report_path.exists():
+            return key
+
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or (job.done() and job.exception() is not None):
+                self.logger.info(f"Queued full profile for dataset {key[:12]}")
+                self._jobs[key] = self._pool().submit(
+                    _build_full_report, df, title, str(report_path), str(progress_path)
+                )
+        return key
+
+    def status(self, key):
+        """{'stage', 'elapsed', 'error'} for a requested report; ``elapsed`` is None until it starts"""
+        report_path, progress_path = self._paths(key)
+        if report_path.exists():
+            return {'stage': 'done', 'elapsed': None, 'error': None}
+
+        job = self._jobs.get(key)
+        if job is not None and job.done() and job.exception() is not None:
+            return {'stage': 'failed', 'elapsed': None, 'error': str(job.exception())}
+        try:
+            progress = json.loads(progress_path.read_text())
+            return {'stage': progress['stage'], 'elapsed': time.time() - progress['started'], 'error': None}
+        except (OSError, ValueError, KeyError):
+            return {'stage': 'queued', 'elapsed': None, 'error': None}
+
+    def report_html(self, key, wait=False):
+        """Full report HTML, or None while it is still building"""
+        job = self._jobs.get(key)
+        if wait and job is not None:
+            job.result()
+        report_path, _ = self._paths(key)
+        return report_path.read_text() if report_path.exists() else None
+
+    def report_path(self, key):
+        return self._paths(key)[0]
+
+    def _paths(self, key):
+        return (self.reports_dir / f'{key}.html', self.reports_dir / f'{key}.progress.json')
+
+    def _pool(self):
+        if self._executor is None:
+            # spawn keeps the worker free of Streamlit's threads and locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+
+profile_service = ProfileService()
@@ -0,0 +1,390 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import registry
+from utils.text_features import tokenized_column
+
+# Columns indexed when a dataset is loaded; others are indexed on first use
+FILTER_COLUMNS = ['manufacturer', 'excellent_review_%', 'poor_review_%', 'side_effects_count']
+# A term matching at most 1/SELECTIVE_FRACTION of the rows drives the query from
+# its sorted row ids; broader queries are one vectorized mask over the columns
+SELECTIVE_FRACTION = 16
+
+# Indexes are built off the upload path, one dataset at a time
+_index_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='query-index')
+
+
+class CategoricalColumn:
+    """Dictionary codes of a string column, with per-category row lists.
+
+    Category counts come with the codes; the row lists (one stable argsort,
+    so every list is already in row order) are built by ``build_index``.
+    """
+
+    def __init__(self, codes, categories):
+        self.codes = codes              # (n,) signed ints, -1 for missing
+        self.categories = categories    # Index of category values
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        self._codes = {value: code for code, value in enumerate(categories)}
+        self._lock = threading.Lock()
+        self._order = None
+        self._bounds = None
+
+    @classmethod
+    def from_series(cls, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Keep pandas' narrow code dtype; comparisons over it are cheapest
+            return cls(series.cat.codes.to_numpy(), series.cat.categories)
+        codes, categories = pd.factorize(series, sort=False)
+        return cls(codes.astype(np.int64), pd.Index(categories))
+
+    def build_index(self):
+        with self._lock:
+            if self._order is None:
+                missing = int((self.codes < 0).sum())
+                order = np.argsort(self.codes, kind='stable')[missing:]
+                # Row lists are handed out as slices of this array
+                order.flags.writeable = False
+                self._order = order
+                self._bounds = np.concatenate([[0], np.cumsum(self.counts)])
+        return self
+
+    def lookup(self, values):
+        """Codes of ``values``; values not in the column are dropped"""
+        codes = (self._codes.get(value, -1) for value in values)
+        return np.array([code for code in codes if code >= 0], dtype=np.int64)
+
+    def count(self, codes):
+        return int(self.counts[codes].sum())
+
+    def rows(self, codes):
+        """Ascending row positions holding any of ``codes``"""
+        self.build_index()
+        parts = [self._order[self._bounds[c]:self._bounds[c + 1]] for c in codes]
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    def member(self, codes, rows=None):
+        """Whether each row (of all rows, or of ``rows``) holds one of ``codes``"""
+        values = self.codes if rows is None else self.codes[rows]
+        if len(codes) <= 4:
+            match = np.zeros(len(values), dtype=bool)
+            for code in codes:
+                match |= values == code
+            return match
+        # The extra last slot is what missing values (-1) index
+        table = np.zeros(len(self.categories) + 1, dtype=bool)
+        table[codes] = True
+        return table[values]
+
+    def present(self, rows=None):
+        return (self.codes if rows is None else self.codes[rows]) >= 0
+
+
+class NumericColumn:
+    """Float values of a numeric column, with a value-sorted row order.
+
+    The sorted order (``build_index``) turns a range into a count with two
+    binary searches and into its rows with one slice.
+    """
+
+    def __init__(self, values):
+        self.values = values            # (n,) floats, NaN for missing
+        self._lock = threading.Lock()
+        self._order = None
+        self._sorted = None
+        present = values[~np.isnan(values)]
+        self._range = (present.min(), present.max()) if len(present) else (np.nan, np.nan)
+
+    @property
+    def indexed(self):
+        return self._order is not None
+
+    def build_index(self):
+        with self._lock:
+            if self._order is None:
+                order = np.flatnonzero(~np.isnan(self.values))
+                order = order[np.argsort(self.values[order], kind='stable')]
+                self._sorted = self.values[order]
+                self._order = order
+        return self
+
+    def value_range(self):
+        return self._range
+
+    def _span(self, low, high, low_inclusive, high_inclusive):
+        # Bounds take the column's dtype, or searchsorted widens the whole array per call
+        low, high = np.asarray([low, high]).astype(self._sorted.dtype)
+        start = np.searchsorted(self._sorted, low, side='left' if low_inclusive else 'right')
+        stop = np.searchsorted(self._sorted, high, side='right' if high_inclusive else 'left')
+        return start, max(start, stop)
+
+    def count(self, bounds):
+        start, stop = self._span(*bounds)
+        return int(stop - start)
+
+    def rows(self, bounds):
+        """Ascending row positions with a value inside ``bounds``"""
+        start, stop = self._span(*bounds)
+        return np.sort(self._order[start:stop])
+
+    def within(self, bounds, rows=None):
+        """Whether each row (of all rows, or of ``rows``) has a value inside ``bounds``"""
+        low, high, low_inclusive, high_inclusive = bounds
+        values = self.values if rows is None else self.values[rows]
+        # NaN compares False, so missing values match no range; an open end costs no pass
+        match = None
+        if low > -np.inf:
+            match = values >= low if low_inclusive else values > low
+        if high < np.inf:
+            below = values <= high if high_inclusive else values < high
+            match = below if match is None else match & below
+        return match if match is not None else ~np.isnan(values)
+
+    def present(self, rows=None):
+        return ~np.isnan(self.values if rows is None else self.values[rows])
+
+
+class Filter:
+    """Filter expression; combine with ``&``, ``|`` and ``~``"""
+
+    def mask(self, engine, rows=None):
+        """Whether each row (of all rows, or of the candidate ``rows``) matches"""
+        raise NotImplementedError
+
+    def estimate(self, engine):
+        """Exact match count when an index answers it cheaply, else None"""
+        return None
+
+    def __and__(self, other):
+        return AllOf(self, other)
+
+    def __or__(self, other):
+        return AnyOf(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Predicate(Filter):
+    """``column op value`` filter term"""
+
+    OPERATORS = ('==', '!=', 'in', 'not in', '<', '<=', '>', '>=', 'between')
+    NEGATED = {'!=': '==', 'not in': 'in'}
+
+    def __init__(self, column, op, value):
+        if op not in self.OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    @property
+    def _positive_op(self):
+        return self.NEGATED.get(self.op, self.op)
+
+    def _values(self):
+        return [self.value] if self._positive_op == '==' else list(self.value)
+
+    def _ranges(self):
+        """The positive form of the term as (low, high, low_inclusive, high_inclusive) ranges"""
+        op = self._positive_op
+        if op in ('==', 'in'):
+            return [(v, v, True, True) for v in self._values()]
+        if op == 'between':
+            return [(self.value[0], self.value[1], True, True)]
+        return [{
+            '<': (-np.inf, self.value, True, False),
+            '<=': (-np.inf, self.value, True, True),
+            '>': (self.value, np.inf, False, True),
+            '>=': (self.value, np.inf, True, True)
+        }[op]]
+
+    def _check(self, column):
+        if isinstance(column, CategoricalColumn) and self._positive_op not in ('==', 'in'):
+            raise ValueError(f"Operator {self.op} does not apply to categorical column {self.column}")
+
+    def mask(self, engine, rows=None):
+        column = engine.column(self.column)
+        self._check(column)
+        if isinstance(column, CategoricalColumn):
+            match = column.member(column.lookup(self._values()), rows)
+        else:
+            ranges = self._ranges()
+            match = column.within(ranges[0], rows)
+            for bounds in ranges[1:]:
+                match |= column.within(bounds, rows)
+        # Missing values match neither a value nor its negation, as in SQL
+        if self.op in self.NEGATED:
+            return column.present(rows) & ~match
+        return match
+
+    def estimate(self, engine):
+        if self.op in self.NEGATED:
+            return None
+        column = engine.column(self.column)
+        self._check(column)
+        if isinstance(column, CategoricalColumn):
+            return column.count(column.lookup(self._values()))
+        ranges = self._ranges()
+        if column.indexed and len(ranges) == 1:
+            return column.count(ranges[0])
+        return None
+
+    def ready(self, engine):
+        """Whether ``rows`` is a slice of an index rather than a sort"""
+        column = engine.column(self.column)
+        return isinstance(column, CategoricalColumn) and len(self._values()) == 1
+
+    def rows(self, engine):
+        """Ascending matching rows; only for terms with an ``estimate``"""
+        column = engine.column(self.column)
+        if isinstance(column, CategoricalColumn):
+            return column.rows(column.lookup(self._values()))
+        return column.rows(self._ranges()[0])
+
+    def __repr__(self):
+        return f"{self.column} {self.op} {self.value!r}"
+
+
+class AllOf(Filter):
+    def __init__(self, *terms):
+        # Flattened, so a chain of ``&`` is one conjunction the planner can reorder
+        self.terms = tuple(t for term in terms for t in (term.terms if isinstance(term, AllOf) else (term,)))
+
+    def mask(self, engine, rows=None):
+        match = self.terms[0].mask(engine, rows)
+        for term in self.terms[1:]:
+            match &= term.mask(engine, rows)
+        return match
+
+    def __repr__(self):
+        return ' & '.join(f'({t!r})' for t in self.terms)
+
+
+class AnyOf(Filter):
+    def __init__(self, *terms):
+        self.terms = tuple(t for term in terms for t in (term.terms if isinstance(term, AnyOf) else (term,)))
+
+    def mask(self, engine, rows=None):
+        match = self.terms[0].mask(engine, rows)
+        for term in self.terms[1:]:
+            match |= term.mask(engine, rows)
+        return match
+
+    def __repr__(self):
+        return ' | '.join(f'({t!r})' for t in self.terms)
+
+
+class Not(Filter):
+    def __init__(self, term):
+        self.term = term
+
+    def mask(self, engine, rows=None):
+        return ~self.term.mask(engine, rows)
+
+    def __repr__(self):
+        return f'~({self.term!r})'
+
+
+class QueryEngine:
+    """Filter evaluation over one dataset's columns.
+
+    A conjunction whose most selective indexed term matches few rows starts
+    from that term's sorted row ids and checks the other terms on those rows
+    only. Anything broader is a single vectorized mask, which no index beats
+    when most rows have to be touched anyway.
+    """
+
+    def __init__(self, df):
+        self._source = df
+        self.n = len(df)
+        self._lock = threading.Lock()
+        self._columns = {}
+
+    def build(self, columns=FILTER_COLUMNS):
+        """Index ``columns`` now; missing columns are skipped"""
+        for name in columns:
+            try:
+                self.column(name).build_index()
+            except KeyError:
+                continue
+        return self
+
+    def build_async(self, columns=FILTER_COLUMNS):
+        """``build`` on a background thread; queries before it finishes use masks"""
+        return _index_pool.submit(self.build, columns)
+
+    def column(self, name):
+        with self._lock:
+            column = self._columns.get(name)
+        if column is None:
+            column = self._load(name)
+            with self._lock:
+                column = self._columns.setdefault(name, column)
+        return column
+
+    def _load(self, name):
+        if name in self._source.columns:
+            series = self._source[name]
+            if pd.api.types.is_float_dtype(series) and isinstance(series.dtype, np.dtype):
+                # float32 review columns are compared as they are, without a widened copy
+                return NumericColumn(series.to_numpy())
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                return NumericColumn(series.to_numpy(dtype=np.float64, na_value=np.nan))
+            return CategoricalColumn.from_series(series)
+        if name == 'side_effects_count' and 'side_effects' in self._source.columns:
+            # Same derivation as FeatureEngineer's side_effects_count
+            return NumericColumn(np.asarray(tokenized_column(self._source, 'side_effects').counts, dtype=np.float64))
+        raise KeyError(name)
+
+    def categories(self, column):
+        return list(self.column(column).categories)
+
+    def value_range(self, column):
+        return self.column(column).value_range()
+
+    def rows(self, expr):
+        """Row positions matching ``expr``, ascending"""
+        terms = expr.terms if isinstance(expr, AllOf) else (expr,)
+        estimates = [(estimate, i) for i, estimate in enumerate(t.estimate(self) for t in terms)
+                     if estimate is not None]
+        if estimates:
+            best, driver = min(estimates)
+            # One category's rows are a ready slice; other terms' rows need a sort
+            limit = self.n // 2 if terms[driver].ready(self) else self.n // SELECTIVE_FRACTION
+            if best <= limit:
+                rows = terms[driver].rows(self)
+                for i, term in enumerate(terms):
+                    if i != driver and len(rows):
+                        rows = rows[term.mask(self, rows)]
+                return rows
+        return np.flatnonzero(expr.mask(self))
+
+    def count(self, expr):
+        return len(self.rows(expr))
+
+
+def query_engine(df):
+    """QueryEngine for ``df``, cached per registered dataset"""
+    return registry.artifact(df, 'query_engine', QueryEngine)
+
+
+def filtered(handle, expr):
+    """Handle to the rows of ``handle``'s dataset matching ``expr``.
+
+    The subset is registered like any dataset, so every analyzer and report
+    that accepts a handle works on it and its artifacts are built once per
+    distinct filter. ``expr=None``, or a filter matching every row, returns
+    ``handle`` itself.
+    """
+    if expr is None:
+        return handle
+    rows = query_engine(handle.frame()).rows(expr)
+    if len(rows) == len(handle):
+        return handle
+    return registry.subset(handle, rows)
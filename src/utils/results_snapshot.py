@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.metrics_store import METRIC_COLUMNS, metrics_store
+
+
+class ResultsSnapshot:
+    """Precomputed summary of the latest evaluation of each model.
+
+    Built once per evaluation from scalar metrics only; prediction arrays
+    are never kept. Readers get plain attributes, so rendering is O(1).
+    """
+
+    def __init__(self, models, importances_by_model, version=0, updated=None):
+        self.models = models.sort_values('R2', ascending=False)   # MSE, MAE, R2 per model
+        self.importances_by_model = importances_by_model
+        self.version = version
+        self.updated = updated or datetime.now()
+
+        if len(self.models):
+            self.best_model = self.models.index[0]
+            self.best_r2 = float(self.models['R2'].iloc[0])
+            self.lowest_mse_model = self.models['MSE'].idxmin()
+            self.lowest_mse = float(self.models['MSE'].min())
+            self.mean_mae = float(self.models['MAE'].mean())
+        else:
+            self.best_model = self.lowest_mse_model = None
+            self.best_r2 = self.lowest_mse = self.mean_mae = np.nan
+
+        # Best model's importances, sorted once here rather than on every render
+        self.importances = importances_by_model.get(self.best_model)
+        if self.importances is not None:
+            self.importances = (self.importances[['feature', 'importance']]
+                                .sort_values('importance', ascending=False)
+                                .reset_index(drop=True))
+
+    @classmethod
+    def from_results(cls, results, previous=None, version=0):
+        """Summarize ``evaluate_all_models`` output, merged over ``previous``"""
+        rows = {} if previous is None else previous.models[METRIC_COLUMNS].to_dict('index')
+        importances = {} if previous is None else dict(previous.importances_by_model)
+        for name, result in results.items():
+            rows[name] = {m: float(result[m]) for m in METRIC_COLUMNS}
+            if result.get('Feature_Importance') is not None:
+                importances[name] = result['Feature_Importance']
+            else:
+                importances.pop(name, None)
+        return cls(cls._frame(rows), importances, version=version)
+
+    @staticmethod
+    def _frame(rows):
+        return pd.DataFrame.from_dict(rows, orient='index', columns=METRIC_COLUMNS)
+
+
+class ResultsSnapshotService:
+    """Process-wide holder of the current ResultsSnapshot.
+
+    ``publish`` is called when an evaluation lands and swaps in a new
+    snapshot under a lock; ``current`` just returns the reference. Runs
+    recorded by other processes are picked up by re-hydrating from the
+    metrics store when its newest run id changes, checked at most every
+    ``refresh_seconds``.
+    """
+
+    def __init__(self, store=metrics_store, refresh_seconds=5.0):
+        self.logger = logging.getLogger(__name__)
+        self.store = store
+        self.refresh_seconds = refresh_seconds
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._hydrated = False
+        self._run_id = None        # newest store run the snapshot reflects
+        self._checked = 0.0
+
+    def publish(self, results):
+        """Merge new evaluation results into the snapshot"""
+        if not results:
+            return self._snapshot
+        if not self._hydrated:
+            # Start from the stored history so models not in this run are kept
+            self._hydrate()
+        with self._lock:
+            previous = self._snapshot
+            version = previous.version + 1 if previous is not None else 1
+            self._snapshot = ResultsSnapshot.from_results(results, previous, version)
+            self._hydrated = True
+            # This run's records are already in the store; don't reload them
+            self._run_id = self._last_run_id()
+            self._checked = time.monotonic()
+        self.logger.info(f"Published results snapshot v{version} ({len(results)} models updated)")
+        return self._snapshot
+
+    def current(self):
+        """Latest snapshot, or None when no model has been evaluated yet"""
+        if not self._hydrated or self._stale():
+            self._hydrate()
+        return self._snapshot
+
+    def _stale(self):
+        """Whether the store has runs newer than the snapshot"""
+        if self.store is None or time.monotonic() - self._checked < self.refresh_seconds:
+            return False
+        self._checked = time.monotonic()
+        return self._last_run_id() != self._run_id
+
+    def _last_run_id(self):
+        if self.store is None:
+            return None
+        try:
+            return self.store.last_run_id()
+        except Exception as e:
+            self.logger.error(f"Error reading metrics store: {str(e)}")
+            return self._run_id
+
+    def _hydrate(self):
+        with self._lock:
+            run_id = self._last_run_id()
+            if self._hydrated and run_id == self._run_id:
+                return
+            self._hydrated = True
+            self._run_id = run_id
+            self._checked = time.monotonic()
+            if self.store is None:
+                return
+            try:
+                latest = self.store.latest()
+                if latest.empty:
+                    return
+                rows = latest[METRIC_COLUMNS].to_dict('index')
+                best = latest['R2'].idxmax()
+                importances = self.store.importances(latest.loc[best, 'run_id'])
+                previous = self._snapshot
+                self._snapshot = ResultsSnapshot(
+                    ResultsSnapshot._frame(rows),
+                    {best: importances} if len(importances) else {},
+                    version=previous.version + 1 if previous is not None else 1
+                )
+            except Exception as e:
+                self.logger.error(f"Error loading results snapshot: {str(e)}")
+
+
+results_snapshots = ResultsSnapshotService()
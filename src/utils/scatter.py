@@ -0,0 +1,127 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+OTHER_LABEL = 'Other'
+
+
+class AdaptiveScatter:
+    """Scatter renderer that keeps per-category scatters cheap at any size.
+
+    * categories beyond the ``max_traces - 1`` most frequent are merged into
+      a single "Other" trace;
+    * above ``webgl_threshold`` rendered points traces switch to Scattergl;
+    * above ``max_points`` rows a deterministic stratified sample is drawn,
+      keeping every category's share of the points;
+    * above ``density_threshold`` rows the plot becomes a server-side binned
+      density heatmap instead of individual markers.
+    """
+
+    def __init__(self, webgl_threshold=5_000, max_points=50_000, max_traces=20,
+                 density_threshold=1_000_000, density_bins=60, seed=0):
+        self.webgl_threshold = webgl_threshold
+        self.max_points = max_points
+        self.max_traces = max_traces
+        self.density_threshold = density_threshold
+        self.density_bins = density_bins
+        self.seed = seed
+        self.logger = logging.getLogger(__name__)
+
+    def render(self, df, x, y, color=None, title=None, labels=None):
+        labels = labels or {}
+        n = len(df)
+
+        if n > self.density_threshold:
+            self.logger.info(f"Scatter '{title}': {n} rows > {self.density_threshold}, rendering density")
+            fig = self._density(df, x, y)
+        else:
+            codes, names = self._collapse_categories(df, color, title)
+            rows = self._sample(codes, n, title)
+            fig = self._markers(df, x, y, codes, names, rows, color, title)
+
+        fig.update_layout(
+            title=title,
+            xaxis_title=labels.get(x, x),
+            yaxis_title=labels.get(y, y),
+            legend_title=labels.get(color, color)
+        )
+        return fig
+
+    def _collapse_categories(self, df, color, title):
+        """Integer codes per row with the long tail folded into OTHER_LABEL"""
+        if color is None:
+            return np.zeros(len(df), dtype=np.int64), [None]
+
+        codes, uniques = pd.factorize(df[color], sort=False)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        if len(uniques) <= self.max_traces:
+            names = list(uniques)
+            if (codes < 0).any():
+                codes = np.where(codes < 0, len(names), codes)
+                names.append(OTHER_LABEL)
+            return codes, names
+
+        keep = np.argsort(counts)[::-1][:self.max_traces - 1]
+        remap = np.full(len(uniques) + 1, len(keep), dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        self.logger.info(
+            f"Scatter '{title}': collapsed {len(uniques) - len(keep)} of {len(uniques)} "
+            f"'{color}' values into '{OTHER_LABEL}'"
+        )
+        return remap[codes], [uniques[i] for i in keep] + [OTHER_LABEL]
+
+    def _sample(self, codes, n, title):
+        """Row positions to draw: all rows, or a stratified deterministic sample"""
+        if n <= self.max_points:
+            return np.arange(n)
+
+        sizes = np.bincount(codes)
+        quota = np.maximum(1, np.floor(sizes * self.max_points / n)).astype(np.int64)
+        keys = np.random.default_rng(self.seed).random(n)
+
+        # Sort by (category, random key) and keep the first `quota` rows of each category
+        order = np.lexsort((keys, codes))
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        sorted_codes = codes[order]
+        rank = np.arange(n) - starts[sorted_codes]
+        rows = np.sort(order[rank < quota[sorted_codes]])
+
+        self.logger.info(f"Scatter '{title}': sampled {len(rows)} of {n} rows (stratified)")
+        return rows
+
+    def _markers(self, df, x, y, codes, names, rows, color, title):
+        trace_cls = go.Scattergl if len(rows) > self.webgl_threshold else go.Scatter
+        if trace_cls is go.Scattergl:
+            self.logger.info(f"Scatter '{title}': {len(rows)} points, using WebGL")
+
+        xs = df[x].to_numpy()[rows]
+        ys = df[y].to_numpy()[rows]
+        row_codes = codes[rows]
+
+        fig = go.Figure()
+        for i, name in enumerate(names):
+            mask = row_codes == i
+            if not mask.any():
+                continue
+            fig.add_trace(trace_cls(
+                x=xs[mask], y=ys[mask],
+                mode='markers',
+                name=str(name) if name is not None else y,
+                showlegend=color is not None
+            ))
+        return fig
+
+    def _density(self, df, x, y):
+        xs = df[x].to_numpy(dtype=np.float64, na_value=np.nan)
+        ys = df[y].to_numpy(dtype=np.float64, na_value=np.nan)
+        finite = np.isfinite(xs) & np.isfinite(ys)
+        counts, x_edges, y_edges = np.histogram2d(xs[finite], ys[finite], bins=self.density_bins)
+        return go.Figure(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts.T > 0, counts.T, np.nan),
+            colorscale='Viridis',
+            colorbar={'title': 'Count'}
+        ))
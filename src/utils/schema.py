@@ -0,0 +1,32 @@
+import pandas as pd
+
+# Bump whenever the validation rules below change so cached datasets are rebuilt
+SCHEMA_VERSION = 2
+
+REQUIRED_COLUMNS = [
+    'medicine_name', 'composition', 'side_effects',
+    'excellent_review_%', 'average_review_%', 'poor_review_%'
+]
+
+REVIEW_COLUMNS = ['excellent_review_%', 'average_review_%', 'poor_review_%']
+
+# Free-text columns; always parsed as strings, however the first rows look
+TEXT_COLUMNS = ['medicine_name', 'composition', 'uses', 'side_effects', 'image_url', 'manufacturer']
+
+
+def check_schema(columns):
+    """Raise if any required column is missing"""
+    missing = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing:
+        raise ValueError(f"Invalid data schema, missing columns: {missing}")
+
+
+def validate_frame(df):
+    """Validate data schema and coerce review percentages to 0-100"""
+    check_schema(df.columns)
+
+    for col in REVIEW_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+        df[col] = df[col].clip(0, 100)
+
+    return df
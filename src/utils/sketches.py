@@ -0,0 +1,331 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from utils.dataset_registry import registry
+
+SKETCH_QUANTILE_COLUMNS = [
+    'excellent_review_%', 'average_review_%', 'poor_review_%', 'side_effects_count'
+]
+SKETCH_DISTINCT_COLUMNS = ['manufacturer', 'medicine_name']
+SKETCH_TOP_COLUMNS = ['manufacturer']
+QUANTILE_K = 200
+
+
+def kll_rank_error(k=QUANTILE_K):
+    """Normalized rank error at 99% confidence (DataSketches' empirical fit for KLL)"""
+    return 2.296 / k ** 0.9723
+
+
+def _hashes(values):
+    """64-bit hashes of the non-null values; object and categorical input hash alike"""
+    series = pd.Series(values).dropna()
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class QuantileSketch:
+    """KLL quantile sketch over a numeric column.
+
+    Level ``i`` holds items standing for ``2**i`` values each; a full level is
+    sorted and every other item is promoted. Retained items stay around
+    ``3k`` whatever the stream length, and sketches built on separate chunks
+    combine with ``merge``.
+    """
+
+    def __init__(self, k=QUANTILE_K, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self):
+        return kll_rank_error(self.k)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.n += len(values)
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        self.levels += [np.empty(0)] * (len(other.levels) - len(self.levels))
+        for i, items in enumerate(other.levels):
+            self.levels[i] = np.concatenate([self.levels[i], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+
+            grew = level + 1 == len(self.levels)
+            if grew:
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item stays behind so the rest compacts in pairs
+            keep, items = (items[:1], items[1:]) if len(items) % 2 else (items[:0], items)
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([
+                self.levels[level + 1], items[self._rng.integers(2)::2]
+            ])
+            # A new level shrinks the capacity of every level below it
+            level = 0 if grew else level + 1
+
+    def _weighted(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(l), 2.0 ** i) for i, l in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Approximate quantiles; the extremes are exact"""
+        qs = np.asarray(qs, dtype=np.float64)
+        if not self.n:
+            return np.full(len(qs), np.nan)
+        items, cumulative = self._weighted()
+        idx = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        result = items[np.clip(idx, 0, len(items) - 1)]
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def histogram(self, edges):
+        """Approximate counts per bin; the right edge is inclusive, as in np.histogram"""
+        edges = np.asarray(edges, dtype=np.float64)
+        if not self.n:
+            return np.zeros(len(edges) - 1, dtype=np.int64)
+        items, cumulative = self._weighted()
+        cumulative = np.concatenate([[0.0], cumulative]) * (self.n / cumulative[-1])
+        below = cumulative[np.searchsorted(items, edges[:1], side='left')]
+        upto = cumulative[np.searchsorted(items, edges[1:], side='right')]
+        return np.round(np.diff(np.concatenate([below, upto]))).astype(np.int64)
+
+
+class HyperLogLog:
+    """Distinct-count sketch with ``2**p`` one-byte registers; merged by register-wise max"""
+
+    def __init__(self, p=14):
+        # The 64 - p hash bits left after the bucket must convert to float exactly
+        if not 11 <= p <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 11 and 18, got {p}")
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    @property
+    def relative_error(self):
+        """Standard error of the estimate relative to the true count"""
+        return 1.04 / np.sqrt(len(self.registers))
+
+    def update(self, values):
+        hashes = _hashes(values)
+        buckets = (hashes & np.uint64(len(self.registers) - 1)).astype(np.int64)
+        rest = hashes >> np.uint64(self.p)
+        bit_length = np.frexp(rest.astype(np.float64))[1]
+        np.maximum.at(self.registers, buckets, (64 - self.p - bit_length + 1).astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)
+        return raw
+
+
+class CountMinTopK:
+    """Count-min frequency sketch plus a bounded set of heavy-hitter candidates.
+
+    Estimates never undercount and overcount by at most ``error_bound``
+    with probability ``1 - e**-depth``. Each chunk is counted exactly first,
+    so only its distinct values touch the sketch.
+    """
+
+    def __init__(self, k=20, width=2048, depth=4, seed=0):
+        if width & (width - 1):
+            raise ValueError(f"Count-min width must be a power of two, got {width}")
+        self.k = k
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.n = 0
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.candidates = {}   # value hash -> value
+        rng = np.random.default_rng(seed)
+        self._multipliers = rng.integers(1, 2 ** 63, size=depth, dtype=np.uint64) | np.uint64(1)
+        self._shift = np.uint64(64 - int(np.log2(width)))
+
+    @property
+    def capacity(self):
+        return 4 * self.k
+
+    @property
+    def error_bound(self):
+        """Additive overcount bound on every estimate"""
+        return np.e / self.width * self.n
+
+    def _columns(self, hashes):
+        # Multiply-shift hashing, one odd multiplier per row
+        return [((hashes * a) >> self._shift).astype(np.int64) for a in self._multipliers]
+
+    def update(self, values):
+        counts = pd.Series(values).value_counts(sort=False)
+        counts = counts[counts > 0]
+        if not len(counts):
+            return self
+        hashes = _hashes(counts.index)
+        weights = counts.to_numpy()
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(columns, weights=weights, minlength=self.width).astype(np.int64)
+        self.n += int(weights.sum())
+
+        top = np.argsort(-weights, kind='stable')[:self.capacity]
+        self.candidates.update(zip(hashes[top], counts.index[top]))
+        self._trim()
+        return self
+
+    def merge(self, other):
+        if (other.width, other.depth, other.seed) != (self.width, self.depth, self.seed):
+            raise ValueError("Cannot merge count-min sketches with different hashing")
+        self.table += other.table
+        self.n += other.n
+        self.candidates.update(other.candidates)
+        self._trim()
+        return self
+
+    def estimate(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        return np.min([self.table[row, columns] for row, columns in enumerate(self._columns(hashes))], axis=0)
+
+    def _trim(self):
+        if len(self.candidates) <= self.capacity:
+            return
+        hashes = np.fromiter(self.candidates, dtype=np.uint64, count=len(self.candidates))
+        keep = hashes[np.argsort(-self.estimate(hashes), kind='stable')[:self.capacity]]
+        self.candidates = {h: self.candidates[h] for h in keep}
+
+    def top(self, k=None):
+        """Most frequent values with their estimated counts, largest first"""
+        if not self.candidates:
+            return pd.Series(dtype=np.int64, name='count')
+        hashes = np.fromiter(self.candidates, dtype=np.uint64, count=len(self.candidates))
+        counts = pd.Series(self.estimate(hashes), index=[self.candidates[h] for h in hashes], name='count')
+        return counts.sort_values(ascending=False, kind='stable').head(k or self.k)
+
+
+class DatasetSketches:
+    """Quantile, distinct-count and top-K sketches of one dataset.
+
+    Built chunk by chunk (e.g. as the ``chunk_callback`` of ChunkedCSVIngest)
+    in memory independent of the row count; sketches of separate chunks or
+    files combine with ``merge``.
+    """
+
+    def __init__(self, k=QUANTILE_K, p=14, top_k=20):
+        self.k = k
+        self.p = p
+        self.top_k = top_k
+        self.rows = 0
+        self.quantiles = {}   # column -> QuantileSketch
+        self.distinct = {}    # column -> HyperLogLog
+        self.top = {}         # column -> CountMinTopK
+
+    @classmethod
+    def from_frame(cls, df, chunksize=500_000):
+        sketches = cls()
+        for start in range(0, len(df), chunksize):
+            sketches.update(df.iloc[start:start + chunksize])
+        return sketches
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col in SKETCH_QUANTILE_COLUMNS:
+            if col in chunk.columns:
+                values = pd.to_numeric(chunk[col], errors='coerce')
+                self.quantiles.setdefault(col, QuantileSketch(self.k)).update(
+                    values.to_numpy(dtype=np.float64, na_value=np.nan)
+                )
+        for col in SKETCH_DISTINCT_COLUMNS:
+            if col in chunk.columns:
+                self.distinct.setdefault(col, HyperLogLog(self.p)).update(chunk[col])
+        for col in SKETCH_TOP_COLUMNS:
+            if col in chunk.columns:
+                self.top.setdefault(col, CountMinTopK(self.top_k)).update(chunk[col])
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for mine, theirs in ((self.quantiles, other.quantiles),
+                             (self.distinct, other.distinct),
+                             (self.top, other.top)):
+            for col, sketch in theirs.items():
+                if col in mine:
+                    mine[col].merge(sketch)
+                else:
+                    mine[col] = copy.deepcopy(sketch)
+        return self
+
+    def updated(self, rows):
+        """Sketches including ``rows``; used by ``registry.append``"""
+        return copy.deepcopy(self).update(rows)
+
+
+def dataset_sketches(df):
+    """DatasetSketches for ``df``, seeded at ingest or built once per registered dataset"""
+    return registry.artifact(df, 'sketches', DatasetSketches.from_frame)
+
+
+def _column_sketch(df, kind, column, build):
+    """One sketch of ``column``, taken from the dataset sketches when they were
+    seeded at ingest and otherwise built alone, so filtered subsets never
+    sketch columns nobody reads"""
+    sketches = registry.cached(df, 'sketches')
+    if sketches is not None and column in getattr(sketches, kind):
+        return getattr(sketches, kind)[column]
+    return registry.artifact(df, f'sketch:{kind}:{column}', lambda frame: build(frame[column]))
+
+
+def quantile_sketch(df, column):
+    """QuantileSketch of one numeric column"""
+    return _column_sketch(
+        df, 'quantiles', column,
+        lambda values: QuantileSketch().update(values.to_numpy(dtype=np.float64, na_value=np.nan))
+    )
+
+
+def distinct_sketch(df, column):
+    """HyperLogLog of one column"""
+    return _column_sketch(df, 'distinct', column, lambda values: HyperLogLog().update(values))
+
+
+def top_sketch(df, column):
+    """CountMinTopK of one column"""
+    return _column_sketch(df, 'top', column, lambda values: CountMinTopK().update(values))
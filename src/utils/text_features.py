@@ -0,0 +1,152 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.dataset_registry import registry
+
+# "Amoxycillin (500mg) + Clavulanic Acid (125mg)"; commas are accepted too
+COMPOSITION_SEPARATOR = r'\s*[+,]\s*'
+# Strength in brackets is not part of the ingredient's identity
+COMPOSITION_STRENGTH = r'\s*\(.*?\)'
+# "Nausea Abdominal pain Headache": a new effect starts at each capitalized word
+SIDE_EFFECT_SEPARATOR = r'\s*,\s*|\s+(?=[A-Z])'
+# Column -> (separator, normalization) used by tokenized_column
+TOKENIZERS = {
+    'composition': (COMPOSITION_SEPARATOR, COMPOSITION_STRENGTH),
+    'side_effects': (SIDE_EFFECT_SEPARATOR, None)
+}
+
+logger = logging.getLogger(__name__)
+
+
+def _text_array(values):
+    """Arrow-backed strings when pyarrow is installed, object strings otherwise"""
+    try:
+        return pd.Series(values, dtype='string[pyarrow]')
+    except ImportError:
+        return pd.Series(values, dtype=object).astype(str)
+
+
+class TokenizedColumn:
+    """Interned token vocabulary and sparse document-term matrix for a text column.
+
+    Tokenization runs once per distinct string: rows keep an integer code into
+    the distinct values, and the CSR matrix is stored at that level. Row-level
+    counts and the row-level matrix are gathers over those codes.
+    """
+
+    def __init__(self, vocabulary, unique_matrix, unique_lengths, row_codes):
+        self.vocabulary = vocabulary          # Index of interned tokens
+        self.unique_matrix = unique_matrix    # CSR, distinct values x tokens
+        self.unique_lengths = unique_lengths  # characters per distinct value
+        self.row_codes = row_codes            # distinct value per row, -1 when missing
+        self._matrix = None
+
+    @classmethod
+    def from_series(cls, series, separator, normalize=None):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Already dictionary-encoded by the ingest/cache layers
+            row_codes = series.cat.codes.to_numpy().astype(np.int64)
+            uniques = series.cat.categories
+        else:
+            row_codes, uniques = pd.factorize(series, sort=False)
+
+        text = _text_array(uniques)
+        tokens = text.str.split(separator, regex=True).explode().dropna()
+        # Normalize each distinct raw token once, then intern the results
+        raw_codes, raw_tokens = pd.factorize(tokens, sort=False)
+        cleaned = _text_array(raw_tokens)
+        if normalize is not None:
+            cleaned = cleaned.str.replace(normalize, '', regex=True)
+        cleaned = cleaned.str.strip()
+        interned, vocabulary = pd.factorize(cleaned.replace('', None), sort=True)
+        token_codes = interned[raw_codes]
+        keep = token_codes >= 0
+        tokens, token_codes = tokens[keep], token_codes[keep]
+
+        owners = tokens.index.to_numpy()
+        indptr = np.concatenate([[0], np.cumsum(np.bincount(owners, minlength=len(uniques)))])
+        unique_matrix = sparse.csr_matrix(
+            (np.ones(len(token_codes), dtype=np.int32), token_codes, indptr),
+            shape=(len(uniques), len(vocabulary))
+        )
+        unique_matrix.sum_duplicates()
+
+        unique_lengths = text.str.len().to_numpy(dtype=np.float64, na_value=np.nan)
+        logger.info(
+            f"Tokenized '{series.name}': {len(uniques)} distinct values, "
+            f"{len(vocabulary)} tokens"
+        )
+        return cls(pd.Index(vocabulary), unique_matrix, unique_lengths, np.asarray(row_codes))
+
+    def _gather(self, per_unique):
+        """Row-level array from one value per distinct string (NaN for missing rows)"""
+        values = np.append(np.asarray(per_unique, dtype=np.float64), np.nan)
+        return values[np.where(self.row_codes >= 0, self.row_codes, len(values) - 1)]
+
+    @property
+    def counts(self):
+        """Tokens per row"""
+        return self._gather(np.diff(self.unique_matrix.indptr))
+
+    @property
+    def lengths(self):
+        """Characters per row"""
+        return self._gather(self.unique_lengths)
+
+    @property
+    def matrix(self):
+        """Row-level CSR matrix; missing rows are empty"""
+        if self._matrix is None:
+            padded = sparse.vstack([
+                self.unique_matrix,
+                sparse.csr_matrix((1, len(self.vocabulary)), dtype=np.int32)
+            ], format='csr')
+            rows = np.where(self.row_codes >= 0, self.row_codes, padded.shape[0] - 1)
+            self._matrix = padded[rows]
+        return self._matrix
+
+    def document_frequency(self):
+        """Rows containing each token, as a Series indexed by token"""
+        present = self.row_codes[self.row_codes >= 0]
+        weights = np.bincount(present, minlength=self.unique_matrix.shape[0])
+        binary = self.unique_matrix.copy()
+        binary.data[:] = 1
+        return pd.Series(binary.T @ weights, index=self.vocabulary).sort_values(ascending=False)
+
+
+class TextFeatures:
+    """Tokenized ``composition`` and ``side_effects`` columns of one dataset"""
+
+    def __init__(self, composition, side_effects):
+        self.composition = composition
+        self.side_effects = side_effects
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(tokenized_column(df, 'composition'), tokenized_column(df, 'side_effects'))
+
+    def to_frame(self, index=None):
+        """Derived count columns, aligned with the source rows"""
+        return pd.DataFrame({
+            'composition_count': self.composition.counts,
+            'composition_complexity': self.composition.lengths,
+            'side_effects_count': self.side_effects.counts
+        }, index=index)
+
+
+def tokenized_column(df, column):
+    """TokenizedColumn for one text column, cached per registered dataset"""
+    separator, normalize = TOKENIZERS[column]
+    return registry.artifact(
+        df,
+        f'tokens:{column}',
+        lambda frame: TokenizedColumn.from_series(frame[column], separator, normalize)
+    )
+
+
+def text_features(df):
+    """TextFeatures for ``df``; each column is tokenized and cached separately"""
+    return TextFeatures.from_frame(df)
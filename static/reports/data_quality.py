@@ -1,9 +1,142 @@
+import numpy as np
+import pandas as pd
+from utils.sketches import DatasetSketches
+
+REVIEW_COLUMNS = ['excellent_review_%', 'average_review_%', 'poor_review_%']
+DISTRIBUTION_BINS = np.linspace(0, 100, 21)
+SUM_TOLERANCE = 1.0
+
+
+class QualityAccumulator:
+    """Mergeable partial results of the data quality checks.
+
+    ``update`` makes one fused pass over a chunk's column arrays and only
+    keeps O(columns + bins) state, plus each chunk's distinct 64-bit medicine
+    name hashes; these are deduplicated once, in a single sort, when the
+    duplicate count is read. With
+    ``approximate=True`` the name hashes are replaced by a HyperLogLog and
+    quantile sketches are kept as well, so memory no longer grows with the
+    row count. Accumulators built on separate chunks combine with ``merge``.
+    """
+
+    def __init__(self, approximate=False):
+        self.approximate = approximate
+        self.sketches = DatasetSketches() if approximate else None
+        self.named_rows = 0
+        self.rows = 0
+        self.missing = {}
+        k = len(REVIEW_COLUMNS)
+        self.in_range = np.zeros(k, dtype=np.int64)
+        self.count = np.zeros(k, dtype=np.int64)
+        self.sum = np.zeros(k)
+        self.sumsq = np.zeros(k)
+        self.histograms = np.zeros((k, len(DISTRIBUTION_BINS) - 1), dtype=np.int64)
+        self.sum_checked = 0
+        self.sum_consistent = 0
+        self.sum_abs_deviation = 0.0
+        self._name_hashes = []   # distinct hashes per chunk, merged lazily
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for col, nulls in chunk.isna().sum().items():
+            self.missing[col] = self.missing.get(col, 0) + int(nulls)
+
+        present_cols = [c for c in REVIEW_COLUMNS if c in chunk.columns]
+        if present_cols:
+            self._update_reviews(chunk, present_cols)
+        if 'medicine_name' in chunk.columns:
+            self.named_rows += int(chunk['medicine_name'].notna().sum())
+        if self.approximate:
+            self.sketches.update(chunk)
+        elif 'medicine_name' in chunk.columns:
+            names = chunk['medicine_name'].dropna()
+            self._name_hashes.append(np.unique(pd.util.hash_pandas_object(names, index=False).to_numpy()))
+        return self
+
+    def merge(self, other):
+        if self.approximate != other.approximate:
+            raise ValueError("Cannot merge exact and approximate quality accumulators")
+        self.rows += other.rows
+        for col, nulls in other.missing.items():
+            self.missing[col] = self.missing.get(col, 0) + nulls
+        self.in_range += other.in_range
+        self.count += other.count
+        self.sum += other.sum
+        self.sumsq += other.sumsq
+        self.histograms += other.histograms
+        self.sum_checked += other.sum_checked
+        self.sum_consistent += other.sum_consistent
+        self.sum_abs_deviation += other.sum_abs_deviation
+        self.named_rows += other.named_rows
+
+        if self.approximate:
+            self.sketches.merge(other.sketches)
+        else:
+            self._name_hashes.extend(other._name_hashes)
+        return self
+
+    @property
+    def duplicate_names(self):
+        """Named rows repeating an earlier medicine name (exact mode)"""
+        if len(self._name_hashes) > 1:
+            self._name_hashes = [np.unique(np.concatenate(self._name_hashes))]
+        distinct = len(self._name_hashes[0]) if self._name_hashes else 0
+        return self.named_rows - distinct
+
+    def _update_reviews(self, chunk, present_cols):
+        # One (n, k) float matrix feeds every review check
+        values = np.column_stack([
+            pd.to_numeric(chunk[c], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            for c in present_cols
+        ])
+        present = ~np.isnan(values)
+        in_range = present & (values >= 0) & (values <= 100)
+        filled = np.where(present, values, 0.0)
+
+        for j, col in enumerate(present_cols):
+            i = REVIEW_COLUMNS.index(col)
+            self.in_range[i] += in_range[:, j].sum()
+            self.count[i] += present[:, j].sum()
+            self.sum[i] += filled[:, j].sum()
+            self.sumsq[i] += np.dot(filled[:, j], filled[:, j])
+            bins = np.searchsorted(DISTRIBUTION_BINS, values[in_range[:, j], j], side='right') - 1
+            self.histograms[i] += np.bincount(
+                np.clip(bins, 0, len(DISTRIBUTION_BINS) - 2),
+                minlength=len(DISTRIBUTION_BINS) - 1
+            )
+
+        if len(present_cols) == len(REVIEW_COLUMNS):
+            complete = present.all(axis=1)
+            deviation = np.abs(filled[complete].sum(axis=1) - 100)
+            self.sum_checked += int(complete.sum())
+            self.sum_consistent += int((deviation <= SUM_TOLERANCE).sum())
+            self.sum_abs_deviation += float(deviation.sum())
+
+
 class DataQualityReport:
-    def __init__(self, df):
+    def __init__(self, df=None, accumulator=None, approximate=False):
         self.df = df
-        
+        self.accumulator = accumulator
+        self.approximate = approximate
+
+    @classmethod
+    def from_chunks(cls, chunks, approximate=False):
+        """Build the report from an iterable of DataFrame chunks (out-of-core data)"""
+        accumulator = QualityAccumulator(approximate)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return cls(accumulator=accumulator, approximate=approximate)
+
+    @classmethod
+    def from_csv(cls, path, chunksize=500_000, approximate=False):
+        """Check a CSV too large for memory, one chunk at a time"""
+        return cls.from_chunks(pd.read_csv(path, chunksize=chunksize), approximate)
+
     def generate_quality_report(self):
         """Generate comprehensive data quality report"""
+        if self.accumulator is None:
+            self.accumulator = QualityAccumulator(self.approximate).update(self.df)
+
         report = {
             'completeness': self._check_completeness(),
             'validity': self._check_validity(),
@@ -11,23 +144,80 @@ class DataQualityReport:
             'distribution': self._analyze_distributions()
         }
         return report
-        
+
     def _check_completeness(self):
         """Check data completeness"""
+        acc = self.accumulator
         return {
-            'missing_values': self.df.isnull().sum().to_dict(),
-            'completion_rate': (1 - self.df.isnull().mean()).to_dict()
+            'missing_values': dict(acc.missing),
+            'completion_rate': {
+                col: 1 - nulls / acc.rows if acc.rows else 1.0
+                for col, nulls in acc.missing.items()
+            }
         }
-        
+
     def _check_validity(self):
         """Check data validity"""
+        acc = self.accumulator
         validity = {}
-        review_cols = ['excellent_review_%', 'average_review_%', 'poor_review_%']
-        
-        for col in review_cols:
+        for i, col in enumerate(REVIEW_COLUMNS):
+            n = acc.count[i]
+            mean = acc.sum[i] / n if n else np.nan
+            var = (acc.sumsq[i] - n * mean ** 2) / (n - 1) if n > 1 else np.nan
             validity[col] = {
-                'in_range': (self.df[col].between(0, 100)).mean(),
-                'mean': self.df[col].mean(),
-                'std': self.df[col].std()
+                'in_range': acc.in_range[i] / acc.rows if acc.rows else np.nan,
+                'mean': mean,
+                'std': np.sqrt(max(var, 0)) if n > 1 else np.nan
             }
+            sketch = acc.sketches.quantiles.get(col) if acc.approximate else None
+            if sketch is not None:
+                low, q1, median, q3, high = sketch.quantiles([0, 0.25, 0.5, 0.75, 1])
+                validity[col].update({
+                    'min': low, 'q1': q1, 'median': median, 'q3': q3, 'max': high,
+                    'quantile_rank_error': sketch.rank_error
+                })
         return validity
+
+    def _check_consistency(self):
+        """Check review percentages sum to 100 and medicine names are unique"""
+        acc = self.accumulator
+        duplicates, duplicate_error = acc.duplicate_names, 0.0
+        distinct = acc.sketches.distinct.get('medicine_name') if acc.approximate else None
+        if distinct is not None:
+            estimate = distinct.estimate()
+            duplicates = max(int(round(acc.named_rows - estimate)), 0)
+            duplicate_error = distinct.relative_error * estimate
+        return {
+            'review_sum_checked': acc.sum_checked,
+            'review_sum_consistent_rate': (
+                acc.sum_consistent / acc.sum_checked if acc.sum_checked else np.nan
+            ),
+            'review_sum_mean_abs_deviation': (
+                acc.sum_abs_deviation / acc.sum_checked if acc.sum_checked else np.nan
+            ),
+            'duplicate_medicine_names': duplicates,
+            'duplicate_error': duplicate_error,
+            'duplicate_rate': duplicates / acc.rows if acc.rows else np.nan
+        }
+
+    def _analyze_distributions(self):
+        """Histogram sketch and approximate quartiles of each review column"""
+        acc = self.accumulator
+        distributions = {}
+        for i, col in enumerate(REVIEW_COLUMNS):
+            counts = acc.histograms[i]
+            distributions[col] = {
+                'bin_edges': DISTRIBUTION_BINS.tolist(),
+                'counts': counts.tolist(),
+                'quartiles': self._histogram_quantiles(counts, [0.25, 0.5, 0.75])
+            }
+        return distributions
+
+    @staticmethod
+    def _histogram_quantiles(counts, quantiles):
+        total = counts.sum()
+        if total == 0:
+            return [np.nan] * len(quantiles)
+        cdf = np.concatenate([[0], np.cumsum(counts)]) / total
+        # Linear interpolation inside the bin holding each quantile
+        return np.interp(quantiles, cdf, DISTRIBUTION_BINS).tolist()
@@ -1,7 +1,14 @@
+import plotly.express as px
+from plotly.subplots import make_subplots
+from utils.aggregates import manufacturer_aggregates
+from utils.binning import REVIEW_RANGE, binned_column
+from utils.figure_cache import figure_cache
+
 class EffectivenessReport:
     def __init__(self, df):
         self.df = df
         
+    @figure_cache.memoize('EffectivenessReport.generate_effectiveness_report', lambda self: self.df)
     def generate_effectiveness_report(self):
         """Generate medicine effectiveness analysis report"""
         figs = []
@@ -32,10 +39,9 @@ class EffectivenessReport:
         
         for i, (col, color) in enumerate(zip(review_cols, colors), 1):
             fig.add_trace(
-                go.Histogram(
-                    x=self.df[col],
+                binned_column(self.df, col, 50, REVIEW_RANGE).bar(
                     name=col.split('_')[0].title(),
-                    marker_color=color
+                    color=color
                 ),
                 row=1, col=i
             )
@@ -46,3 +52,22 @@ class EffectivenessReport:
             template='plotly_white'
         )
         return fig
+
+    def _create_manufacturer_analysis(self):
+        """Create manufacturer performance visualization"""
+        top_manufacturers = manufacturer_aggregates(self.df).top_n(
+            {'excellent_review_%': ['mean', 'count', 'std']},
+            by='excellent_review_%_mean',
+            n=10,
+            flat=True
+        )
+
+        fig = px.bar(
+            top_manufacturers,
+            y=top_manufacturers.index,
+            x='excellent_review_%_mean',
+            error_x='excellent_review_%_std',
+            title='Top Manufacturers by Excellent Reviews'
+        )
+        fig.update_layout(template='plotly_white')
+        return fig
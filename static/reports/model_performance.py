@@ -2,12 +2,19 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
+from utils.figure_cache import figure_cache
+from utils.metrics_store import METRIC_COLUMNS, metrics_store
 
 class ModelPerformanceReport:
-    def __init__(self, results, df):
+    def __init__(self, results, df, store=metrics_store):
         self.results = results
         self.df = df
+        self.store = store
         
+    @figure_cache.memoize(
+        'ModelPerformanceReport.generate_performance_dashboard',
+        lambda self: (self.results, self.df)
+    )
     def generate_performance_dashboard(self):
         """Generate comprehensive model performance report"""
         figs = []
@@ -51,3 +58,29 @@ class ModelPerformanceReport:
             template='plotly_white'
         )
         return fig
+
+    def create_metric_trends(self, models=None, since=None, until=None):
+        """Create MSE, MAE and R² trends across stored evaluation runs"""
+        runs = self.store.runs(models=models, since=since, until=until)
+        fig = make_subplots(rows=len(METRIC_COLUMNS), cols=1, shared_xaxes=True,
+                            subplot_titles=METRIC_COLUMNS)
+        colors = px.colors.qualitative.Plotly
+
+        for i, (model, group) in enumerate(runs.groupby('model', sort=True)):
+            for row, metric in enumerate(METRIC_COLUMNS, start=1):
+                fig.add_trace(
+                    go.Scatter(
+                        x=group['timestamp'], y=group[metric],
+                        mode='lines+markers', name=model,
+                        legendgroup=model, showlegend=row == 1,
+                        line={'color': colors[i % len(colors)]}
+                    ),
+                    row=row, col=1
+                )
+
+        fig.update_layout(
+            title='Model Performance Over Time',
+            height=250 * len(METRIC_COLUMNS),
+            template='plotly_white'
+        )
+        return fig
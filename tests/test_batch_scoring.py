@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.batch_scoring import BatchScorer  # noqa: E402
+from utils.dataset_cache import read_frame  # noqa: E402
+
+
+def _results():
+    return pd.DataFrame({'medicine_name': ['A', 'B'], 'predicted_effectiveness': [61.5, 40.0]})
+
+
+def test_parquet_output_falls_back_to_csv_without_an_engine(tmp_path, monkeypatch):
+    def no_engine(*args, **kwargs):
+        raise ImportError("Unable to find a usable engine")
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', no_engine)
+    written = BatchScorer(tmp_path / 'model.joblib')._write(_results(), tmp_path / 'out' / 'predictions.parquet')
+
+    assert written == tmp_path / 'out' / 'predictions.csv'
+    pd.testing.assert_frame_equal(pd.read_csv(written), _results())
+
+
+def test_bundle_output(tmp_path):
+    written = BatchScorer(tmp_path / 'model.joblib')._write(_results(), tmp_path / 'predictions')
+    pd.testing.assert_frame_equal(read_frame(written), _results())
@@ -0,0 +1,52 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.dataset_cache import DatasetCache, read_frame, write_frame  # noqa: E402
+from utils.schema import validate_frame  # noqa: E402
+
+
+@pytest.fixture
+def source(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = 200
+    df = pd.DataFrame({
+        'medicine_name': [f'Medicine {i}' for i in range(rows)],
+        'composition': rng.choice(['A (1mg)', 'A (1mg) + B (2mg)', None], rows),
+        'uses': rng.choice(['Pain relief', 'nan', 'None', None], rows),
+        'side_effects': rng.choice(['Nausea', 'Rash Fever', None], rows),
+        'image_url': 'https://example.com/image.jpg',
+        'manufacturer': rng.choice(['Manufacturer 1', 'Manufacturer 2', None], rows),
+        'excellent_review_%': rng.integers(0, 101, rows),
+        'average_review_%': rng.integers(0, 101, rows),
+        'poor_review_%': rng.choice([10.0, 150.0, np.nan], rows)
+    })
+    path = tmp_path / 'Medicine_Details.csv'
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_warm_load_matches_cold_load(source, tmp_path):
+    # DataLoader.load_data's cold path: parse, validate, then cache
+    cold = validate_frame(pd.read_csv(source))
+    cache = DatasetCache(tmp_path / 'cache')
+    cache.store(source, cold)
+
+    warm = cache.load(source)
+    assert warm is not None
+    pd.testing.assert_frame_equal(warm, cold)
+
+
+def test_categorical_columns_keep_their_categories(tmp_path):
+    df = pd.DataFrame({
+        'grade': pd.Categorical(['b', None, 'a'], categories=['c', 'b', 'a'], ordered=True),
+        'count': np.array([1, 2, 3], dtype=np.int16),
+        'mixed': ['x', 2, None]
+    })
+    write_frame(tmp_path / 'bundle', df)
+    pd.testing.assert_frame_equal(read_frame(tmp_path / 'bundle'), df)
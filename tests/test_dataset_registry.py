@@ -0,0 +1,30 @@
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.dataset_registry import DatasetRegistry  # noqa: E402
+
+
+def test_handle_collected_under_the_lock_is_released_later():
+    registry = DatasetRegistry()
+    handle = registry.register(pd.DataFrame({'a': [1, 2, 3]}))
+    key = handle.key
+
+    done = threading.Event()
+
+    def collect_while_locked():
+        nonlocal handle
+        with registry._locked():
+            # The finalizer runs here, on the lock-holding thread
+            handle = None
+        done.set()
+
+    worker = threading.Thread(target=collect_while_locked, daemon=True)
+    worker.start()
+    assert done.wait(5), "finalizer deadlocked on the registry lock"
+    assert registry.stats()['datasets'] == 0
+    assert key not in registry._datasets
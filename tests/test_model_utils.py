@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeRegressor
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.model_registry import model_registry  # noqa: E402
+from utils.model_search import SEARCH_FEATURES, HyperparameterSearch  # noqa: E402
+from utils.model_utils import MedicineModelManager  # noqa: E402
+
+
+def medicine_frame(rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    excellent = rng.uniform(0, 100, rows)
+    average = rng.uniform(0, 100 - excellent)
+    return pd.DataFrame({
+        'medicine_name': [f'Medicine {i}' for i in range(rows)],
+        'composition': rng.choice(['A (1mg)', 'A (1mg) + B (2mg)', 'C (5mg) + D (1mg) + E (2mg)'], rows),
+        'side_effects': rng.choice(['Nausea', 'Rash Fever', 'Headache Dizziness Nausea'], rows),
+        'manufacturer': rng.choice([f'Manufacturer {i}' for i in range(15)], rows),
+        'excellent_review_%': excellent,
+        'average_review_%': average,
+        'poor_review_%': 100 - excellent - average
+    })
+
+
+@pytest.fixture
+def search_trained(tmp_path):
+    search = HyperparameterSearch(
+        {'DecisionTree': (DecisionTreeRegressor(random_state=0), {'max_depth': [2, 4]})},
+        n_splits=3, checkpoint_dir=tmp_path / 'search'
+    )
+    model_path = tmp_path / 'decision_tree.joblib'
+    search.run(medicine_frame(), model_path=model_path, store=None)
+    return MedicineModelManager(str(model_path))
+
+
+def test_preprocess_input_with_search_trained_artifact(search_trained):
+    assert search_trained.load_preprocessor().feature_names == SEARCH_FEATURES
+
+    X = search_trained.preprocess_input(3, 2, 60.0)
+    assert X is not None and X.shape == (1, len(SEARCH_FEATURES))
+    prediction = model_registry.get(search_trained.model_path).predict(X)
+    assert np.isfinite(prediction).all()
+
+
+def test_preprocess_input_ignores_satisfaction_the_model_does_not_use(search_trained):
+    np.testing.assert_array_equal(
+        search_trained.preprocess_input(3, 2, 60.0, satisfaction=80),
+        search_trained.preprocess_input(3, 2, 60.0)
+    )
+
+
+def test_load_preprocessor_follows_a_retrained_artifact(search_trained):
+    before = search_trained.load_preprocessor()
+    features = pd.DataFrame({name: np.arange(10.0) * 7 for name in SEARCH_FEATURES})
+    search_trained.fit_preprocessor(features, SEARCH_FEATURES)
+
+    after = search_trained.load_preprocessor()
+    assert not np.allclose(before.mean_, after.mean_)
+    np.testing.assert_allclose(after.mean_, features.mean().to_numpy())
@@ -0,0 +1,69 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.monitoring_sink import MonitoringSink  # noqa: E402
+
+
+def _records(n):
+    return [{'prediction': float(i)} for i in range(n)]
+
+
+def _lines(directory):
+    return sum(len(path.read_text().splitlines()) for path in Path(directory).glob('*.jsonl'))
+
+
+def test_failed_writes_are_retried_then_counted(tmp_path, monkeypatch):
+    sink = MonitoringSink(tmp_path, flush_interval=0.05, write_retries=1)
+    attempts = []
+
+    def broken_segment():
+        attempts.append(1)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(sink, '_current_segment', broken_segment)
+    sink.start()
+    for record in _records(3):
+        sink.submit(record)
+    assert sink.stop()
+
+    metrics = sink.metrics()
+    assert metrics['failed'] == 3 and metrics['written'] == 0
+    assert len(attempts) >= 2
+
+
+def test_transient_write_failure_is_retried_on_a_fresh_segment(tmp_path, monkeypatch):
+    sink = MonitoringSink(tmp_path, flush_interval=0.05, batch_size=10)
+    current_segment = sink._current_segment
+    failures = [OSError("stale handle")]
+
+    def flaky_segment():
+        if failures:
+            raise failures.pop()
+        return current_segment()
+
+    monkeypatch.setattr(sink, '_current_segment', flaky_segment)
+    for record in _records(5):
+        sink.submit(record)
+    sink.start()
+    assert sink.stop()
+
+    metrics = sink.metrics()
+    assert metrics['failed'] == 0 and metrics['written'] == 5
+    assert _lines(tmp_path) == 5
+
+
+def test_stop_leaves_the_segment_to_a_worker_still_draining(tmp_path):
+    release = threading.Event()
+    sink = MonitoringSink(tmp_path, flush_interval=0.05, on_batch=lambda batch: release.wait(5)).start()
+    sink.submit({'prediction': 1.0})
+
+    assert not sink.stop(timeout=0.2)
+    assert sink._segment is not None and not sink._segment.closed
+
+    release.set()
+    assert sink.stop()
+    assert sink._segment is None
+    assert _lines(tmp_path) == 1
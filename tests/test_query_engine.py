@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.dataset_registry import registry  # noqa: E402
+from utils.query_engine import AllOf, Not, Predicate, QueryEngine, filtered  # noqa: E402
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(0)
+    rows = 20_000
+    weights = 1 / np.arange(1, 201) ** 1.1
+    manufacturers = pd.Series(rng.choice(200, rows, p=weights / weights.sum())).map('Manufacturer {}'.format)
+    manufacturers[rng.random(rows) < 0.01] = None
+    poor = rng.integers(0, 101, rows).astype(np.float32)
+    poor[rng.random(rows) < 0.01] = np.nan
+    return pd.DataFrame({
+        'manufacturer': manufacturers.astype('category'),
+        'excellent_review_%': rng.integers(0, 101, rows).astype(np.float64),
+        'poor_review_%': poor,
+        'side_effects_count': rng.integers(1, 12, rows).astype(np.float64)
+    })
+
+
+QUERIES = [
+    (lambda df: df['manufacturer'] == 'Manufacturer 0',
+     Predicate('manufacturer', '==', 'Manufacturer 0')),
+    (lambda df: (df['manufacturer'] == 'Manufacturer 3') & (df['poor_review_%'] > 30)
+     & (df['side_effects_count'] >= 5),
+     Predicate('manufacturer', '==', 'Manufacturer 3') & Predicate('poor_review_%', '>', 30)
+     & Predicate('side_effects_count', '>=', 5)),
+    (lambda df: df['excellent_review_%'].between(95, 100) & (df['poor_review_%'] < 10),
+     AllOf(Predicate('excellent_review_%', 'between', (95, 100)), Predicate('poor_review_%', '<', 10))),
+    (lambda df: df['excellent_review_%'].between(80, 100)
+     | df['manufacturer'].isin(['Manufacturer 150', 'Manufacturer 151']),
+     Predicate('excellent_review_%', 'between', (80, 100))
+     | Predicate('manufacturer', 'in', ['Manufacturer 150', 'Manufacturer 151'])),
+    (lambda df: df['poor_review_%'] <= 60, Predicate('poor_review_%', '<=', 60)),
+    (lambda df: df['manufacturer'].notna() & (df['manufacturer'] != 'Manufacturer 0'),
+     Predicate('manufacturer', '!=', 'Manufacturer 0')),
+    (lambda df: df['poor_review_%'].notna() & ~df['poor_review_%'].isin([0, 100]),
+     Predicate('poor_review_%', 'not in', [0, 100])),
+    (lambda df: ~(df['side_effects_count'] > 3), Not(Predicate('side_effects_count', '>', 3)))
+]
+
+
+@pytest.mark.parametrize('indexed', [False, True])
+def test_rows_match_pandas_masks(frame, indexed):
+    engine = QueryEngine(frame)
+    if indexed:
+        engine.build()
+    for mask, expr in QUERIES:
+        expected = np.flatnonzero(mask(frame).to_numpy())
+        np.testing.assert_array_equal(engine.rows(expr), expected, err_msg=repr(expr))
+
+
+def test_categorical_operators_are_rejected(frame):
+    with pytest.raises(ValueError):
+        QueryEngine(frame).rows(Predicate('manufacturer', '>', 'Manufacturer 0'))
+
+
+def test_filtered_subsets_share_the_parent(frame):
+    data = registry.register(frame)
+    assert filtered(data, None) is data
+    assert filtered(data, Predicate('side_effects_count', '>=', 0)) is data
+
+    view = filtered(data, Predicate('manufacturer', '==', 'Manufacturer 0'))
+    pd.testing.assert_frame_equal(view.frame(), frame[frame['manufacturer'] == 'Manufacturer 0'])
+    assert filtered(data, Predicate('manufacturer', '==', 'Manufacturer 0')).key == view.key
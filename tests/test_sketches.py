@@ -0,0 +1,103 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+from utils.sketches import CountMinTopK, DatasetSketches, HyperLogLog, QuantileSketch  # noqa: E402
+
+
+def _rank_errors(sketch, values, qs):
+    """Normalized rank of each estimated quantile, minus its target rank"""
+    ordered = np.sort(values)
+    estimates = sketch.quantiles(qs)
+    low = np.searchsorted(ordered, estimates, side='left') / len(ordered)
+    high = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    # Ties make a value cover a range of ranks; the error is the distance to it
+    return np.maximum(np.maximum(low - qs, qs - high), 0)
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).lognormal(3, 1, 200_000)
+
+
+def test_quantiles_within_rank_error(values):
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+    qs = np.linspace(0.01, 0.99, 99)
+    assert _rank_errors(sketch, values, qs).max() <= sketch.rank_error
+    assert sketch.quantiles([0, 1]).tolist() == [values.min(), values.max()]
+
+
+def test_quantile_merge_matches_bound(values):
+    halves = np.array_split(values, 2)
+    merged = QuantileSketch(seed=1).update(halves[0]).merge(QuantileSketch(seed=2).update(halves[1]))
+    assert merged.n == len(values)
+    qs = np.linspace(0.01, 0.99, 99)
+    assert _rank_errors(merged, values, qs).max() <= merged.rank_error
+
+
+def test_distinct_count_within_three_sigma():
+    rng = np.random.default_rng(1)
+    for true in (500, 20_000, 300_000):
+        names = pd.Series(rng.permutation(true * 2)[:true]).astype(str)
+        sketch = HyperLogLog().update(pd.concat([names, names.sample(frac=0.5, random_state=0)]))
+        assert abs(sketch.estimate() - true) <= 3 * sketch.relative_error * true
+
+
+def test_distinct_merge_equals_single_pass():
+    values = pd.Series(np.arange(50_000)).astype(str)
+    whole = HyperLogLog().update(values)
+    merged = HyperLogLog().update(values[:30_000]).merge(HyperLogLog().update(values[20_000:]))
+    assert np.array_equal(whole.registers, merged.registers)
+
+
+def test_top_k_matches_value_counts():
+    rng = np.random.default_rng(2)
+    weights = 1 / np.arange(1, 1001) ** 1.2
+    values = pd.Series(rng.choice(1000, 300_000, p=weights / weights.sum())).map('m{}'.format)
+
+    sketch = CountMinTopK(k=10)
+    for chunk in np.array_split(values, 30):
+        sketch.update(chunk)
+    exact = values.value_counts()
+    top = sketch.top()
+
+    assert list(top.index) == list(exact.index[:10])
+    overcount = top - exact[top.index]
+    assert (overcount >= 0).all()
+    assert (overcount <= sketch.error_bound).all()
+
+
+def test_top_k_merge():
+    values = pd.Series(['a'] * 500 + ['b'] * 300 + ['c'] * 100 + [f'x{i}' for i in range(2000)])
+    values = values.sample(frac=1, random_state=0).reset_index(drop=True)
+    merged = CountMinTopK(k=3).update(values[:1200]).merge(CountMinTopK(k=3).update(values[1200:]))
+    top = merged.top()
+    assert list(top.index) == ['a', 'b', 'c']
+    assert merged.n == len(values)
+    assert (top - pd.Series({'a': 500, 'b': 300, 'c': 100}) <= merged.error_bound).all()
+
+    with pytest.raises(ValueError):
+        merged.merge(CountMinTopK(k=3, seed=1))
+
+
+def test_dataset_sketches_merge():
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'manufacturer': rng.choice(['A', 'B', 'C', 'D'], 10_000, p=[0.4, 0.3, 0.2, 0.1]),
+        'medicine_name': np.arange(10_000).astype(str),
+        'excellent_review_%': rng.uniform(0, 100, 10_000)
+    })
+    merged = DatasetSketches.from_frame(df[:4000]).merge(DatasetSketches.from_frame(df[4000:]))
+    assert merged.rows == len(df)
+    assert list(merged.top['manufacturer'].top().index) == ['A', 'B', 'C', 'D']
+    estimate = merged.distinct['medicine_name'].estimate()
+    assert abs(estimate - 10_000) <= 3 * merged.distinct['medicine_name'].relative_error * 10_000
+    median = merged.quantiles['excellent_review_%'].quantiles([0.5])[0]
+    assert abs((df['excellent_review_%'] <= median).mean() - 0.5) <= merged.quantiles['excellent_review_%'].rank_error